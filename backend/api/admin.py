@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Profile, FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog
+from .models import Profile, FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog, LoggingStreak, DailySummary
 
 # -------------------------
 # Profile
@@ -15,6 +15,7 @@ class ProfileAdmin(admin.ModelAdmin):
         'activity_level',
         'goal',
         'daily_calorie_target',
+        'bmi',
         'reminders_enabled',
     )
     list_filter = ('gender', 'goal', 'activity_level', 'reminders_enabled')
@@ -98,3 +99,40 @@ class SleepLogAdmin(admin.ModelAdmin):
     list_filter = ('date',)
     search_fields = ('user__username',)
     date_hierarchy = 'date'
+
+
+# -------------------------
+# Logging Streak
+# -------------------------
+@admin.register(LoggingStreak)
+class LoggingStreakAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'current_streak',
+        'longest_streak',
+        'last_logged_date',
+        'month_logged_days',
+        'month_met_target_days',
+        'needs_repair',
+    )
+    list_filter = ('needs_repair',)
+    search_fields = ('user__username',)
+
+
+# -------------------------
+# Daily Summary (archived logs)
+# -------------------------
+@admin.register(DailySummary)
+class DailySummaryAdmin(admin.ModelAdmin):
+    list_display = (
+        'user',
+        'date',
+        'calories',
+        'water_ml',
+        'calories_burned',
+        'weight_kg',
+        'sleep_minutes',
+    )
+    list_filter = ('date',)
+    search_fields = ('user__username',)
+    date_hierarchy = 'date'
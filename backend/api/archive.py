@@ -0,0 +1,246 @@
+"""
+Hot/cold split of the log tables.
+
+Everyday views only read the last few weeks, but the log tables keep
+every row ever written. archive_before() rolls each user's logs older
+than LOG_RETENTION_DAYS into one DailySummary row per day and deletes
+the raw rows, so the hot tables stay around (retention x users) rows
+and their (user, date) indexes stay shallow.
+
+Readers that reach past the cutoff (energy ledger, correlations, weight
+history, sleep analytics, streak rebuilds and the daily export) combine
+DailySummary with the hot rows; reaches_archive() tells them whether a
+range needs the extra lookup at all. Logs back-dated into the archived
+range are folded into the existing summary on the next run: totals are
+added, the weigh-in, sleep quality and clock times are replaced.
+"""
+from collections import defaultdict
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.db import connections, router, transaction
+from django.db.models import IntegerField, Sum, Value
+
+from .cache import bump_user_version
+from .localtime import local_today
+from .models import FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog, DailySummary
+from .sleep_analytics import SLEEP_COLUMNS
+
+# Monthly stats and the PDF report read the current month from the hot tables
+MIN_RETENTION_DAYS = 62
+
+# (table, date field) of every table that gets archived
+LOG_TABLES = (
+    (FoodLog, 'date_eaten'),
+    (WaterLog, 'date_eaten'),
+    (WeightLog, 'date'),
+    (ExerciseLog, 'date'),
+    (SleepLog, 'date'),
+)
+
+# Per-day totals computed in SQL: (table, date field, {summary field: aggregate})
+TOTALS = (
+    (FoodLog, 'date_eaten', {
+        'calories': Sum('calories'),
+        'protein': Sum('protein'),
+        'carbs': Sum('carbs'),
+        'fats': Sum('fats'),
+    }),
+    (WaterLog, 'date_eaten', {'water_ml': Sum('amount_ml')}),
+    (ExerciseLog, 'date', {
+        'calories_burned': Sum('calories_burned'),
+        'exercise_minutes': Sum('duration_minutes'),
+    }),
+)
+SLEEP_TOTALS = ('sleep_minutes', 'deep_sleep_minutes', 'light_sleep_minutes', 'rem_sleep_minutes', 'awake_minutes')
+ADDITIVE_FIELDS = tuple(name for _, _, aggregates in TOTALS for name in aggregates) + SLEEP_TOTALS
+SUMMARY_FIELDS = ADDITIVE_FIELDS + ('weight_kg', 'sleep_quality', 'bedtime', 'wake_time')
+
+# DailySummary columns in the order of sleep_analytics.SLEEP_COLUMNS
+ARCHIVED_SLEEP_COLUMNS = (
+    'date', 'bedtime', 'wake_time', 'sleep_minutes', 'sleep_quality',
+    'deep_sleep_minutes', 'light_sleep_minutes', 'rem_sleep_minutes', 'awake_minutes',
+)
+
+
+def archive_cutoff(today):
+    """Logs dated before this day belong in DailySummary."""
+    return today - timedelta(days=settings.LOG_RETENTION_DAYS)
+
+
+def reaches_archive(user, start):
+    """Whether a range of `user`'s days starting at `start` (None = all history) can include archived days."""
+    return start is None or start < archive_cutoff(local_today(user))
+
+
+def _range(date_field, start, end):
+    filters = {f"{date_field}__lte": end}
+    if start is not None:
+        filters[f"{date_field}__gte"] = start
+    return filters
+
+
+def summarize(user_ids, start, end, models=None):
+    """
+    Per-day summaries of the raw logs between start (None = earliest) and
+    end inclusive: {(user_id, date): {summary field: value}}. `models`
+    limits the work to some log tables (and their summary fields).
+    """
+    days = defaultdict(dict)
+    for model, date_field, aggregates in TOTALS:
+        if models is not None and model not in models:
+            continue
+        rows = (
+            model.objects.filter(user_id__in=user_ids, **_range(date_field, start, end))
+            .values('user_id', date_field).annotate(**aggregates).order_by()
+            .values_list('user_id', date_field, *aggregates)
+        )
+        for user_id, day, *values in rows:
+            days[user_id, day].update(zip(aggregates, values))
+
+    if models is None or WeightLog in models:
+        weights = (
+            WeightLog.objects.filter(user_id__in=user_ids, **_range('date', start, end))
+            .order_by('date', 'id').values_list('user_id', 'date', 'weight_kg')
+        )
+        for user_id, day, weight in weights:
+            # Last weigh-in of the day wins
+            days[user_id, day]['weight_kg'] = weight
+
+    if models is None or SleepLog in models:
+        _summarize_sleep(days, user_ids, start, end)
+    return days
+
+
+def _summarize_sleep(days, user_ids, start, end):
+    nights = (
+        SleepLog.objects.filter(user_id__in=user_ids, **_range('date', start, end))
+        .order_by('user_id', 'date', 'id').values_list('user_id', *SLEEP_COLUMNS)
+    )
+    for (user_id, day), group in groupby(nights, key=lambda row: row[:2]):
+        group = [row[2:] for row in group]
+        bedtime, wake_time = max(group, key=lambda row: row[2])[:2]
+        totals = [sum(row[i] for row in group) for i in (2, 4, 5, 6, 7)]
+        days[user_id, day].update(
+            zip(SLEEP_TOTALS, totals),
+            bedtime=bedtime,
+            wake_time=wake_time,
+            sleep_quality=sum(row[3] for row in group) / len(group),
+        )
+
+
+def _merge(entry, values):
+    """Fold freshly summarized `values` into an existing day `entry` (both dicts)."""
+    for field, value in values.items():
+        current = entry.get(field)
+        if field in ADDITIVE_FIELDS and current is not None:
+            value += current
+        entry[field] = value
+
+
+def _users_with_logs_before(cutoff):
+    user_ids = set()
+    for model, date_field in LOG_TABLES:
+        user_ids.update(
+            model.objects.filter(**{f"{date_field}__lt": cutoff})
+            .values_list('user_id', flat=True).distinct()
+        )
+    return sorted(user_ids)
+
+
+def delete_rows(queryset):
+    """
+    Delete the queryset's rows with a single DELETE ... WHERE pk IN (...).
+    No pre/post_delete signals and no cascades: callers handle both.
+    Returns the number of rows deleted.
+    """
+    model = queryset.model
+    connection = connections[router.db_for_write(model)]
+    quote = connection.ops.quote_name
+    sql, params = queryset.order_by().values_list('pk').query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} WHERE {quote(model._meta.pk.column)} IN ({sql})", params
+        )
+        return cursor.rowcount
+
+
+def archive_before(cutoff, batch_size=200, progress=None):
+    """
+    Move every log dated before `cutoff` into DailySummary, `batch_size`
+    users per transaction. Returns {"users", "days", "rows"}.
+    """
+    user_ids = _users_with_logs_before(cutoff)
+    result = {"users": len(user_ids), "days": 0, "rows": 0}
+    last_day = cutoff - timedelta(days=1)
+
+    for offset in range(0, len(user_ids), batch_size):
+        chunk = user_ids[offset:offset + batch_size]
+        with transaction.atomic():
+            values = summarize(chunk, None, last_day)
+            first_day = min((day for _, day in values), default=last_day)
+            existing = {
+                (summary['user_id'], summary['date']): summary
+                for summary in DailySummary.objects.select_for_update().filter(
+                    user_id__in=chunk, date__range=[first_day, last_day]
+                ).values('user_id', 'date', *SUMMARY_FIELDS)
+            }
+            batch = []
+            for (user_id, day), fields in values.items():
+                entry = existing.get((user_id, day), {'user_id': user_id, 'date': day})
+                _merge(entry, fields)
+                batch.append(DailySummary(**entry))
+            DailySummary.objects.bulk_create(
+                batch, batch_size=1000, update_conflicts=True,
+                unique_fields=['user', 'date'], update_fields=list(SUMMARY_FIELDS),
+            )
+
+            # One DELETE per table, skipping the per-row signals on purpose:
+            # the streak and history snapshot handlers would recompute the
+            # same numbers, which now come from the summaries; caches are
+            # invalidated below
+            for model, date_field in LOG_TABLES:
+                queryset = model.objects.filter(user_id__in=chunk, **{f"{date_field}__lt": cutoff})
+                result["rows"] += delete_rows(queryset)
+        result["days"] += len(batch)
+
+        for user_id in chunk:
+            bump_user_version(user_id)
+        if progress:
+            progress(min(offset + batch_size, len(user_ids)), result)
+    return result
+
+
+def archived_rows(user, start, end, required, columns):
+    """values_list(*columns) of the archived days in [start, end] on which `required` was logged."""
+    return (
+        DailySummary.objects.filter(user=user, **_range('date', start, end), **{f"{required}__isnull": False})
+        .order_by('date').values_list(*columns)
+    )
+
+
+def weight_history(user):
+    """(log id, date, weight_kg) for every weigh-in, oldest first; archived days have id None."""
+    hot = WeightLog.objects.filter(user=user).values_list('id', 'date', 'weight_kg')
+    archived = (
+        DailySummary.objects.filter(user=user, weight_kg__isnull=False)
+        .values_list(Value(None, output_field=IntegerField()), 'date', 'weight_kg')
+    )
+    return hot.union(archived, all=True).order_by('date', 'id')
+
+
+def daily_history(user, start, end):
+    """
+    Every day with any log between start (None = earliest) and end
+    inclusive, archived or hot, as a date-sorted list of
+    {date, archived, <summary fields>}.
+    """
+    history = {}
+    for summary in DailySummary.objects.filter(user=user, **_range('date', start, end)).values('date', *SUMMARY_FIELDS):
+        history[summary['date']] = {**summary, "archived": True}
+
+    for (_, day), fields in summarize([user.pk], start, end).items():
+        entry = history.setdefault(day, {"date": day, "archived": False, **dict.fromkeys(SUMMARY_FIELDS)})
+        _merge(entry, fields)
+    return [history[day] for day in sorted(history)]
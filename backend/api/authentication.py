@@ -0,0 +1,120 @@
+"""
+Token authentication with a small in-process cache.
+
+DRF's TokenAuthentication runs a Token + User join on every request and most
+views then load `user.profile` separately. CachedTokenAuthentication fetches
+token, user and profile in one query and keeps the result in a bounded LRU
+with a short TTL, so repeat requests skip both round trips.
+
+Entries are dropped on logout, password reset and any user/profile save
+(an index of keys per user keeps that O(1) in the cache size).
+"""
+import copy
+import threading
+import time
+from collections import OrderedDict
+
+from django.conf import settings
+from rest_framework import exceptions
+from rest_framework.authentication import TokenAuthentication
+
+
+class TokenCache:
+    def __init__(self, max_size, ttl):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._keys_by_user = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            expires, user, token = entry
+            if expires < time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return user, token
+
+    def set(self, key, user, token):
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = (time.monotonic() + self.ttl, user, token)
+            self._keys_by_user.setdefault(user.pk, set()).add(key)
+            while len(self._entries) > self.max_size:
+                self._remove(next(iter(self._entries)))
+
+    def invalidate(self, key):
+        with self._lock:
+            self._remove(key)
+
+    def invalidate_user(self, user_id):
+        with self._lock:
+            for key in self._keys_by_user.pop(user_id, ()):
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+
+    def _remove(self, key):
+        # Caller holds the lock
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        user_id = entry[1].pk
+        keys = self._keys_by_user.get(user_id)
+        if keys is not None:
+            keys.discard(key)
+            if not keys:
+                del self._keys_by_user[user_id]
+
+
+token_cache = TokenCache(
+    max_size=settings.AUTH_TOKEN_CACHE_SIZE,
+    ttl=settings.AUTH_TOKEN_CACHE_TTL,
+)
+
+
+class CachedTokenAuthentication(TokenAuthentication):
+    def authenticate_credentials(self, key):
+        cached = token_cache.get(key)
+        if cached is None:
+            model = self.get_model()
+            try:
+                token = model.objects.select_related('user', 'user__profile').get(key=key)
+            except model.DoesNotExist:
+                raise exceptions.AuthenticationFailed('Invalid token.')
+
+            if not token.user.is_active:
+                raise exceptions.AuthenticationFailed('User inactive or deleted.')
+
+            token_cache.set(key, token.user, token)
+            cached = (token.user, token)
+
+        user, token = cached
+        return request_copy(user), token
+
+
+def request_copy(user):
+    """
+    Shallow copy of a cached user and its cached profile, so per-request
+    attribute changes never leak into the shared entry. Model copies get
+    their own _state and relation cache; field values are immutable.
+    """
+    clone = copy.copy(user)
+    profile = clone._state.fields_cache.get('profile')
+    if profile is not None:
+        profile = copy.copy(profile)
+        profile._state.fields_cache['user'] = clone
+        clone._state.fields_cache['profile'] = profile
+    return clone
@@ -0,0 +1,101 @@
+"""
+Per-user response cache for read-heavy endpoints.
+
+Entries are keyed by (user, endpoint, local date, query string, data version).
+Every log create/delete bumps the user's data version (see signals.py),
+so stale entries are never read again and simply expire.
+"""
+import threading
+from collections import defaultdict
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from rest_framework.response import Response
+
+from .localtime import local_today
+
+_stats_lock = threading.Lock()
+_stats = defaultdict(lambda: {"hits": 0, "misses": 0})
+
+
+def _version_key(user_id):
+    return f"fitguide:v:{user_id}"
+
+
+def get_user_version(user_id):
+    version = cache.get(_version_key(user_id))
+    if version is None:
+        cache.add(_version_key(user_id), 1, timeout=None)
+        version = cache.get(_version_key(user_id), 1)
+    return version
+
+
+def bump_user_version(user_id):
+    try:
+        cache.incr(_version_key(user_id))
+    except ValueError:
+        # Key missing (evicted or never read): any fresh value invalidates
+        cache.set(_version_key(user_id), 1, timeout=None)
+        cache.incr(_version_key(user_id))
+
+
+def response_key(user_id, endpoint, day, query=''):
+    version = get_user_version(user_id)
+    return f"fitguide:r:{user_id}:{endpoint}:{day.isoformat()}:{version}:{query}"
+
+
+def _record(endpoint, outcome):
+    with _stats_lock:
+        _stats[endpoint][outcome] += 1
+
+
+def cache_stats():
+    """Hit/miss counters for this process, overall and per endpoint."""
+    with _stats_lock:
+        endpoints = {name: dict(counts) for name, counts in _stats.items()}
+
+    def with_ratio(counts):
+        total = counts["hits"] + counts["misses"]
+        return {**counts, "hit_rate": round(counts["hits"] / total, 3) if total else 0.0}
+
+    totals = {
+        "hits": sum(c["hits"] for c in endpoints.values()),
+        "misses": sum(c["misses"] for c in endpoints.values()),
+    }
+    return {
+        **with_ratio(totals),
+        "endpoints": {name: with_ratio(counts) for name, counts in endpoints.items()},
+    }
+
+
+def reset_cache_stats():
+    with _stats_lock:
+        _stats.clear()
+
+
+def cached_response(endpoint):
+    """
+    Cache successful responses of an APIView method per user.
+    Usage:
+        @cached_response('dashboard-summary')
+        def get(self, request): ...
+    """
+    def decorator(view_method):
+        @wraps(view_method)
+        def wrapper(self, request, *args, **kwargs):
+            key = response_key(
+                request.user.pk, endpoint, local_today(request.user), request.META.get('QUERY_STRING', '')
+            )
+            data = cache.get(key)
+            if data is not None:
+                _record(endpoint, "hits")
+                return Response(data)
+
+            _record(endpoint, "misses")
+            response = view_method(self, request, *args, **kwargs)
+            if response.status_code == 200:
+                cache.set(key, response.data, settings.RESPONSE_CACHE_TIMEOUT)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,88 @@
+"""
+Compression of JSON API responses.
+
+CompressionMiddleware compresses JSON responses of at least
+RESPONSE_COMPRESSION_MIN_BYTES with brotli (when the `brotli` package is
+installed and the client accepts it) or gzip. Small responses aren't
+worth the CPU. The time spent shows up as the "compress" section of the
+request timing.
+
+Static files are left to WhiteNoise: its responses are streamed and not
+JSON, and precompressed variants already carry a Content-Encoding, so
+they are never touched here.
+"""
+import re
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+from django.utils.text import compress_string
+
+from .instrumentation import timed
+
+try:
+    import brotli
+except ImportError:  # optional dependency
+    brotli = None
+
+_coding = re.compile(r"\s*([\w*-]+)\s*(?:;\s*q\s*=\s*(\d(?:\.\d*)?))?")
+
+
+def accepted_encodings(header):
+    """Codings from an Accept-Encoding header with a non-zero q value."""
+    accepted = set()
+    for part in header.split(','):
+        match = _coding.match(part)
+        if match and float(match.group(2) or 1) > 0:
+            accepted.add(match.group(1).lower())
+    return accepted
+
+
+def choose_encoding(header):
+    accepted = accepted_encodings(header)
+    if brotli is not None and 'br' in accepted:
+        return 'br'
+    if 'gzip' in accepted:
+        return 'gzip'
+    return None
+
+
+def compress(content, encoding):
+    if encoding == 'br':
+        return brotli.compress(content, quality=settings.RESPONSE_BROTLI_QUALITY)
+    # Random gzip header bytes, as in Django's GZipMiddleware, against BREACH
+    return compress_string(content, max_random_bytes=100)
+
+
+class CompressionMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (
+            not settings.RESPONSE_COMPRESSION
+            or response.streaming
+            or response.has_header('Content-Encoding')
+            or not response.get('Content-Type', '').startswith('application/json')
+            or len(response.content) < settings.RESPONSE_COMPRESSION_MIN_BYTES
+        ):
+            return response
+
+        patch_vary_headers(response, ('Accept-Encoding',))
+        encoding = choose_encoding(request.META.get('HTTP_ACCEPT_ENCODING', ''))
+        if encoding is None:
+            return response
+
+        with timed('compress'):
+            compressed = compress(response.content, encoding)
+        if len(compressed) >= len(response.content):
+            return response
+
+        response.content = compressed
+        response.headers['Content-Length'] = str(len(compressed))
+        response.headers['Content-Encoding'] = encoding
+        # The body changed, so a strong ETag becomes weak (If-None-Match compares weakly)
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response.headers['ETag'] = 'W/' + etag
+        return response
@@ -0,0 +1,74 @@
+"""
+HTTP validators (ETag / If-None-Match) for per-user read endpoints.
+
+The ETag is derived from a cheap per-table version of the user's data
+(max id + row count, so both inserts and deletes change it), the profile
+fields the response depends on, the user's local date and the query string. A
+matching If-None-Match is answered with 304 before the view runs.
+
+Log tables only carry dates, not modification timestamps, so ETag is the
+only validator; Last-Modified is not emitted.
+"""
+import hashlib
+
+from django.db.models import Count, IntegerField, Max, Value
+from django.utils.decorators import method_decorator
+from django.views.decorators.http import condition
+
+from . import profile_metrics
+from .localtime import local_today
+from .models import Profile
+
+
+def data_version(user, models):
+    """One "<table>:<max id>:<count>" part per model, all from a single UNION ALL query."""
+    if not models:
+        return []
+    queries = [
+        model.objects.filter(user=user).order_by().values('user_id')
+        .annotate(table=Value(i, output_field=IntegerField()), last=Max('id'), count=Count('id'))
+        .values_list('table', 'last', 'count')
+        for i, model in enumerate(models)
+    ]
+    # Grouped per user, so a table without rows contributes no row
+    versions = {table: (last, count) for table, last, count in queries[0].union(*queries[1:], all=True)}
+    return [
+        "{}:{}:{}".format(model.__name__, *versions.get(i, (None, 0)))
+        for i, model in enumerate(models)
+    ]
+
+
+def profile_version(user):
+    try:
+        profile = user.profile
+    except Profile.DoesNotExist:
+        return "profile:none"
+    fields = profile_metrics.METRIC_INPUTS + profile_metrics.DERIVED_FIELDS
+    return "profile:" + ":".join(str(getattr(profile, name)) for name in fields)
+
+
+def user_data_etag(*models, profile=False, models_for=None):
+    def etag_func(request, *args, **kwargs):
+        tables = models_for(request) if models_for else models
+        parts = [
+            request.path,
+            request.META.get('QUERY_STRING', ''),
+            local_today(request.user).isoformat(),
+            *data_version(request.user, tables),
+        ]
+        if profile:
+            parts.append(profile_version(request.user))
+        return hashlib.sha1("|".join(parts).encode()).hexdigest()
+    return etag_func
+
+
+def conditional_on(*models, profile=False, models_for=None):
+    """
+    Method decorator for APIView.get. Usage:
+        @conditional_on(FoodLog, profile=True)
+        def get(self, request): ...
+    models_for(request) picks the tables per request instead (e.g. from
+    the query string).
+    """
+    etag_func = user_data_etag(*models, profile=profile, models_for=models_for)
+    return method_decorator(condition(etag_func=etag_func))
@@ -0,0 +1,113 @@
+"""
+Cross-metric correlations over per-day aggregates.
+
+daily_matrix() slices the user's (days x metrics) history snapshot (see
+snapshots.py), NaN where nothing was logged. lagged_correlations() then
+computes pairwise-complete Pearson correlations for every metric pair
+and lag with a handful of matrix products, so multi-year histories stay
+well under a second.
+"""
+import warnings
+
+import numpy as np
+
+from . import snapshots
+from .snapshots import METRICS
+
+MIN_OVERLAP_DAYS = 10
+
+
+def daily_matrix(user, start, end):
+    """(days, matrix) for start..end inclusive; matrix[i, j] is METRICS[j] on day i."""
+    return snapshots.load(user).window(start, end)
+
+
+def _pairwise_pearson(a, b):
+    """Pearson r (and overlap count) of every column of `a` against every column of `b`, ignoring NaN pairs."""
+    mask_a = (~np.isnan(a)).astype(np.float64)
+    mask_b = (~np.isnan(b)).astype(np.float64)
+    a0 = np.nan_to_num(a)
+    b0 = np.nan_to_num(b)
+
+    n = mask_a.T @ mask_b
+    sum_a = a0.T @ mask_b
+    sum_b = mask_a.T @ b0
+    sum_ab = a0.T @ b0
+    sum_a2 = (a0 * a0).T @ mask_b
+    sum_b2 = mask_a.T @ (b0 * b0)
+
+    with np.errstate(invalid='ignore', divide='ignore'):
+        cov = n * sum_ab - sum_a * sum_b
+        var = (n * sum_a2 - sum_a ** 2) * (n * sum_b2 - sum_b ** 2)
+        r = cov / np.sqrt(var)
+    r[(n < MIN_OVERLAP_DAYS) | ~np.isfinite(r)] = np.nan
+    return r, n
+
+
+def lagged_correlations(matrix, max_lag):
+    """
+    {lag: (r, n)} where r[i, j] correlates METRICS[i] on day t with
+    METRICS[j] on day t + lag.
+    """
+    results = {}
+    for lag in range(max_lag + 1):
+        if lag >= len(matrix):
+            break
+        leading = matrix[:len(matrix) - lag]
+        following = matrix[lag:]
+        results[lag] = _pairwise_pearson(leading, following)
+    return results
+
+
+def rolling_stats(matrix, window):
+    """NaN-aware mean/std/count of each metric over the trailing `window` days."""
+    recent = matrix[-window:]
+    counts = (~np.isnan(recent)).sum(axis=0)
+    with warnings.catch_warnings():
+        # All-NaN columns (metric never logged in the window) are expected
+        warnings.simplefilter('ignore', RuntimeWarning)
+        means = np.nanmean(recent, axis=0)
+        stds = np.nanstd(recent, axis=0)
+    return {
+        name: {
+            "mean": None if np.isnan(means[i]) else round(float(means[i]), 2),
+            "std": None if np.isnan(stds[i]) else round(float(stds[i]), 2),
+            "days": int(counts[i]),
+        }
+        for i, name in enumerate(METRICS)
+    }
+
+
+def _clean(value):
+    return None if np.isnan(value) else round(float(value), 3)
+
+
+def correlation_report(user, start, end, max_lag=1, window=7, top=10):
+    days, matrix = daily_matrix(user, start, end)
+    lagged = lagged_correlations(matrix, max_lag)
+
+    strongest = []
+    for lag, (r, n) in lagged.items():
+        for i, j in zip(*np.nonzero(~np.isnan(r))):
+            # Lag 0 is symmetric: keep each pair once and skip the diagonal
+            if lag == 0 and i >= j:
+                continue
+            strongest.append({
+                "leading": METRICS[i],
+                "following": METRICS[j],
+                "lag_days": lag,
+                "r": _clean(r[i, j]),
+                "days": int(n[i, j]),
+            })
+    strongest.sort(key=lambda item: abs(item["r"]), reverse=True)
+
+    return {
+        "metrics": list(METRICS),
+        "days": len(days),
+        "correlations": {
+            str(lag): [[_clean(value) for value in row] for row in r]
+            for lag, (r, _) in lagged.items()
+        },
+        "strongest": strongest[:top],
+        "rolling": {"window_days": window, "metrics": rolling_stats(matrix, window)},
+    }
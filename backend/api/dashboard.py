@@ -0,0 +1,218 @@
+"""
+Dashboard sections, shared by the per-widget endpoints and GET /api/dashboard/.
+
+The dashboard page used to load its widgets from six endpoints, each
+paying for authentication, the profile lookup, ETag versions and its own
+queries. build_dashboard() assembles only the sections asked for in
+?fields= from the same builders those endpoints use, so a section has
+the same shape either way, while the sections share the loaded profile
+and one energy ledger query (summary + weekly).
+"""
+from datetime import timedelta
+
+from .archive import weight_history
+from .energy import PROJECTION_WINDOWS, daily_ledger, projection
+from .models import FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog
+from .rows import log_rows
+from .streaks import get_counters
+from .timeseries import downsample
+from .weight_analytics import analyze_weight
+
+SECTIONS = ('summary', 'weekly', 'water', 'weight', 'activity', 'sleep')
+
+# Log tables each section reads (for the ETag)
+SECTION_MODELS = {
+    'summary': (FoodLog, ExerciseLog),
+    'weekly': (FoodLog, ExerciseLog),
+    'water': (WaterLog,),
+    'weight': (WeightLog,),
+    'activity': (ExerciseLog,),
+    'sleep': (SleepLog,),
+}
+
+# Sections that answer 404 without a profile, like their endpoints
+PROFILE_SECTIONS = ('summary', 'water')
+
+# Fixed recommendation: 7 glasses * 250ml = 1750ml
+WATER_GOAL_ML = 1750
+SLEEP_HISTORY_DAYS = 30
+MAX_HISTORY_DAYS = 3660
+
+
+def parse_fields(value):
+    """Sections named in ?fields=a,b (in SECTIONS order; all when missing). ValueError on unknown names."""
+    if value is None:
+        return SECTIONS
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    unknown = names.difference(SECTIONS)
+    if unknown or not names:
+        raise ValueError(f"'fields' must be a comma-separated subset of: {', '.join(SECTIONS)}")
+    return tuple(name for name in SECTIONS if name in names)
+
+
+def parse_days(value, default=SLEEP_HISTORY_DAYS):
+    """?days= as an int in 1..MAX_HISTORY_DAYS (`default` when missing). ValueError otherwise."""
+    if value is None:
+        return default
+    try:
+        days = int(value)
+    except ValueError:
+        days = None
+    if days is None or not 1 <= days <= MAX_HISTORY_DAYS:
+        raise ValueError(f"'days' must be an integer between 1 and {MAX_HISTORY_DAYS}")
+    return days
+
+
+def section_models(fields):
+    """Log tables read by `fields`, each once, in a stable order."""
+    return tuple(dict.fromkeys(model for name in fields for model in SECTION_MODELS[name]))
+
+
+def ledger_for(user, profile, today, days):
+    tdee = profile.tdee if profile else None
+    return daily_ledger(user, today - timedelta(days=days - 1), today, tdee)
+
+
+def summary_section(user, profile, today, ledger, with_projection=False):
+    """Today's intake, burn and meals; `ledger` ends today (30 days for the projection)."""
+    energy = ledger[-1]
+    logs = FoodLog.objects.filter(user=user, date_eaten=today)
+    data = {
+        "target_calories": profile.daily_calorie_target,
+        "consumed_calories": energy["intake"],
+        "burned_calories": energy["burned"],
+        "net_calories": energy["net"],
+        "macros": {
+            "protein": energy["protein"],
+            "carbs": energy["carbs"],
+            "fats": energy["fats"]
+        },
+        # Exercise earns calories back on top of the daily target
+        "remaining_calories": profile.daily_calorie_target - energy["intake"] + energy["burned"],
+        "recent_logs": log_rows(logs)
+    }
+    if with_projection:
+        data["projection"] = projection(ledger)
+    return data
+
+
+def weekly_section(user, today, ledger, with_projection=False):
+    """Last 7 days of the ledger plus the stored streak counters."""
+    stats = [
+        {
+            "date": entry["date"].strftime("%Y-%m-%d"),
+            "day_name": entry["date"].strftime("%a"),
+            "calories": entry["intake"],
+            "burned": entry["burned"],
+            "net": entry["net"]
+        }
+        for entry in ledger[-7:]
+    ]
+    counters = get_counters(user, today)
+    data = {
+        "daily_stats": stats,
+        "streak": counters["streak"],
+        "longest_streak": counters["longest_streak"]
+    }
+    if with_projection:
+        data["projection"] = projection(ledger, windows=(7,))
+    return data
+
+
+def water_section(user, today):
+    """Today's water logs and the 7-day chart, from one query over the week."""
+    week = log_rows(
+        WaterLog.objects.filter(user=user, date_eaten__range=[today - timedelta(days=6), today]).order_by('-id')
+    )
+    logs = [log for log in week if log["date_eaten"] == today.isoformat()]
+    total_consumed = sum(log["amount_ml"] for log in logs)
+
+    week_totals = {}
+    for log in week:
+        week_totals[log["date_eaten"]] = week_totals.get(log["date_eaten"], 0) + log["amount_ml"]
+    weekly_chart_data = []
+    for i in range(6, -1, -1):
+        day = today - timedelta(days=i)
+        weekly_chart_data.append({
+            "day_name": day.strftime("%a"),
+            "date": day.strftime("%Y-%m-%d"),
+            "amount_ml": week_totals.get(day.isoformat(), 0)
+        })
+
+    return {
+        "goal_ml": WATER_GOAL_ML,
+        "consumed_ml": total_consumed,
+        "remaining_ml": max(0, WATER_GOAL_ML - total_consumed),
+        "logs": logs,
+        "weekly_chart_data": weekly_chart_data
+    }
+
+
+def weight_section(user, resolution=None, max_points=None):
+    # Single query over hot logs and archived days: every statistic below is derived from this one fetch
+    rows = list(weight_history(user))
+    if not rows:
+        return {
+            "series" if resolution or max_points else "logs": [],
+            "current_weight": 0,
+            "start_weight": 0,
+            "change": 0,
+            "plateau": False
+        }
+
+    ids, dates, weights = zip(*rows)
+    analytics = analyze_weight(dates, weights)
+    moving_avg = analytics.pop("moving_average")
+    trend = analytics.pop("trend")
+
+    if resolution or max_points:
+        # Long histories: ship min/max/mean bands instead of every weigh-in
+        return {"series": downsample(dates, weights, resolution, max_points), **analytics}
+
+    # Archived days have no log id (and can't be deleted)
+    serialized = [
+        {
+            "id": log_id,
+            "weight_kg": weights[i],
+            "date": dates[i].isoformat(),
+            "archived": log_id is None,
+            "moving_average": round(float(moving_avg[i]), 2),
+            "trend": round(float(trend[i]), 2),
+        }
+        for i, log_id in enumerate(ids)
+    ]
+    return {"logs": serialized, **analytics}
+
+
+def activity_section(user, today):
+    logs = log_rows(ExerciseLog.objects.filter(user=user, date=today).order_by('-id'))
+    return {
+        "logs": logs,
+        "total_calories": sum(log["calories_burned"] for log in logs)
+    }
+
+
+def sleep_logs(user, today, days=SLEEP_HISTORY_DAYS):
+    return SleepLog.objects.filter(user=user, date__range=[today - timedelta(days=days), today]).order_by('-date')
+
+
+def sleep_section(user, today, days=SLEEP_HISTORY_DAYS, fields=None):
+    return log_rows(sleep_logs(user, today, days), fields)
+
+
+def build_dashboard(user, profile, today, fields, with_projection=False):
+    """{section: payload} for `fields`; `profile` may be None when no PROFILE_SECTIONS are requested."""
+    ledger = None
+    if 'summary' in fields or 'weekly' in fields:
+        days = max(PROJECTION_WINDOWS) if with_projection else 7
+        ledger = ledger_for(user, profile, today, days)
+
+    builders = {
+        'summary': lambda: summary_section(user, profile, today, ledger, with_projection),
+        'weekly': lambda: weekly_section(user, today, ledger, with_projection),
+        'water': lambda: water_section(user, today),
+        'weight': lambda: weight_section(user),
+        'activity': lambda: activity_section(user, today),
+        'sleep': lambda: sleep_section(user, today),
+    }
+    return {name: builders[name]() for name in fields}
@@ -0,0 +1,120 @@
+"""
+Daily energy ledger: intake, exercise burn, TDEE and net balance per day.
+
+Food and exercise per-day totals come back in a single UNION ALL query,
+so every view that needs "what did the user eat and burn" shares one
+query path instead of aggregating each table (or each day) separately.
+Ranges reaching past the archive cutoff add a third branch over
+DailySummary. history_ledger() builds the same entries from a user's
+history snapshot for views that already load one.
+"""
+from datetime import timedelta
+
+import numpy as np
+from django.db.models import F, FloatField, Sum, Value
+
+from .archive import reaches_archive
+from .models import FoodLog, ExerciseLog, DailySummary
+from .snapshots import COLUMN
+
+KCAL_PER_KG = 7700
+PROJECTION_WINDOWS = (7, 30)
+LEDGER_METRICS = ('calories', 'protein', 'carbs', 'fats', 'calories_burned')
+
+_ZERO = Value(0.0, output_field=FloatField())
+
+
+def _day_totals(user, start, end):
+    food = (
+        FoodLog.objects.filter(user=user, date_eaten__range=[start, end])
+        .values(day=F('date_eaten')).order_by()
+        .annotate(
+            intake=Sum('calories', output_field=FloatField()),
+            protein=Sum('protein'),
+            carbs=Sum('carbs'),
+            fats=Sum('fats'),
+            burned=_ZERO,
+        )
+        .values_list('day', 'intake', 'protein', 'carbs', 'fats', 'burned')
+    )
+    exercise = (
+        ExerciseLog.objects.filter(user=user, date__range=[start, end])
+        .values(day=F('date')).order_by()
+        .annotate(
+            intake=_ZERO,
+            protein=_ZERO,
+            carbs=_ZERO,
+            fats=_ZERO,
+            burned=Sum('calories_burned', output_field=FloatField()),
+        )
+        .values_list('day', 'intake', 'protein', 'carbs', 'fats', 'burned')
+    )
+    if not reaches_archive(user, start):
+        return food.union(exercise, all=True)
+    archived = (
+        DailySummary.objects.filter(user=user, date__range=[start, end])
+        .values_list('date', 'calories', 'protein', 'carbs', 'fats', 'calories_burned')
+    )
+    return food.union(exercise, archived, all=True)
+
+
+def daily_ledger(user, start, end, tdee):
+    """One entry per day from start to end inclusive, zero-filled."""
+    totals = {}
+    for day, intake, protein, carbs, fats, burned in _day_totals(user, start, end):
+        entry = totals.setdefault(day, [0.0, 0.0, 0.0, 0.0, 0.0])
+        entry[0] += intake or 0
+        entry[1] += protein or 0
+        entry[2] += carbs or 0
+        entry[3] += fats or 0
+        entry[4] += burned or 0
+    return _entries(totals, start, end, tdee)
+
+
+def history_ledger(history, start, end, tdee):
+    """daily_ledger() read from a snapshots.History instead of the log tables."""
+    _, matrix = history.window(start, end)
+    values = matrix[:, [COLUMN[name] for name in LEDGER_METRICS]]
+    logged = np.flatnonzero(~np.isnan(values).all(axis=1))
+    totals = {start + timedelta(days=int(i)): row for i, row in zip(logged, np.nan_to_num(values[logged]).tolist())}
+    return _entries(totals, start, end, tdee)
+
+
+def _entries(totals, start, end, tdee):
+    tdee = tdee or 0
+    ledger = []
+    day = start
+    while day <= end:
+        intake, protein, carbs, fats, burned = totals.get(day, (0, 0, 0, 0, 0))
+        ledger.append({
+            "date": day,
+            "intake": int(intake),
+            "protein": protein,
+            "carbs": carbs,
+            "fats": fats,
+            "burned": int(burned),
+            "tdee": tdee,
+            # Positive = surplus, negative = deficit
+            "net": round(intake - burned - tdee, 1),
+        })
+        day += timedelta(days=1)
+    return ledger
+
+
+def projection(ledger, windows=PROJECTION_WINDOWS):
+    """
+    Expected weight change from the trailing net balance. Only days with
+    food logged count; an unlogged day would otherwise look like a full
+    TDEE deficit.
+    """
+    result = {}
+    for window in windows:
+        logged = [entry["net"] for entry in ledger[-window:] if entry["intake"] > 0]
+        net = sum(logged)
+        result[f"{window}d"] = {
+            "logged_days": len(logged),
+            "net_calories": round(net, 1),
+            "avg_daily_net": round(net / len(logged), 1) if logged else 0,
+            "expected_weight_change_kg": round(net / KCAL_PER_KG, 2),
+        }
+    return result
@@ -0,0 +1,95 @@
+"""
+Password hashers with cost parameters taken from settings, plus a
+host-wide limit on how many hashes run at once.
+
+The subclasses keep Django's algorithm names, so existing hashes still
+verify. When the preferred hasher or its cost changes, Django re-hashes the
+password transparently on the user's next successful login.
+
+hashing_slot() takes one of PASSWORD_HASH_CONCURRENCY slots, each an
+exclusive flock() on a file in PASSWORD_HASH_LOCK_DIR, so the limit holds
+across every gunicorn worker on the machine (sync workers serve one
+request per process, where an in-process semaphore never blocks). A slot
+is released by the kernel if its worker dies. Without fcntl (Windows
+development) it falls back to a per-process semaphore.
+"""
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.contrib.auth import hashers
+
+try:
+    import fcntl
+except ImportError:  # not on Windows
+    fcntl = None
+
+
+class TunedScryptPasswordHasher(hashers.ScryptPasswordHasher):
+    work_factor = settings.PASSWORD_SCRYPT_WORK_FACTOR
+
+
+class TunedArgon2PasswordHasher(hashers.Argon2PasswordHasher):
+    time_cost = settings.PASSWORD_ARGON2_TIME_COST
+    memory_cost = settings.PASSWORD_ARGON2_MEMORY_COST
+    parallelism = settings.PASSWORD_ARGON2_PARALLELISM
+
+
+class TunedPBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    iterations = settings.PASSWORD_PBKDF2_ITERATIONS
+
+
+class HashingBusy(Exception):
+    """Raised when no hashing slot frees up within PASSWORD_HASH_WAIT_TIMEOUT."""
+
+
+_POLL_SECONDS = 0.01
+_local_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_CONCURRENCY)
+
+
+def _take_file_slot():
+    """Descriptor of a locked slot file, or None when all slots are taken."""
+    os.makedirs(settings.PASSWORD_HASH_LOCK_DIR, exist_ok=True)
+    for index in range(settings.PASSWORD_HASH_CONCURRENCY):
+        path = os.path.join(settings.PASSWORD_HASH_LOCK_DIR, f"slot-{index}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            continue
+        return fd
+    return None
+
+
+@contextmanager
+def hashing_slot():
+    """
+    Bound concurrent password hashing so a login burst can't take every
+    CPU away from the other endpoints. Usage:
+        with hashing_slot():
+            user.set_password(raw)
+    """
+    if fcntl is None:
+        if not _local_slots.acquire(timeout=settings.PASSWORD_HASH_WAIT_TIMEOUT):
+            raise HashingBusy()
+        try:
+            yield
+        finally:
+            _local_slots.release()
+        return
+
+    deadline = time.monotonic() + settings.PASSWORD_HASH_WAIT_TIMEOUT
+    fd = _take_file_slot()
+    while fd is None:
+        if time.monotonic() >= deadline:
+            raise HashingBusy()
+        time.sleep(_POLL_SECONDS)
+        fd = _take_file_slot()
+    try:
+        yield
+    finally:
+        # Closing the descriptor drops the lock
+        os.close(fd)
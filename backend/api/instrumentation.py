@@ -0,0 +1,144 @@
+"""
+Per-request performance instrumentation.
+
+RequestTimingMiddleware records, for a sampled fraction of requests, the
+wall time, the number and total duration of DB queries (through
+connection.execute_wrapper) and any named sections timed with timed(),
+e.g. Gemini calls and PDF rendering. The numbers are written as one JSON
+log line per request on the "api.performance" logger and, optionally, as
+a Server-Timing response header so they show up in browser dev tools
+(staff users only, unless DEBUG is on).
+Every request (sampled or not) also feeds the request counter and
+latency histogram in api.metrics.
+
+    with timed('gemini'):
+        response = model.generate_content(prompt)
+"""
+import json
+import logging
+import random
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from .metrics import DB_DURATION, DB_QUERIES, HTTP_DURATION, HTTP_REQUESTS
+
+logger = logging.getLogger('api.performance')
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    def __init__(self):
+        self.db_queries = 0
+        self.db_time = 0.0
+        # section name -> [calls, seconds]
+        self.sections = {}
+
+    def add_section(self, name, seconds):
+        entry = self.sections.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += seconds
+
+
+def current_metrics():
+    """Metrics of the request being handled, or None outside a sampled request."""
+    return _current.get()
+
+
+@contextmanager
+def timed(name):
+    """Add the time spent in the block to the current request's `name` section."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        metrics = _current.get()
+        if metrics is not None:
+            metrics.add_section(name, time.perf_counter() - start)
+
+
+def _query_timer(metrics):
+    def wrapper(execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            metrics.db_queries += 1
+            metrics.db_time += time.perf_counter() - start
+    return wrapper
+
+
+def server_timing(total, metrics):
+    parts = [
+        f"total;dur={total * 1000:.1f}",
+        f'db;dur={metrics.db_time * 1000:.1f};desc="{metrics.db_queries} queries"',
+    ]
+    for name, (_, seconds) in metrics.sections.items():
+        parts.append(f"{name};dur={seconds * 1000:.1f}")
+    return ", ".join(parts)
+
+
+class RequestTimingMiddleware:
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PERF_INSTRUMENTATION:
+            return self.get_response(request)
+        if random.random() >= settings.PERF_SAMPLE_RATE:
+            # Not sampled: only the cheap request counter and latency histogram
+            start = time.perf_counter()
+            response = self.get_response(request)
+            self.record(request, response, time.perf_counter() - start)
+            return response
+
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        start = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(_query_timer(metrics)))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        total = time.perf_counter() - start
+
+        if settings.PERF_SERVER_TIMING and (settings.DEBUG or getattr(getattr(request, 'user', None), 'is_staff', False)):
+            response['Server-Timing'] = server_timing(total, metrics)
+        view = self.record(request, response, total)
+        DB_QUERIES.observe(metrics.db_queries, view)
+        DB_DURATION.observe(metrics.db_time, view)
+        self.log(request, response, view, total, metrics)
+        return response
+
+    def record(self, request, response, total):
+        match = request.resolver_match
+        view = match.view_name if match else "unmatched"
+        HTTP_REQUESTS.inc(view, request.method, response.status_code)
+        HTTP_DURATION.observe(total, view, request.method)
+        return view
+
+    def log(self, request, response, view, total, metrics):
+        slow = settings.PERF_SLOW_REQUEST_MS and total * 1000 >= settings.PERF_SLOW_REQUEST_MS
+        level = logging.WARNING if slow else logging.INFO
+        if not logger.isEnabledFor(level):
+            return
+        record = {
+            "method": request.method,
+            "path": request.path,
+            "view": view,
+            "status": response.status_code,
+            "duration_ms": round(total * 1000, 1),
+            "db_queries": metrics.db_queries,
+            "db_ms": round(metrics.db_time * 1000, 1),
+        }
+        for name, (calls, seconds) in metrics.sections.items():
+            record[f"{name}_calls"] = calls
+            record[f"{name}_ms"] = round(seconds * 1000, 1)
+
+        logger.log(level, json.dumps(record))
@@ -0,0 +1,52 @@
+"""
+Per-user calendar days.
+
+Each log stores the user's local date, fixed when the log is written, so
+every day-based query stays a plain (user, date) index lookup instead of
+converting timestamps per row. local_today() is the one place that turns
+"now" into a user's day; views use it wherever they used date.today().
+"""
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from django.utils import timezone
+
+from .models import Profile
+
+DEFAULT_TIMEZONE = "UTC"
+
+
+def is_valid_timezone(name):
+    try:
+        ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return False
+    return True
+
+
+def now_in(timezone_name):
+    # ZoneInfo caches instances, so this is a dict lookup after the first call
+    return timezone.now().astimezone(ZoneInfo(timezone_name or DEFAULT_TIMEZONE))
+
+
+def today_in(timezone_name):
+    return now_in(timezone_name).date()
+
+
+def earliest_today():
+    """The earliest calendar day anywhere right now (UTC-12): no user's today is before it."""
+    return today_in("Etc/GMT+12")
+
+
+def local_today(user):
+    """Today in the user's timezone (UTC for users without a profile)."""
+    try:
+        timezone_name = user.profile.timezone
+    except Profile.DoesNotExist:
+        timezone_name = DEFAULT_TIMEZONE
+    return today_in(timezone_name)
+
+
+def local_today_for(user_id):
+    """local_today() by id, for code without a loaded user (one query)."""
+    timezone_name = Profile.objects.filter(user_id=user_id).values_list('timezone', flat=True).first()
+    return today_in(timezone_name)
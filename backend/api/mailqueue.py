@@ -0,0 +1,117 @@
+"""
+In-process outbound email queue.
+
+Views enqueue messages and return immediately; a daemon thread drains the
+queue in batches over one reused backend connection
+(get_connection() + send_messages), retrying the messages of a batch that
+weren't sent yet with backoff and capping the send rate. flush() drains
+synchronously; tests call it with the locmem backend, and it is registered
+with atexit so a clean interpreter exit doesn't drop queued mail.
+"""
+import atexit
+import logging
+import queue
+import threading
+import time
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+
+logger = logging.getLogger(__name__)
+
+
+class MailQueue:
+    def __init__(self, batch_size, max_size, max_retries, retry_delay, rate_limit):
+        self.batch_size = batch_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.rate_limit = rate_limit
+        self._queue = queue.Queue(maxsize=max_size)
+        self._send_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._worker = None
+
+    def enqueue(self, subject, body, from_email, recipient_list):
+        message = EmailMessage(subject, body, from_email, recipient_list)
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            logger.error("Mail queue full, dropping message to %s", recipient_list)
+            return False
+        self._ensure_worker()
+        return True
+
+    def pending(self):
+        return self._queue.qsize()
+
+    def flush(self):
+        """Send everything queued so far and wait for in-flight batches."""
+        while True:
+            batch = self._take_batch(block=False)
+            if not batch:
+                break
+            self._send(batch)
+        self._queue.join()
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target=self._run, name="mail-queue", daemon=True)
+                self._worker.start()
+
+    def _take_batch(self, block):
+        batch = []
+        try:
+            batch.append(self._queue.get(block=block, timeout=1 if block else None))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch(block=True)
+            if batch:
+                self._send(batch)
+
+    def _send(self, batch):
+        # One connection per attempt; messages go out one at a time so a
+        # retry only resends what wasn't delivered. The lock keeps flush()
+        # and the worker from interleaving sends
+        with self._send_lock:
+            started = time.monotonic()
+            unsent = list(batch)
+            for attempt in range(self.max_retries + 1):
+                try:
+                    with get_connection() as connection:
+                        while unsent:
+                            connection.send_messages(unsent[:1])
+                            unsent.pop(0)
+                    break
+                except Exception:
+                    if attempt == self.max_retries:
+                        logger.exception("Dropping %d queued emails after %d attempts", len(unsent), attempt + 1)
+                        break
+                    time.sleep(self.retry_delay * (2 ** attempt))
+
+            for _ in batch:
+                self._queue.task_done()
+
+            # Rate limit: a batch of n messages takes at least n / rate seconds
+            if self.rate_limit:
+                remaining = len(batch) / self.rate_limit - (time.monotonic() - started)
+                if remaining > 0:
+                    time.sleep(remaining)
+
+
+mail_queue = MailQueue(
+    batch_size=settings.EMAIL_QUEUE_BATCH_SIZE,
+    max_size=settings.EMAIL_QUEUE_MAX_SIZE,
+    max_retries=settings.EMAIL_QUEUE_MAX_RETRIES,
+    retry_delay=settings.EMAIL_QUEUE_RETRY_DELAY,
+    rate_limit=settings.EMAIL_QUEUE_RATE_LIMIT,
+)
+atexit.register(mail_queue.flush)
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from api.archive import MIN_RETENTION_DAYS, archive_before, archive_cutoff
+from api.localtime import earliest_today
+
+
+class Command(BaseCommand):
+    help = "Roll logs older than LOG_RETENTION_DAYS into per-day summaries and delete them (run nightly)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=200, help="Users per transaction")
+
+    def handle(self, *args, **options):
+        if settings.LOG_RETENTION_DAYS < MIN_RETENTION_DAYS:
+            raise CommandError(f"LOG_RETENTION_DAYS must be at least {MIN_RETENTION_DAYS}")
+
+        # From the earliest local date anywhere, so no archived day is on or
+        # after any user's own cutoff (see reaches_archive)
+        cutoff = archive_cutoff(earliest_today())
+
+        def progress(done, result):
+            self.stdout.write(f"  {done} users, {result['days']:,} days, {result['rows']:,} rows")
+
+        result = archive_before(cutoff, batch_size=options['batch_size'], progress=progress)
+        self.stdout.write(
+            f"Archived {result['rows']:,} log rows before {cutoff} into {result['days']:,} "
+            f"daily summaries for {result['users']} users"
+        )
@@ -0,0 +1,52 @@
+import time
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+
+from api.streaks import rebuild_all
+from api.synthetic import DEFAULT_PASSWORD, DEFAULT_PREFIX, check_prefix, generate
+
+
+class Command(BaseCommand):
+    help = "Generate synthetic users with years of food/water/weight/exercise/sleep logs (deterministic per --seed)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--years', type=float, default=2, help="History length per user")
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--batch-size', type=int, default=10000, help="Rows per INSERT batch")
+        parser.add_argument('--prefix', default=DEFAULT_PREFIX, help="Username prefix (at least 4 characters)")
+        parser.add_argument('--replace', action='store_true', help="Delete existing users with the prefix first")
+        parser.add_argument('--password', default=DEFAULT_PASSWORD)
+        parser.add_argument('--skip-streaks', action='store_true', help="Don't rebuild streak counters afterwards")
+
+    def handle(self, *args, **options):
+        prefix = options['prefix']
+        try:
+            check_prefix(prefix)
+        except ValueError as e:
+            raise CommandError(str(e))
+        if not options['replace'] and User.objects.filter(username__startswith=prefix).exists():
+            raise CommandError(f"Users with the prefix {prefix!r} already exist; pass --replace to delete them first")
+
+        start = time.perf_counter()
+        users = options['users']
+        step = max(users // 10, 1)
+
+        def progress(done, rows):
+            if done % step == 0 or done == users:
+                self.stdout.write(f"  {done}/{users} users, {rows:,} rows")
+
+        result = generate(
+            users, int(options['years'] * 365), seed=options['seed'], prefix=prefix,
+            password=options['password'], batch_size=options['batch_size'], progress=progress,
+            replace=options['replace'],
+        )
+        if not options['skip_streaks']:
+            rebuild_all()
+
+        elapsed = time.perf_counter() - start
+        total = sum(result['rows'].values())
+        for model, count in result['rows'].items():
+            self.stdout.write(f"  {model:<12}{count:>14,}")
+        self.stdout.write(f"Generated {total:,} log rows for {users} users in {elapsed:.1f}s ({total / elapsed:,.0f} rows/s)")
@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from api.streaks import rebuild_all, repair
+
+
+class Command(BaseCommand):
+    help = (
+        "Recompute logging streak and monthly adherence counters flagged with needs_repair, "
+        "and store them for users without any yet (run nightly)."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000, help="Rows per upsert")
+        parser.add_argument('--all', action='store_true', help="Recompute every user's counters")
+
+    def handle(self, *args, **options):
+        rebuild = rebuild_all if options['all'] else repair
+        written = rebuild(batch_size=options['batch_size'])
+        self.stdout.write(f"Rebuilt streak counters for {written} users")
@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.reminders import get_backend, send_reminders
+
+
+class Command(BaseCommand):
+    help = "Send logging reminders to opted-in users who haven't logged food/water today."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--loop', action='store_true', help="Keep running, one tick every --interval seconds")
+        parser.add_argument('--interval', type=int, default=900, help="Seconds between ticks in --loop mode")
+        parser.add_argument('--batch-size', type=int, default=None, help="Profiles per page/delivery batch")
+        parser.add_argument('--backend', default=None, help="Dotted path of a reminder backend class")
+
+    def handle(self, *args, **options):
+        while True:
+            sent = send_reminders(
+                backend=get_backend(options['backend']),
+                batch_size=options['batch_size'],
+            )
+            self.stdout.write(f"Sent {sent} reminders")
+
+            if not options['loop']:
+                break
+            time.sleep(options['interval'])
@@ -0,0 +1,234 @@
+"""
+Dependency-free metrics registry rendered in the Prometheus text format.
+
+Counters and histograms are plain dicts keyed by label values behind one
+lock per metric, so recording is a dict lookup and a few additions.
+Values are per process: with several gunicorn workers each scrape sees
+the worker that answered it (scrape per worker or aggregate by instance).
+
+Cache hit ratios are not recorded here; they are read from the existing
+cache counters when /metrics is scraped.
+"""
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from .authentication import token_cache
+from .cache import cache_stats
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+GEMINI_BUCKETS = (0.25, 0.5, 1, 2, 4, 8, 15, 30, 60)
+QUERY_COUNT_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+
+def _labels(names, values):
+    if not names:
+        return ""
+    pairs = ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _number(value):
+    if value == float("inf"):
+        return "+Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labelvalues, amount=1):
+        with self._lock:
+            self._values[labelvalues] = self._values.get(labelvalues, 0) + amount
+
+    def samples(self):
+        with self._lock:
+            values = dict(self._values)
+        for labelvalues, value in sorted(values.items()):
+            yield self.name, _labels(self.labelnames, labelvalues), value
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        # labelvalues -> [per-bucket counts (+Inf last), sum, count]
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value, *labelvalues):
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            entry = self._values.get(labelvalues)
+            if entry is None:
+                entry = self._values[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            entry[0][index] += 1
+            entry[1] += value
+            entry[2] += 1
+
+    @contextmanager
+    def time(self, *labelvalues):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, *labelvalues)
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(counts), total, count) for key, (counts, total, count) in self._values.items()}
+        names = self.labelnames + ("le",)
+        for labelvalues, (counts, total, count) in sorted(values.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                yield f"{self.name}_bucket", _labels(names, labelvalues + (_number(bound),)), cumulative
+            yield f"{self.name}_sum", _labels(self.labelnames, labelvalues), total
+            yield f"{self.name}_count", _labels(self.labelnames, labelvalues), count
+
+    def clear(self):
+        with self._lock:
+            self._values.clear()
+
+
+class Collected:
+    """Metric whose values are read at scrape time: collect() -> {labelvalues: value}."""
+
+    def __init__(self, name, documentation, type, labelnames=(), collect=None):
+        self.name = name
+        self.documentation = documentation
+        self.type = type
+        self.labelnames = tuple(labelnames)
+        self.collect = collect
+
+    def samples(self):
+        for labelvalues, value in sorted(self.collect().items()):
+            yield self.name, _labels(self.labelnames, labelvalues), value
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        lines = []
+        for metric in self._metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{labels} {_number(value)}")
+        return "\n".join(lines) + "\n"
+
+    def clear(self):
+        for metric in self._metrics:
+            if hasattr(metric, "clear"):
+                metric.clear()
+
+
+registry = Registry()
+
+# HTTP (every request, see instrumentation.RequestTimingMiddleware)
+HTTP_REQUESTS = registry.register(Counter(
+    "fitguide_http_requests_total", "HTTP requests by view, method and status.",
+    ("view", "method", "status"),
+))
+HTTP_DURATION = registry.register(Histogram(
+    "fitguide_http_request_duration_seconds", "Request wall time by view.",
+    ("view", "method"),
+))
+
+# Database (sampled requests only)
+DB_QUERIES = registry.register(Histogram(
+    "fitguide_db_queries_per_request", "DB queries per sampled request by view.",
+    ("view",), buckets=QUERY_COUNT_BUCKETS,
+))
+DB_DURATION = registry.register(Histogram(
+    "fitguide_db_duration_seconds", "Total DB time per sampled request by view.",
+    ("view",),
+))
+
+# Gemini
+GEMINI_CALLS = registry.register(Counter(
+    "fitguide_gemini_calls_total", "Gemini calls by caller and outcome (ok/error).",
+    ("caller", "outcome"),
+))
+GEMINI_DURATION = registry.register(Histogram(
+    "fitguide_gemini_duration_seconds", "Gemini call latency by caller.",
+    ("caller",), buckets=GEMINI_BUCKETS,
+))
+GEMINI_TOKENS = registry.register(Counter(
+    "fitguide_gemini_tokens_total", "Gemini tokens by caller and kind (prompt/completion).",
+    ("caller", "kind"),
+))
+
+# PDF report
+PDF_RENDER_DURATION = registry.register(Histogram(
+    "fitguide_pdf_render_duration_seconds", "Monthly report PDF rendering time.",
+    buckets=(0.1, 0.25, 0.5, 1, 2, 4, 8, 15),
+))
+
+
+def observe_gemini(caller, seconds, response=None, error=False):
+    GEMINI_CALLS.inc(caller, "error" if error else "ok")
+    GEMINI_DURATION.observe(seconds, caller)
+    usage = getattr(response, "usage_metadata", None)
+    if usage is not None:
+        GEMINI_TOKENS.inc(caller, "prompt", amount=getattr(usage, "prompt_token_count", 0) or 0)
+        GEMINI_TOKENS.inc(caller, "completion", amount=getattr(usage, "candidates_token_count", 0) or 0)
+
+
+def _response_cache_ratios():
+    return {(endpoint,): counts["hit_rate"] for endpoint, counts in cache_stats()["endpoints"].items()}
+
+
+def _response_cache_counts():
+    values = {}
+    for endpoint, counts in cache_stats()["endpoints"].items():
+        values[(endpoint, "hit")] = counts["hits"]
+        values[(endpoint, "miss")] = counts["misses"]
+    return values
+
+
+def _token_cache_ratio():
+    hits, misses = token_cache.hits, token_cache.misses
+    return {(): round(hits / (hits + misses), 3) if hits + misses else 0.0}
+
+
+registry.register(Collected(
+    "fitguide_response_cache_lookups_total", "Response cache lookups by endpoint and result.",
+    "counter", ("endpoint", "result"), collect=_response_cache_counts,
+))
+registry.register(Collected(
+    "fitguide_response_cache_hit_ratio", "Response cache hit ratio by endpoint.",
+    "gauge", ("endpoint",), collect=_response_cache_ratios,
+))
+registry.register(Collected(
+    "fitguide_token_cache_hit_ratio", "Authentication token cache hit ratio.",
+    "gauge", collect=_token_cache_ratio,
+))
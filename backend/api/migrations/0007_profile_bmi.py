@@ -0,0 +1,44 @@
+from django.db import migrations, models
+
+# Frozen copy of api.profile_metrics as of this migration, so later formula
+# changes don't alter what it does
+DERIVED_FIELDS = ('tdee', 'daily_calorie_target', 'bmi')
+GOAL_ADJUSTMENT = {'Lose': -500, 'Maintain': 0, 'Gain': 500}
+
+
+def compute_metrics(profile):
+    # Mifflin-St Jeor Equation
+    bmr = (10 * profile.weight_kg) + (6.25 * profile.height_cm) - (5 * profile.age)
+    bmr = bmr + 5 if profile.gender == 'Male' else bmr - 161
+    tdee = bmr * float(profile.activity_level)
+    target = tdee + GOAL_ADJUSTMENT.get(profile.goal, 0)
+    bmi = None
+    if profile.height_cm and profile.height_cm > 0:
+        height_m = profile.height_cm / 100
+        bmi = round(profile.weight_kg / (height_m * height_m), 1)
+    return {"tdee": round(tdee, 2), "daily_calorie_target": round(target, 2), "bmi": bmi}
+
+
+def populate_metrics(apps, schema_editor):
+    # Weight logs used to update weight_kg without refreshing tdee/target
+    Profile = apps.get_model('api', 'Profile')
+    for profile in Profile.objects.all():
+        for name, value in compute_metrics(profile).items():
+            setattr(profile, name, value)
+        profile.save(update_fields=list(DERIVED_FIELDS))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_profile_reminders_enabled'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='bmi',
+            field=models.FloatField(blank=True, null=True),
+        ),
+        migrations.RunPython(populate_metrics, migrations.RunPython.noop),
+    ]
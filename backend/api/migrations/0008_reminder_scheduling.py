@@ -0,0 +1,32 @@
+# Generated by Django 5.2.18 on 2026-10-19 14:46
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0007_profile_bmi'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='last_reminder_date',
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='foodlog',
+            index=models.Index(fields=['user', 'date_eaten'], name='api_foodlog_user_id_f72322_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='profile',
+            index=models.Index(fields=['reminders_enabled', 'last_reminder_date'], name='api_profile_reminde_cf68a5_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='waterlog',
+            index=models.Index(fields=['user', 'date_eaten'], name='api_waterlo_user_id_9664fa_idx'),
+        ),
+    ]
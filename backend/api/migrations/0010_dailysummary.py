@@ -0,0 +1,60 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:11
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_loggingstreak'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DailySummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('calories', models.IntegerField(blank=True, null=True)),
+                ('protein', models.FloatField(blank=True, null=True)),
+                ('carbs', models.FloatField(blank=True, null=True)),
+                ('fats', models.FloatField(blank=True, null=True)),
+                ('water_ml', models.IntegerField(blank=True, null=True)),
+                ('calories_burned', models.IntegerField(blank=True, null=True)),
+                ('exercise_minutes', models.IntegerField(blank=True, null=True)),
+                ('weight_kg', models.FloatField(blank=True, null=True)),
+                ('bedtime', models.TimeField(blank=True, null=True)),
+                ('wake_time', models.TimeField(blank=True, null=True)),
+                ('sleep_minutes', models.IntegerField(blank=True, null=True)),
+                ('sleep_quality', models.FloatField(blank=True, null=True)),
+                ('deep_sleep_minutes', models.IntegerField(blank=True, null=True)),
+                ('light_sleep_minutes', models.IntegerField(blank=True, null=True)),
+                ('rem_sleep_minutes', models.IntegerField(blank=True, null=True)),
+                ('awake_minutes', models.IntegerField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='exerciselog',
+            index=models.Index(fields=['user', 'date'], name='api_exercis_user_id_7efddb_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='sleeplog',
+            index=models.Index(fields=['user', 'date'], name='api_sleeplo_user_id_a4b0e4_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='weightlog',
+            index=models.Index(fields=['user', 'date'], name='api_weightl_user_id_5416a5_idx'),
+        ),
+        migrations.AddField(
+            model_name='dailysummary',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_summaries', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddConstraint(
+            model_name='dailysummary',
+            constraint=models.UniqueConstraint(fields=('user', 'date'), name='unique_daily_summary'),
+        ),
+    ]
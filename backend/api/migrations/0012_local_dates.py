@@ -0,0 +1,43 @@
+# Generated by Django 5.2.18 on 2026-10-19 15:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_historysnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='timezone',
+            field=models.CharField(default='UTC', max_length=64),
+        ),
+        migrations.AlterField(
+            model_name='exerciselog',
+            name='date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='foodlog',
+            name='date_eaten',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='sleeplog',
+            name='date',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='waterlog',
+            name='date_eaten',
+            field=models.DateField(),
+        ),
+        migrations.AlterField(
+            model_name='weightlog',
+            name='date',
+            field=models.DateField(),
+        ),
+    ]
@@ -1,5 +1,6 @@
 from django.db import models
 from django.contrib.auth.models import User
+from . import profile_metrics
 
 class Profile(models.Model):
     GENDER_CHOICES = [
@@ -31,11 +32,39 @@ class Profile(models.Model):
     
     tdee = models.FloatField(blank=True, null=True)
     daily_calorie_target = models.FloatField(blank=True, null=True)
+    bmi = models.FloatField(blank=True, null=True)
     reminders_enabled = models.BooleanField(default=False)
+    last_reminder_date = models.DateField(blank=True, null=True)
+    # IANA name; "today" and every log date follow this calendar (see localtime.py)
+    timezone = models.CharField(max_length=64, default='UTC')
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['reminders_enabled', 'last_reminder_date']),
+        ]
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Reading a deferred input here would refresh_from_db() -> from_db() again;
+        # without a snapshot the next save() recomputes the metrics instead
+        if instance.get_deferred_fields().isdisjoint(profile_metrics.METRIC_INPUTS):
+            instance._loaded_metric_inputs = profile_metrics.metric_inputs(instance)
+        else:
+            instance._loaded_metric_inputs = None
+        return instance
+
+    def save(self, *args, **kwargs):
+        # Keep tdee / target / bmi in step with their inputs in the same write
+        self._metrics_changed = profile_metrics.refresh_metrics(self)
+        if self._metrics_changed and kwargs.get('update_fields') is not None:
+            kwargs['update_fields'] = set(kwargs['update_fields']) | set(profile_metrics.DERIVED_FIELDS)
+        super().save(*args, **kwargs)
+        self._loaded_metric_inputs = profile_metrics.metric_inputs(self)
+
 class FoodLog(models.Model):
     MEAL_CHOICES = [
         ('Breakfast', 'Breakfast'),
@@ -50,16 +79,26 @@ class FoodLog(models.Model):
     protein = models.FloatField()
     carbs = models.FloatField()
     fats = models.FloatField()
-    date_eaten = models.DateField(auto_now_add=True)
+    date_eaten = models.DateField()  # user's local date, set on write
     meal_type = models.CharField(max_length=20, choices=MEAL_CHOICES)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date_eaten']),
+        ]
+
     def __str__(self):
         return f"{self.food_name} ({self.calories} cal)"
 
 class WaterLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='water_logs')
     amount_ml = models.IntegerField()
-    date_eaten = models.DateField(auto_now_add=True)
+    date_eaten = models.DateField()  # user's local date, set on write
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date_eaten']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.amount_ml}ml - {self.date_eaten}"
@@ -67,7 +106,12 @@ class WaterLog(models.Model):
 class WeightLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='weight_logs')
     weight_kg = models.FloatField()
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField()  # user's local date, set on write
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.weight_kg}kg - {self.date}"
@@ -85,14 +129,19 @@ class ExerciseLog(models.Model):
     description = models.CharField(max_length=255, blank=True)
     duration_minutes = models.IntegerField()
     calories_burned = models.IntegerField()
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField()  # user's local date, set on write
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
 
     def __str__(self):
         return f"{self.user.username} - {self.exercise_type} ({self.duration_minutes}m)"
 
 class SleepLog(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='sleep_logs')
-    date = models.DateField(auto_now_add=True)
+    date = models.DateField()  # user's local date, set on write
     bedtime = models.TimeField()
     wake_time = models.TimeField()
     duration_minutes = models.IntegerField()
@@ -104,5 +153,83 @@ class SleepLog(models.Model):
     rem_sleep_minutes = models.IntegerField(default=0)
     awake_minutes = models.IntegerField(default=0)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'date']),
+        ]
+
     def __str__(self):
         return f"{self.user.username} - {self.duration_minutes}m ({self.date})"
+
+class LoggingStreak(models.Model):
+    """Food-logging streak and current-month adherence counters (see streaks.py)."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='streak')
+    current_streak = models.IntegerField(default=0)
+    longest_streak = models.IntegerField(default=0)
+    last_logged_date = models.DateField(blank=True, null=True)
+
+    # Adherence counters for the month starting on `month`
+    month = models.DateField(blank=True, null=True)
+    month_logged_days = models.IntegerField(default=0)
+    month_met_target_days = models.IntegerField(default=0)
+
+    needs_repair = models.BooleanField(default=False)
+
+    def __str__(self):
+        return f"{self.user.username} - {self.current_streak} day streak"
+
+class DailySummary(models.Model):
+    """
+    One archived day of a user's logs (see archive.py). Metric columns are
+    null when nothing of that kind was logged that day.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name='daily_summaries')
+    date = models.DateField()
+
+    # Food totals
+    calories = models.IntegerField(blank=True, null=True)
+    protein = models.FloatField(blank=True, null=True)
+    carbs = models.FloatField(blank=True, null=True)
+    fats = models.FloatField(blank=True, null=True)
+
+    water_ml = models.IntegerField(blank=True, null=True)
+
+    calories_burned = models.IntegerField(blank=True, null=True)
+    exercise_minutes = models.IntegerField(blank=True, null=True)
+
+    # Last weigh-in of the day
+    weight_kg = models.FloatField(blank=True, null=True)
+
+    # Sleep: durations summed, quality averaged, clock times of the longest night
+    bedtime = models.TimeField(blank=True, null=True)
+    wake_time = models.TimeField(blank=True, null=True)
+    sleep_minutes = models.IntegerField(blank=True, null=True)
+    sleep_quality = models.FloatField(blank=True, null=True)
+    deep_sleep_minutes = models.IntegerField(blank=True, null=True)
+    light_sleep_minutes = models.IntegerField(blank=True, null=True)
+    rem_sleep_minutes = models.IntegerField(blank=True, null=True)
+    awake_minutes = models.IntegerField(blank=True, null=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['user', 'date'], name='unique_daily_summary'),
+        ]
+
+    def __str__(self):
+        return f"{self.user.username} - {self.date}"
+
+class HistorySnapshot(models.Model):
+    """Per-user daily metrics packed as a float64 matrix (see snapshots.py)."""
+    user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='history_snapshot')
+    start = models.DateField()
+    # Comma-separated column names; a mismatch with snapshots.METRICS forces a rebuild
+    metrics = models.CharField(max_length=255)
+    data = models.BinaryField()
+
+    # Earliest day changed by log writes since the matrix was last refreshed,
+    # and a write counter so a refresh never clears a change it didn't see
+    dirty_from = models.DateField(blank=True, null=True)
+    writes = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f"{self.user.username} - history from {self.start}"
@@ -0,0 +1,75 @@
+"""
+Derived profile metrics (BMR / TDEE / calorie target / BMI).
+
+Profile.save() calls refresh_metrics() so the derived columns are written
+in the same UPDATE as the inputs that changed, and read views can use the
+stored values instead of recomputing them per request.
+"""
+
+METRIC_INPUTS = ('gender', 'age', 'height_cm', 'weight_kg', 'activity_level', 'goal')
+DERIVED_FIELDS = ('tdee', 'daily_calorie_target', 'bmi')
+
+GOAL_ADJUSTMENT = {
+    'Lose': -500,
+    'Maintain': 0,
+    'Gain': 500,
+}
+
+
+def compute_bmr(gender, weight_kg, height_cm, age):
+    # Mifflin-St Jeor Equation
+    bmr = (10 * weight_kg) + (6.25 * height_cm) - (5 * age)
+    return bmr + 5 if gender == 'Male' else bmr - 161
+
+
+def compute_bmi(weight_kg, height_cm):
+    if not height_cm or height_cm <= 0:
+        return None
+    height_m = height_cm / 100
+    return round(weight_kg / (height_m * height_m), 1)
+
+
+def bmi_category(bmi):
+    if bmi is None:
+        return None
+    if bmi < 18.5:
+        return "Underweight"
+    if bmi < 25:
+        return "Normal"
+    if bmi < 30:
+        return "Overweight"
+    return "Obese"
+
+
+def compute_metrics(profile):
+    bmr = compute_bmr(profile.gender, profile.weight_kg, profile.height_cm, profile.age)
+    tdee = bmr * float(profile.activity_level)
+    target = tdee + GOAL_ADJUSTMENT.get(profile.goal, 0)
+    return {
+        "tdee": round(tdee, 2),
+        "daily_calorie_target": round(target, 2),
+        "bmi": compute_bmi(profile.weight_kg, profile.height_cm),
+    }
+
+
+def metric_inputs(profile):
+    return tuple(getattr(profile, name) for name in METRIC_INPUTS)
+
+
+def refresh_metrics(profile):
+    """
+    Recompute derived fields only if an input changed since the profile was
+    loaded (or the cached values or the loaded snapshot are missing). Returns
+    True if anything changed.
+    """
+    loaded = getattr(profile, '_loaded_metric_inputs', None)
+    missing = any(getattr(profile, name) is None for name in DERIVED_FIELDS)
+    if not missing and loaded is not None and loaded == metric_inputs(profile):
+        return False
+
+    changed = False
+    for name, value in compute_metrics(profile).items():
+        if getattr(profile, name) != value:
+            setattr(profile, name, value)
+            changed = True
+    return changed
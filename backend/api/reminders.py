@@ -0,0 +1,152 @@
+"""
+Daily logging reminders for profiles with reminders_enabled.
+
+Each tick pages through opted-in profiles that haven't been reminded today
+and are missing a food or water log for today, "today" being each
+timezone's local date. A timezone is only handled once its local time is
+past REMINDER_LOCAL_HOUR, so nobody is reminded right after midnight about
+a day that just started. Every page is a single
+set-based query (keyset on profile id, EXISTS subqueries against the
+indexed log tables), so cost grows with pages, not with per-user lookups.
+Reminders go to a pluggable delivery backend in batches and the page is
+marked with one UPDATE.
+"""
+import logging
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef, Q
+from django.utils.module_loading import import_string
+
+from .localtime import now_in
+from .mailqueue import mail_queue
+from .models import Profile, FoodLog, WaterLog
+
+logger = logging.getLogger(__name__)
+
+
+class BaseReminderBackend:
+    def send_batch(self, reminders):
+        """Deliver a list of reminder dicts (user_id, username, email, missing)."""
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+
+class ConsoleReminderBackend(BaseReminderBackend):
+    """Writes reminders to `stream` if given, else to the module logger (development)."""
+
+    def __init__(self, stream=None):
+        self.stream = stream
+
+    def send_batch(self, reminders):
+        for reminder in reminders:
+            line = f"Reminder for {reminder['username']}: log your {' and '.join(reminder['missing'])} today"
+            if self.stream is not None:
+                self.stream.write(line + "\n")
+            else:
+                logger.info(line)
+
+
+class LocmemReminderBackend(BaseReminderBackend):
+    """Local stand-in that keeps delivered reminders in memory (tests, dry runs)."""
+    outbox = []
+
+    def send_batch(self, reminders):
+        LocmemReminderBackend.outbox.extend(reminders)
+
+
+class EmailReminderBackend(BaseReminderBackend):
+    def send_batch(self, reminders):
+        for reminder in reminders:
+            if not reminder['email']:
+                continue
+            mail_queue.enqueue(
+                "FitGuide reminder",
+                f"Hello {reminder['username']},\n\n"
+                f"You haven't logged your {' and '.join(reminder['missing'])} today. "
+                f"A quick entry keeps your streak going!",
+                settings.DEFAULT_FROM_EMAIL,
+                [reminder['email']],
+            )
+
+    def close(self):
+        mail_queue.flush()
+
+
+def get_backend(path=None):
+    return import_string(path or settings.REMINDER_BACKEND)()
+
+
+def due_reminders(day):
+    """Opted-in profiles missing a food or water log on `day`, not yet reminded."""
+    return (
+        Profile.objects
+        .filter(reminders_enabled=True)
+        .exclude(last_reminder_date=day)
+        .annotate(
+            logged_food=Exists(FoodLog.objects.filter(user=OuterRef('user_id'), date_eaten=day)),
+            logged_water=Exists(WaterLog.objects.filter(user=OuterRef('user_id'), date_eaten=day)),
+        )
+        .filter(Q(logged_food=False) | Q(logged_water=False))
+        .order_by('pk')
+    )
+
+
+def due_timezones():
+    """(local date, filters) for every opted-in timezone whose local hour has reached REMINDER_LOCAL_HOUR."""
+    timezones = Profile.objects.filter(reminders_enabled=True).values_list('timezone', flat=True).distinct()
+    groups = []
+    for name in timezones:
+        local = now_in(name)
+        if local.hour >= settings.REMINDER_LOCAL_HOUR:
+            groups.append((local.date(), {"timezone": name}))
+    return groups
+
+
+def send_reminders(day=None, backend=None, batch_size=None):
+    """
+    Run one scheduler tick for `day`, or by default for the local date of
+    each timezone that is past REMINDER_LOCAL_HOUR. Returns the number of
+    reminders handed to the backend.
+    """
+    backend = backend or get_backend()
+    batch_size = batch_size or settings.REMINDER_BATCH_SIZE
+    if day is None:
+        groups = due_timezones()
+    else:
+        groups = [(day, {})]
+
+    sent = 0
+    try:
+        for group_day, filters in groups:
+            sent += _send_day(group_day, filters, backend, batch_size)
+    finally:
+        backend.close()
+    return sent
+
+
+def _send_day(day, filters, backend, batch_size):
+    queryset = due_reminders(day).filter(**filters).values_list(
+        'pk', 'user_id', 'user__username', 'user__email', 'logged_food', 'logged_water'
+    )
+
+    sent = 0
+    last_pk = 0
+    while True:
+        page = list(queryset.filter(pk__gt=last_pk)[:batch_size])
+        if not page:
+            break
+        last_pk = page[-1][0]
+
+        reminders = []
+        for _, user_id, username, email, logged_food, logged_water in page:
+            missing = [name for name, done in (('food', logged_food), ('water', logged_water)) if not done]
+            reminders.append({"user_id": user_id, "username": username, "email": email, "missing": missing})
+
+        backend.send_batch(reminders)
+        Profile.objects.filter(pk__in=[row[0] for row in page]).update(last_reminder_date=day)
+        sent += len(reminders)
+
+    logger.info("Sent %d reminders for %s %s", sent, day, filters.get("timezone", ""))
+    return sent
@@ -0,0 +1,36 @@
+"""
+JSON rendering for API responses.
+
+FastJSONRenderer encodes with orjson when it is installed (pip install
+orjson). orjson builds the bytes in one pass in native code instead of
+going through json.dumps with DRF's encoder, which matters for the big
+payloads (monthly daily_stats, weight history, exports). Without orjson,
+or when a client asks for indented output, it is DRF's JSONRenderer.
+
+The output matches JSONRenderer for everything the views return: compact
+separators, UTF-8 without \\u escapes, ISO 8601 dates and times, numpy
+scalars and arrays as numbers and lists. Anything orjson can't encode
+natively goes through DRF's encoder. One difference: NaN is written as
+null, where JSONRenderer raises.
+"""
+from rest_framework.renderers import JSONRenderer
+from rest_framework.utils.encoders import JSONEncoder
+
+try:
+    import orjson
+except ImportError:  # optional dependency
+    orjson = None
+
+if orjson is not None:
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_UTC_Z
+
+_fallback = JSONEncoder().default
+
+
+class FastJSONRenderer(JSONRenderer):
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if orjson is None or data is None:
+            return super().render(data, accepted_media_type, renderer_context)
+        if self.get_indent(accepted_media_type, renderer_context or {}):
+            return super().render(data, accepted_media_type, renderer_context)
+        return orjson.dumps(data, default=_fallback, option=OPTIONS)
@@ -0,0 +1,54 @@
+"""
+Read-only log rows for list responses.
+
+A ModelSerializer pushes every field of every row through a Field
+instance (source lookup, to_representation), which dominates the cost of
+large list responses. log_rows() reads the columns straight from
+.values() and only converts the date and time columns, producing the
+same JSON as the model serializers without the redundant `user` column.
+The model serializers remain the write path (validation, create
+responses).
+"""
+from functools import cache
+
+from django.db.models import DateField, TimeField
+
+
+@cache
+def row_fields(model):
+    """Columns of `model` in list responses: every concrete field except the owning user."""
+    return tuple(field.attname for field in model._meta.concrete_fields if field.name != 'user')
+
+
+@cache
+def _isoformat_fields(model):
+    # DRF renders dates and times as ISO 8601 strings; everything else is already JSON-ready
+    return frozenset(
+        field.attname for field in model._meta.concrete_fields
+        if isinstance(field, (DateField, TimeField))
+    )
+
+
+def select_fields(model, value):
+    """Columns named in ?fields=a,b (in model order; all when missing). ValueError on unknown names."""
+    available = row_fields(model)
+    if value is None:
+        return available
+    names = {name.strip() for name in value.split(',') if name.strip()}
+    if not names or names.difference(available):
+        raise ValueError(f"'fields' must be a comma-separated subset of: {', '.join(available)}")
+    return tuple(name for name in available if name in names)
+
+
+def log_rows(queryset, fields=None):
+    """List of dicts for `queryset`, like <Model>Serializer(many=True).data minus `user`."""
+    fields = fields or row_fields(queryset.model)
+    convert = _isoformat_fields(queryset.model).intersection(fields)
+    rows = list(queryset.values(*fields))
+    if convert:
+        for row in rows:
+            for name in convert:
+                value = row[name]
+                if value is not None:
+                    row[name] = value.isoformat()
+    return rows
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import Profile, FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog
 from django.contrib.auth.models import User
+from .localtime import is_valid_timezone
 
 class ProfileSerializer(serializers.ModelSerializer):
     username = serializers.CharField(source='user.username', read_only=True)
@@ -10,9 +11,14 @@ class ProfileSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'username', 'gender', 'age', 'height_cm', 'weight_kg', 
             'activity_level', 'goal', 'tdee', 'daily_calorie_target',
-            'reminders_enabled'
+            'bmi', 'reminders_enabled', 'timezone'
         ]
-        read_only_fields = ['tdee', 'daily_calorie_target']
+        read_only_fields = ['tdee', 'daily_calorie_target', 'bmi']
+
+    def validate_timezone(self, value):
+        if not is_valid_timezone(value):
+            raise serializers.ValidationError("Unknown timezone; use an IANA name such as 'Europe/Berlin'.")
+        return value
 
 class FoodLogSerializer(serializers.ModelSerializer):
     class Meta:
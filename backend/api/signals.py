@@ -0,0 +1,71 @@
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from rest_framework.authtoken.models import Token
+
+from .authentication import token_cache
+from .cache import bump_user_version
+from .models import Profile, FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog
+from . import snapshots, streaks
+from .archive import LOG_TABLES
+from .localtime import local_today_for, today_in
+
+USER_DATA_MODELS = (Profile, FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog)
+
+
+def invalidate_user_cache(sender, instance, **kwargs):
+    # Any write to a user's logs or profile invalidates their cached responses
+    bump_user_version(instance.user_id)
+
+
+for model in USER_DATA_MODELS:
+    post_save.connect(invalidate_user_cache, sender=model, dispatch_uid=f"cache-save-{model.__name__}")
+    post_delete.connect(invalidate_user_cache, sender=model, dispatch_uid=f"cache-delete-{model.__name__}")
+
+
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Cached auth entries carry the user and profile; drop them on change
+    token_cache.invalidate_user(instance.pk if sender is User else instance.user_id)
+
+
+post_save.connect(invalidate_cached_user, sender=User, dispatch_uid="auth-cache-user")
+post_save.connect(invalidate_cached_user, sender=Profile, dispatch_uid="auth-cache-profile")
+post_delete.connect(invalidate_cached_user, sender=Token, dispatch_uid="auth-cache-token")
+
+
+def update_streak_on_save(sender, instance, created, **kwargs):
+    if created:
+        streaks.record_food_log(instance)
+
+
+def update_streak_on_delete(sender, instance, **kwargs):
+    streaks.remove_food_log(instance)
+
+
+def rebuild_streak_on_target_change(sender, instance, **kwargs):
+    # "Met target" counts depend on the calorie target
+    if getattr(instance, '_metrics_changed', False):
+        streaks.refresh_month(instance.user_id, today_in(instance.timezone))
+
+
+post_save.connect(update_streak_on_save, sender=FoodLog, dispatch_uid="streak-save")
+post_delete.connect(update_streak_on_delete, sender=FoodLog, dispatch_uid="streak-delete")
+post_save.connect(rebuild_streak_on_target_change, sender=Profile, dispatch_uid="streak-target")
+
+
+DATE_FIELDS = dict(LOG_TABLES)
+
+
+def set_local_date(sender, instance, **kwargs):
+    # Views pass the date explicitly; this covers logs created elsewhere
+    if getattr(instance, DATE_FIELDS[sender]) is None:
+        setattr(instance, DATE_FIELDS[sender], local_today_for(instance.user_id))
+
+
+def update_history_snapshot(sender, instance, **kwargs):
+    snapshots.record_change(instance.user_id, getattr(instance, DATE_FIELDS[sender]))
+
+
+for model in DATE_FIELDS:
+    pre_save.connect(set_local_date, sender=model, dispatch_uid=f"local-date-{model.__name__}")
+    post_save.connect(update_history_snapshot, sender=model, dispatch_uid=f"snapshot-save-{model.__name__}")
+    post_delete.connect(update_history_snapshot, sender=model, dispatch_uid=f"snapshot-delete-{model.__name__}")
@@ -0,0 +1,88 @@
+import numpy as np
+
+MINUTES_PER_DAY = 24 * 60
+DEFAULT_TARGET_MINUTES = 8 * 60
+STAGES = ('deep', 'light', 'rem', 'awake')
+
+SLEEP_COLUMNS = (
+    'date', 'bedtime', 'wake_time', 'duration_minutes', 'quality_score',
+    'deep_sleep_minutes', 'light_sleep_minutes', 'rem_sleep_minutes', 'awake_minutes',
+)
+
+
+def _clock_minutes(times):
+    return np.array([t.hour * 60 + t.minute + t.second / 60 for t in times], dtype=np.float64)
+
+
+def circular_stats(minutes):
+    """
+    Mean clock time and spread of times of day, treating the clock as a
+    circle so 23:30 and 00:30 average to midnight rather than noon.
+    """
+    angles = minutes / MINUTES_PER_DAY * 2 * np.pi
+    sin_mean = np.sin(angles).mean()
+    cos_mean = np.cos(angles).mean()
+    resultant = float(np.hypot(sin_mean, cos_mean))
+
+    mean_minutes = (np.arctan2(sin_mean, cos_mean) % (2 * np.pi)) / (2 * np.pi) * MINUTES_PER_DAY
+    # Circular std-dev, expressed in minutes of clock time
+    std_minutes = np.sqrt(-2 * np.log(max(resultant, 1e-12))) / (2 * np.pi) * MINUTES_PER_DAY
+    mean_minutes = int(round(mean_minutes)) % MINUTES_PER_DAY
+    return {
+        "mean": f"{mean_minutes // 60:02d}:{mean_minutes % 60:02d}",
+        "variance": round(1 - resultant, 4),
+        "std_minutes": round(float(std_minutes), 1),
+    }
+
+
+def _split(durations, mask):
+    if not mask.any():
+        return {"nights": 0, "avg_duration_minutes": 0}
+    return {
+        "nights": int(mask.sum()),
+        "avg_duration_minutes": round(float(durations[mask].mean()), 1),
+    }
+
+
+def analyze_sleep(rows, target_minutes=DEFAULT_TARGET_MINUTES):
+    """
+    Statistics for a list of SleepLog rows (tuples in SLEEP_COLUMNS order),
+    computed column-wise with NumPy.
+    """
+    if not rows:
+        return {"nights": 0}
+
+    columns = list(zip(*rows))
+    dates = np.array(columns[0], dtype='datetime64[D]')
+    durations = np.array(columns[3], dtype=np.float64)
+    quality = np.array(columns[4], dtype=np.float64)
+    stages = np.array(columns[5:9], dtype=np.float64)
+
+    stage_totals = stages.sum(axis=1)
+    staged = stage_totals.sum()
+    stage_pct = {
+        name: round(float(total / staged * 100), 1) if staged else 0
+        for name, total in zip(STAGES, stage_totals)
+    }
+
+    shortfall = target_minutes - durations
+    # 1970-01-01 was a Thursday: shift by 3 so Monday is 0, Saturday 5
+    weekday = (dates.astype(np.int64) + 3) % 7
+    weekend = weekday >= 5
+
+    return {
+        "nights": len(rows),
+        "avg_duration_minutes": round(float(durations.mean()), 1),
+        "avg_quality_score": round(float(quality.mean()), 1),
+        "bedtime": circular_stats(_clock_minutes(columns[1])),
+        "wake_time": circular_stats(_clock_minutes(columns[2])),
+        "stage_percentages": stage_pct,
+        "sleep_debt": {
+            "target_minutes": target_minutes,
+            "total_minutes": round(float(np.clip(shortfall, 0, None).sum()), 1),
+            "net_minutes": round(float(shortfall.sum()), 1),
+            "nights_below_target": int((shortfall > 0).sum()),
+        },
+        "weekday": _split(durations, ~weekend),
+        "weekend": _split(durations, weekend),
+    }
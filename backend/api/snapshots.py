@@ -0,0 +1,128 @@
+"""
+Columnar per-user daily history (HistorySnapshot).
+
+Long-range reads (monthly stats, the PDF report, correlations) only need
+a handful of numbers per day, so each user's history is kept as one
+(days x METRICS) float64 matrix packed into a binary column, NaN where
+nothing was logged. A read is one row fetch plus np.frombuffer, a
+zero-copy, read-only view of the stored bytes, instead of grouping every
+log table or building model instances.
+
+The snapshot is built on first read from the logs and the archive. Log
+writes only record the earliest changed day (one UPDATE, see
+signals.py); the next read recomputes the days from there on and stores
+the matrix again. A change before the snapshot starts or inside the
+archived range rebuilds it from scratch.
+
+Unlike the streak counters, this is a read-through cache: like the
+response cache, a GET may write it (one INSERT or UPDATE of the user's
+row), which keeps log writes at a single UPDATE however much history a
+change invalidates.
+"""
+import numpy as np
+from django.db import IntegrityError, transaction
+from django.db.models import DateField, F, Value
+from django.db.models.functions import Coalesce, Least
+
+from .archive import daily_history, reaches_archive, summarize
+from .localtime import local_today
+from .models import HistorySnapshot
+
+# Matrix columns; names match DailySummary fields
+METRICS = (
+    'calories', 'protein', 'carbs', 'fats', 'water_ml', 'calories_burned',
+    'exercise_minutes', 'sleep_minutes', 'sleep_quality', 'weight_kg',
+)
+COLUMN = {name: i for i, name in enumerate(METRICS)}
+METRICS_KEY = ",".join(METRICS)
+
+
+class History:
+    def __init__(self, start, matrix):
+        self.start = start
+        self.matrix = matrix
+
+    def window(self, start, end):
+        """(days, matrix) for start..end inclusive, NaN outside the stored range."""
+        days = np.arange(np.datetime64(start, 'D'), np.datetime64(end, 'D') + 1)
+        offset = (start - self.start).days
+        if offset >= 0 and offset + len(days) <= len(self.matrix):
+            return days, self.matrix[offset:offset + len(days)]
+
+        window = np.full((len(days), len(METRICS)), np.nan)
+        low, high = max(offset, 0), min(offset + len(days), len(self.matrix))
+        if low < high:
+            window[low - offset:high - offset] = self.matrix[low:high]
+        return days, window
+
+
+def _unpack(data):
+    return np.frombuffer(data, dtype=np.float64).reshape(-1, len(METRICS))
+
+
+def _row(values):
+    return [np.nan if values.get(name) is None else values[name] for name in METRICS]
+
+
+def rebuild(user, today=None, snapshot=None):
+    today = today or local_today(user)
+    days = daily_history(user, None, today)
+    start = days[0]["date"] if days else today
+    matrix = np.full(((today - start).days + 1, len(METRICS)), np.nan)
+    for entry in days:
+        matrix[(entry["date"] - start).days] = _row(entry)
+
+    fields = {"start": start, "metrics": METRICS_KEY, "data": matrix.tobytes(), "dirty_from": None}
+    if snapshot is None:
+        try:
+            with transaction.atomic():
+                HistorySnapshot.objects.create(user=user, **fields)
+        except IntegrityError:
+            pass  # built by a concurrent request
+    else:
+        _store(snapshot, fields)
+    return History(start, matrix)
+
+
+def _store(snapshot, fields):
+    # Skipped if a log write landed since `snapshot` was read; the next read redoes it
+    HistorySnapshot.objects.filter(pk=snapshot.pk, writes=snapshot.writes).update(**fields)
+
+
+def _refresh(snapshot, history, today):
+    """Recompute the days from dirty_from on; they are all hot, so the raw logs are complete."""
+    first = snapshot.dirty_from
+    end = max(today, first)
+    matrix = np.full(((end - snapshot.start).days + 1, len(METRICS)), np.nan)
+    kept = min((first - snapshot.start).days, len(history.matrix))
+    matrix[:kept] = history.matrix[:kept]
+    for (_, day), values in summarize([snapshot.user_id], first, end).items():
+        matrix[(day - snapshot.start).days] = _row(values)
+
+    _store(snapshot, {"data": matrix.tobytes(), "dirty_from": None})
+    return History(snapshot.start, matrix)
+
+
+def load(user, today=None):
+    """The user's History, built on first use and refreshed after log writes."""
+    today = today or local_today(user)
+    snapshot = HistorySnapshot.objects.filter(user=user).first()
+    if snapshot is None or snapshot.metrics != METRICS_KEY:
+        return rebuild(user, today, snapshot)
+
+    history = History(snapshot.start, _unpack(snapshot.data))
+    dirty = snapshot.dirty_from
+    if dirty is None:
+        return history
+    if dirty < snapshot.start or reaches_archive(user, dirty):
+        return rebuild(user, today, snapshot)
+    return _refresh(snapshot, history, today)
+
+
+def record_change(user_id, day):
+    """Note that the user's logs for `day` changed."""
+    day = Value(day, output_field=DateField())
+    HistorySnapshot.objects.filter(user_id=user_id).update(
+        dirty_from=Least(Coalesce('dirty_from', day), day),
+        writes=F('writes') + 1,
+    )
@@ -0,0 +1,287 @@
+"""
+Stored logging-streak and monthly adherence counters (LoggingStreak).
+
+record_food_log / remove_food_log adjust a user's counters in O(1) from
+the changed day's total, instead of walking every logged date. Changes
+that can't be applied exactly in O(1) (e.g. deleting a log that might
+have been part of the longest streak, back-dated logs) flag the row with
+needs_repair; repair() (the nightly `rebuild_streaks` command) recomputes
+the flagged users, and users without a row yet, from the logs in one
+streamed grouped query, archived days (DailySummary) included.
+rebuild_all() does the same for every user.
+
+Reads never write: get_counters() computes counters in memory for a user
+without a row, which the next food log or the nightly repair then stores.
+"""
+from datetime import timedelta
+from itertools import groupby
+
+from django.db import transaction
+from django.db.models import Count, Exists, F, OuterRef, Q, Sum
+
+from .localtime import today_in
+from .models import FoodLog, LoggingStreak, Profile, DailySummary
+
+ADHERENCE_TOLERANCE = 0.1
+STREAK_FIELDS = (
+    'current_streak', 'longest_streak', 'last_logged_date',
+    'month', 'month_logged_days', 'month_met_target_days', 'needs_repair',
+)
+
+
+def met_target(calories, target):
+    if not target or calories <= 0:
+        return False
+    return (1 - ADHERENCE_TOLERANCE) * target <= calories <= (1 + ADHERENCE_TOLERANCE) * target
+
+
+def compute_counters(day_totals, target, today):
+    """Counters from a date-sorted list of (date, calories) for one user."""
+    counters = {
+        "current_streak": 0,
+        "longest_streak": 0,
+        "last_logged_date": None,
+        "month": today.replace(day=1),
+        "month_logged_days": 0,
+        "month_met_target_days": 0,
+        "needs_repair": False,
+    }
+    run = 0
+    previous = None
+    for day, calories in day_totals:
+        run = run + 1 if previous is not None and day == previous + timedelta(days=1) else 1
+        counters["longest_streak"] = max(counters["longest_streak"], run)
+        previous = day
+        if day >= counters["month"] and calories > 0:
+            counters["month_logged_days"] += 1
+            counters["month_met_target_days"] += met_target(calories, target)
+    if previous is not None:
+        counters["current_streak"] = run
+        counters["last_logged_date"] = previous
+    return counters
+
+
+def _target(user_id):
+    return Profile.objects.filter(user_id=user_id).values_list('daily_calorie_target', flat=True).first()
+
+
+def _day_total(user_id, day):
+    agg = FoodLog.objects.filter(user_id=user_id, date_eaten=day).aggregate(
+        calories=Sum('calories'), count=Count('id')
+    )
+    return agg['calories'] or 0, agg['count']
+
+
+def _locked_streak(user_id):
+    return LoggingStreak.objects.select_for_update().filter(user_id=user_id).first()
+
+
+def _roll_month(streak, day):
+    month = day.replace(day=1)
+    if streak.month != month:
+        if streak.month and streak.month > month:
+            return False  # change to an older month; counters only track the latest
+        streak.month = month
+        streak.month_logged_days = 0
+        streak.month_met_target_days = 0
+    return True
+
+
+def _adjust_adherence(streak, day, before, after, target):
+    if not _roll_month(streak, day):
+        return
+    streak.month_logged_days += (after > 0) - (before > 0)
+    streak.month_met_target_days += met_target(after, target) - met_target(before, target)
+
+
+def record_food_log(log):
+    """Apply a newly created FoodLog to the user's counters."""
+    with transaction.atomic():
+        streak = _locked_streak(log.user_id)
+        if streak is None:
+            # First log since counters existed: build from history once
+            rebuild_user(log.user_id, log.date_eaten)
+            return
+        after, count = _day_total(log.user_id, log.date_eaten)
+        day = log.date_eaten
+
+        if count == 1:
+            last = streak.last_logged_date
+            if last is None or day > last:
+                consecutive = last is not None and day == last + timedelta(days=1)
+                streak.current_streak = streak.current_streak + 1 if consecutive else 1
+                streak.last_logged_date = day
+                streak.longest_streak = max(streak.longest_streak, streak.current_streak)
+            else:
+                # Back-dated day: may bridge two runs
+                streak.needs_repair = True
+
+        _adjust_adherence(streak, day, after - log.calories, after, _target(log.user_id))
+        streak.save()
+
+
+def remove_food_log(log):
+    """Apply a deleted FoodLog to the user's counters."""
+    with transaction.atomic():
+        streak = _locked_streak(log.user_id)
+        if streak is None:
+            # Nothing stored yet (or the user is being deleted); computed on read until repaired
+            return
+        after, count = _day_total(log.user_id, log.date_eaten)
+        day = log.date_eaten
+        last = streak.last_logged_date
+
+        if count == 0 and last is not None:
+            run_start = last - timedelta(days=streak.current_streak - 1)
+            if run_start <= day <= last:
+                if streak.longest_streak == streak.current_streak:
+                    # The longest run may have been this one; recompute tonight
+                    streak.needs_repair = True
+                if day == last:
+                    streak.current_streak -= 1
+                    if streak.current_streak:
+                        streak.last_logged_date = day - timedelta(days=1)
+                    else:
+                        # The previous run's end is unknown, so a back-dated
+                        # log could not bridge to it; recompute tonight
+                        streak.last_logged_date = None
+                        streak.needs_repair = True
+                else:
+                    streak.current_streak = (last - day).days
+            else:
+                streak.needs_repair = True
+
+        _adjust_adherence(streak, day, after + log.calories, after, _target(log.user_id))
+        streak.save()
+
+
+def refresh_month(user_id, today):
+    """Recount the current month's adherence, e.g. after the calorie target changed."""
+    with transaction.atomic():
+        streak = _locked_streak(user_id)
+        if streak is None:
+            return
+        month = today.replace(day=1)
+        totals = list(
+            FoodLog.objects.filter(user_id=user_id, date_eaten__gte=month)
+            .values('date_eaten').annotate(calories=Sum('calories'))
+            .values_list('calories', flat=True)
+        )
+        target = _target(user_id)
+        streak.month = month
+        streak.month_logged_days = sum(1 for calories in totals if calories > 0)
+        streak.month_met_target_days = sum(met_target(calories, target) for calories in totals)
+        streak.save()
+
+
+def _logged_days(*conditions, **filters):
+    """(user_id, date, calories) for every day with food logged, sorted by user and date."""
+    hot = (
+        FoodLog.objects.filter(*conditions, **filters).values('user_id', day=F('date_eaten'))
+        .annotate(calories=Sum('calories')).values_list('user_id', 'day', 'calories')
+    )
+    archived = (
+        DailySummary.objects.filter(*conditions, calories__isnull=False, **filters)
+        .values_list('user_id', 'date', 'calories')
+    )
+    rows = hot.union(archived, all=True).order_by('user_id', 'day').iterator(chunk_size=10000)
+    # A day is both archived and hot when logs were back-dated past the cutoff
+    for (user_id, day), group in groupby(rows, key=lambda row: row[:2]):
+        yield user_id, day, sum(calories for _, _, calories in group)
+
+
+def build_counters(user_id, today):
+    day_totals = [(day, calories) for _, day, calories in _logged_days(user_id=user_id)]
+    return compute_counters(day_totals, _target(user_id), today)
+
+
+def rebuild_user(user_id, today):
+    streak, _ = LoggingStreak.objects.update_or_create(user_id=user_id, defaults=build_counters(user_id, today))
+    return streak
+
+
+def rebuild_all(today=None, batch_size=1000):
+    """
+    Recompute counters for every user with food logs, as of `today` or,
+    by default, each user's local date. Returns rows written.
+    """
+    written = _rebuild(_logged_days(), today, batch_size)
+    _delete_empty()
+    return written
+
+
+def repair(today=None, batch_size=1000):
+    """
+    Recompute counters flagged with needs_repair, and store them for users
+    with food logs but no row yet. Returns rows written.
+    """
+    stale = Q(user__streak__needs_repair=True) | Q(user__streak__isnull=True)
+    written = _rebuild(_logged_days(stale), today, batch_size)
+    _delete_empty(needs_repair=True)
+    return written
+
+
+def _rebuild(logged_days, today, batch_size):
+    local_days = {}
+
+    def flush(pending):
+        # Targets and timezones of just this batch's users
+        profiles = {
+            user_id: (target, timezone_name)
+            for user_id, target, timezone_name in Profile.objects.filter(user_id__in=list(pending))
+            .values_list('user_id', 'daily_calorie_target', 'timezone')
+        }
+        batch = []
+        for user_id, day_totals in pending.items():
+            target, timezone_name = profiles.get(user_id, (None, None))
+            if today is None and timezone_name not in local_days:
+                local_days[timezone_name] = today_in(timezone_name)
+            user_today = today or local_days[timezone_name]
+            batch.append(LoggingStreak(user_id=user_id, **compute_counters(day_totals, target, user_today)))
+        return _upsert(batch)
+
+    written = 0
+    pending = {}
+    for user_id, user_rows in groupby(logged_days, key=lambda row: row[0]):
+        pending[user_id] = [(day, calories) for _, day, calories in user_rows]
+        if len(pending) >= batch_size:
+            written += flush(pending)
+            pending = {}
+    if pending:
+        written += flush(pending)
+    return written
+
+
+def _delete_empty(**filters):
+    """Drop counters of users whose logs were all deleted."""
+    LoggingStreak.objects.filter(
+        ~Exists(FoodLog.objects.filter(user=OuterRef('user'))),
+        ~Exists(DailySummary.objects.filter(user=OuterRef('user'), calories__isnull=False)),
+        **filters,
+    ).delete()
+
+
+def _upsert(batch):
+    if not batch:
+        return 0
+    LoggingStreak.objects.bulk_create(
+        batch, update_conflicts=True, unique_fields=['user'], update_fields=list(STREAK_FIELDS)
+    )
+    return len(batch)
+
+
+def get_counters(user, today):
+    """Streak/adherence values as of `today` (computed from the logs, unsaved, for users without a row)."""
+    try:
+        streak = user.streak
+    except LoggingStreak.DoesNotExist:
+        streak = LoggingStreak(user_id=user.pk, **build_counters(user.pk, today))
+
+    active = streak.last_logged_date is not None and streak.last_logged_date >= today - timedelta(days=1)
+    this_month = streak.month == today.replace(day=1)
+    return {
+        "streak": streak.current_streak if active else 0,
+        "longest_streak": streak.longest_streak,
+        "month_logged_days": streak.month_logged_days if this_month else 0,
+        "month_met_target_days": streak.month_met_target_days if this_month else 0,
+    }
@@ -0,0 +1,268 @@
+"""
+Deterministic synthetic users and log histories (`generate_data` command).
+
+Each user gets a Profile with plausible body metrics and years of logs:
+meals sized around their calorie target (lighter breakfasts, heavier
+weekends, occasional snacks), water through the day, a weight random walk
+drifting with their goal, a per-user exercise habit and sleep with a
+personal chronotype, later/longer weekends and stage splits.
+
+Per-user values are drawn with NumPy from a generator seeded by
+(seed, user index), so output doesn't depend on batch size. Users,
+tokens and profiles go through bulk_create; log rows are generated as
+plain tuples and inserted with executemany in large batches, which skips
+the per-instance model overhead that would otherwise dominate.
+"""
+from datetime import date, time, timedelta
+
+import numpy as np
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from rest_framework.authtoken.models import Token
+
+from . import profile_metrics
+from .archive import delete_rows
+from .models import Profile, FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog, LoggingStreak, DailySummary, HistorySnapshot
+
+DEFAULT_PREFIX = "synthetic-user-"
+DEFAULT_PASSWORD = "synthetic-password-123"
+# Shorter prefixes would match (and delete) real accounts
+MIN_PREFIX_LENGTH = 4
+LOG_MODELS = (FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog)
+COLUMNS = {
+    FoodLog: ('user', 'food_name', 'calories', 'protein', 'carbs', 'fats', 'date_eaten', 'meal_type'),
+    WaterLog: ('user', 'amount_ml', 'date_eaten'),
+    WeightLog: ('user', 'weight_kg', 'date'),
+    ExerciseLog: ('user', 'exercise_type', 'description', 'duration_minutes', 'calories_burned', 'date'),
+    SleepLog: (
+        'user', 'date', 'bedtime', 'wake_time', 'duration_minutes', 'quality_score',
+        'deep_sleep_minutes', 'light_sleep_minutes', 'rem_sleep_minutes', 'awake_minutes',
+    ),
+}
+MINUTES_PER_DAY = 24 * 60
+
+ACTIVITY_WEIGHTS = (0.3, 0.3, 0.25, 0.1, 0.05)
+GOAL_WEIGHTS = (0.5, 0.3, 0.2)
+GOAL_DRIFT_KG = {"Lose": -0.03, "Maintain": 0.0, "Gain": 0.02}
+
+# (meal, share of the daily target, chance of logging it on a logged day)
+MEALS = (("Breakfast", 0.25, 0.8), ("Lunch", 0.35, 0.95), ("Dinner", 0.35, 0.97))
+FOODS = {
+    "Breakfast": ("Oatmeal", "Eggs and toast", "Greek yogurt", "Smoothie", "Pancakes"),
+    "Lunch": ("Chicken salad", "Rice bowl", "Turkey sandwich", "Burrito", "Soup and bread"),
+    "Dinner": ("Salmon and potatoes", "Pasta", "Stir fry", "Steak and vegetables", "Curry"),
+    "Snack": ("Apple", "Protein bar", "Almonds", "Banana", "Yogurt", "Crackers"),
+}
+# (type, description, kcal per minute at 70 kg, share of sessions)
+EXERCISES = (
+    ("Cardio", "Running", 10.0, 0.35), ("Cardio", "Cycling", 8.0, 0.15),
+    ("Strength", "Weights", 6.0, 0.3), ("Yoga", "Flow", 4.0, 0.1), ("Other", "Walking", 4.5, 0.1),
+)
+
+
+def check_prefix(prefix):
+    """ValueError unless `prefix` is long enough to only match generated users."""
+    if len(prefix.strip()) < MIN_PREFIX_LENGTH:
+        raise ValueError(f"The username prefix must be at least {MIN_PREFIX_LENGTH} characters")
+
+
+def delete_users(prefix):
+    """
+    Remove users with the prefix and their rows. Tables are cleared with
+    one DELETE each, skipping the per-row streak, snapshot and cache
+    signals on purpose: those rows belong to users being deleted anyway.
+    """
+    check_prefix(prefix)
+    users = User.objects.filter(username__startswith=prefix)
+    for model in LOG_MODELS + (DailySummary, HistorySnapshot, LoggingStreak, Profile, Token):
+        delete_rows(model.objects.filter(user__in=users))
+    users.delete()
+
+
+def _profile(rng, user_id):
+    gender = "Male" if rng.random() < 0.5 else "Female"
+    height = rng.normal(178, 7) if gender == "Male" else rng.normal(164, 6.5)
+    bmi = float(np.clip(rng.lognormal(np.log(26), 0.15), 18, 42))
+    profile = Profile(
+        user_id=user_id,
+        gender=gender,
+        age=int(np.clip(rng.normal(38, 12), 18, 80)),
+        height_cm=round(float(height), 1),
+        weight_kg=round(bmi * (height / 100) ** 2, 1),
+        activity_level=str(rng.choice([choice for choice, _ in Profile.ACTIVITY_CHOICES], p=ACTIVITY_WEIGHTS)),
+        goal=str(rng.choice([choice for choice, _ in Profile.GOAL_CHOICES], p=GOAL_WEIGHTS)),
+        reminders_enabled=bool(rng.random() < 0.3),
+    )
+    profile_metrics.refresh_metrics(profile)
+    return profile
+
+
+def _food_logs(rng, user_id, days, weekend, target):
+    logged = np.flatnonzero(rng.random(len(days)) < rng.beta(6, 2))
+    # Daily appetite: +-10% day to day, ~8% more at weekends
+    appetite = rng.normal(1.0, 0.1, len(days)) * np.where(weekend, 1.08, 1.0)
+    parts = []
+    for meal, share, chance in MEALS:
+        eaten = logged[rng.random(len(logged)) < chance]
+        calories = np.maximum(target * share * appetite[eaten] * rng.normal(1, 0.15, len(eaten)), 80)
+        parts.append((meal, eaten, calories, rng.uniform(0.15, 0.3, len(eaten)), rng.uniform(0.25, 0.35, len(eaten))))
+    snack_days = np.repeat(logged, rng.poisson(0.8, len(logged)))
+    snack_calories = np.clip(rng.lognormal(np.log(170), 0.4, len(snack_days)), 40, 600)
+    parts.append(("Snack", snack_days, snack_calories, np.full(len(snack_days), 0.15), np.full(len(snack_days), 0.3)))
+
+    rows = []
+    for meal, day_index, calories, protein_share, fat_share in parts:
+        calories = calories.astype(int)
+        protein = calories * protein_share / 4
+        fats = calories * fat_share / 9
+        carbs = np.maximum(calories - protein * 4 - fats * 9, 0) / 4
+        names = rng.integers(len(FOODS[meal]), size=len(day_index))
+        rows.extend(zip(
+            [user_id] * len(day_index), [FOODS[meal][i] for i in names.tolist()], calories.tolist(),
+            protein.round(1).tolist(), carbs.round(1).tolist(), fats.round(1).tolist(),
+            [days[i] for i in day_index.tolist()], [meal] * len(day_index),
+        ))
+    return rows
+
+
+def _water_logs(rng, user_id, days):
+    counts = rng.poisson(rng.uniform(2, 8), len(days))
+    sizes = rng.choice((200, 250, 330, 500, 750), counts.sum(), p=(0.15, 0.4, 0.2, 0.2, 0.05))
+    day_index = np.repeat(np.arange(len(days)), counts)
+    return list(zip([user_id] * len(sizes), sizes.tolist(), [days[i] for i in day_index.tolist()]))
+
+
+def _weight_logs(rng, user_id, days, start_weight, goal):
+    # Drift follows the goal and fades as the user settles; measurements add daily noise
+    drift = GOAL_DRIFT_KG[goal] * np.exp(-np.arange(len(days)) / 400)
+    true_weight = start_weight + np.cumsum(drift + rng.normal(0, 0.05, len(days)))
+    measured = (true_weight + rng.normal(0, 0.4, len(days))).round(1)
+    weighed = np.flatnonzero(rng.random(len(days)) < rng.uniform(0.15, 0.9))
+    return list(zip([user_id] * len(weighed), measured[weighed].tolist(), [days[i] for i in weighed.tolist()]))
+
+
+def _exercise_logs(rng, user_id, days, weight):
+    sessions_per_week = rng.choice((0, 1, 2, 3, 4, 5), p=(0.15, 0.2, 0.25, 0.2, 0.12, 0.08))
+    active = np.flatnonzero(rng.random(len(days)) < sessions_per_week / 7)
+    shares = np.array([row[3] for row in EXERCISES])
+    kinds = rng.choice(len(EXERCISES), len(active), p=shares / shares.sum())
+    minutes = np.clip(rng.normal(45, 15, len(active)), 10, 150).astype(int)
+    kcal_per_minute = np.array([row[2] for row in EXERCISES])[kinds]
+    burned = (minutes * kcal_per_minute * weight / 70).astype(int)
+    return list(zip(
+        [user_id] * len(active), [EXERCISES[k][0] for k in kinds.tolist()], [EXERCISES[k][1] for k in kinds.tolist()],
+        minutes.tolist(), burned.tolist(), [days[i] for i in active.tolist()],
+    ))
+
+
+def _sleep_logs(rng, user_id, days, weekend, clock):
+    nights = np.flatnonzero(rng.random(len(days)) < rng.uniform(0.5, 0.95))
+    chronotype = rng.normal(23 * 60, 45)  # habitual bedtime in minutes after midnight
+    late = weekend[nights]
+    bedtime = (chronotype + rng.normal(0, 30, len(nights)) + np.where(late, 45, 0)).astype(int)
+    duration = np.clip(rng.normal(430, 40, len(nights)) + np.where(late, 40, 0), 180, 720).astype(int)
+    deep = (duration * rng.uniform(0.13, 0.23, len(nights))).astype(int)
+    rem = (duration * rng.uniform(0.18, 0.25, len(nights))).astype(int)
+    awake = (duration * rng.uniform(0.02, 0.08, len(nights))).astype(int)
+    light = duration - deep - rem - awake
+    # Quality tracks length and deep sleep
+    quality = np.clip(40 + (duration - 300) / 6 + deep / duration * 100 + rng.normal(0, 6, len(nights)), 0, 100)
+    return list(zip(
+        [user_id] * len(nights), [days[i] for i in nights.tolist()],
+        [clock[m] for m in (bedtime % MINUTES_PER_DAY).tolist()],
+        [clock[m] for m in ((bedtime + duration) % MINUTES_PER_DAY).tolist()],
+        duration.tolist(), quality.astype(int).tolist(), deep.tolist(), light.tolist(), rem.tolist(), awake.tolist(),
+    ))
+
+
+class _BatchWriter:
+    """Buffers row tuples per table and inserts them with executemany in batches."""
+
+    def __init__(self, batch_size):
+        self.batch_size = batch_size
+        self.buffers = {model: [] for model in LOG_MODELS}
+        self.written = {model.__name__: 0 for model in LOG_MODELS}
+        self.generated = 0
+        self.sql = {}
+        for model in LOG_MODELS:
+            columns = ", ".join(connection.ops.quote_name(model._meta.get_field(name).column) for name in COLUMNS[model])
+            placeholders = ", ".join(["%s"] * len(COLUMNS[model]))
+            self.sql[model] = f"INSERT INTO {connection.ops.quote_name(model._meta.db_table)} ({columns}) VALUES ({placeholders})"
+
+    def add(self, model, rows):
+        buffer = self.buffers[model]
+        buffer.extend(rows)
+        self.generated += len(rows)
+        if len(buffer) >= self.batch_size:
+            self.flush(model)
+
+    def flush(self, model=None):
+        for model in [model] if model else LOG_MODELS:
+            buffer = self.buffers[model]
+            if buffer:
+                with transaction.atomic(), connection.cursor() as cursor:
+                    cursor.executemany(self.sql[model], buffer)
+                self.written[model.__name__] += len(buffer)
+                buffer.clear()
+
+
+def generate(users, days, seed=0, prefix=DEFAULT_PREFIX, password=DEFAULT_PASSWORD,
+             batch_size=10000, today=None, progress=None, replace=False):
+    """
+    Create `users` users named <prefix><n> with `days` of history ending
+    `today`. Existing users with the prefix are deleted first with
+    `replace`, otherwise they raise ValueError. Returns
+    {"users": [...usernames], "rows": {model name: rows written}}.
+    """
+    check_prefix(prefix)
+    existing = User.objects.filter(username__startswith=prefix).count()
+    if existing and not replace:
+        raise ValueError(f"{existing} users with the prefix {prefix!r} exist; pass replace=True to delete them")
+
+    today = today or date.today()
+    day_list = [today - timedelta(days=offset) for offset in range(days - 1, -1, -1)]
+    weekend = np.array([day.weekday() >= 5 for day in day_list])
+    # Values in the form the backend expects, converted once instead of per row
+    day_values = [connection.ops.adapt_datefield_value(day) for day in day_list]
+    clock = [connection.ops.adapt_timefield_value(time(m // 60, m % 60)) for m in range(MINUTES_PER_DAY)]
+    encoded = make_password(password)
+
+    if existing:
+        delete_users(prefix)
+    usernames = [f"{prefix}{i}" for i in range(users)]
+    User.objects.bulk_create([
+        User(username=name, email=f"{name}@example.com", password=encoded) for name in usernames
+    ], batch_size=batch_size)
+    ids = dict(User.objects.filter(username__startswith=prefix).values_list('username', 'id'))
+    Token.objects.bulk_create([Token(user_id=ids[name], key=Token.generate_key()) for name in usernames], batch_size=batch_size)
+
+    writer = _BatchWriter(batch_size)
+    profiles = []
+    for index, name in enumerate(usernames):
+        rng = np.random.default_rng([seed, index])
+        user_id = ids[name]
+        profile = _profile(rng, user_id)
+        start_weight = profile.weight_kg
+
+        writer.add(FoodLog, _food_logs(rng, user_id, day_values, weekend, profile.daily_calorie_target))
+        writer.add(ExerciseLog, _exercise_logs(rng, user_id, day_values, start_weight))
+        writer.add(WaterLog, _water_logs(rng, user_id, day_values))
+        writer.add(SleepLog, _sleep_logs(rng, user_id, day_values, weekend, clock))
+        weights = _weight_logs(rng, user_id, day_values, start_weight, profile.goal)
+        writer.add(WeightLog, weights)
+        if weights:
+            # Profile weight follows the latest weigh-in, as WeightTrackerView does
+            profile.weight_kg = weights[-1][1]
+            profile_metrics.refresh_metrics(profile)
+
+        profiles.append(profile)
+        if len(profiles) >= batch_size:
+            Profile.objects.bulk_create(profiles)
+            profiles = []
+        if progress:
+            progress(index + 1, writer.generated)
+    Profile.objects.bulk_create(profiles)
+    writer.flush()
+
+    return {"users": usernames, "rows": writer.written}
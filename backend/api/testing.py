@@ -0,0 +1,36 @@
+"""
+Test doubles shared by api.tests and the benchmarks.
+
+FakeGeminiModel is patched in for genai.GenerativeModel so endpoints that
+call Gemini can run offline with canned answers:
+
+    with mock.patch('api.views.genai.GenerativeModel', FakeGeminiModel):
+        ...
+"""
+import json
+import time
+from types import SimpleNamespace
+
+
+class FakeGeminiModel:
+    """Stands in for genai.GenerativeModel with canned answers per prompt type."""
+    latency = 0.0
+
+    def __init__(self, name):
+        self.name = name
+
+    def generate_content(self, prompt):
+        if self.latency:
+            time.sleep(self.latency)
+        if "Estimate calories burned" in prompt:
+            text = "320"
+        elif "Suggest 3 specific food items" in prompt:
+            text = json.dumps([
+                {"food_name": "Greek Yogurt", "calories": 150, "protein": 15, "carbs": 20, "fats": 0, "reason": "Protein"},
+            ] * 3)
+        else:
+            text = json.dumps({
+                "food_name": "Banana", "estimated_calories": 105, "protein_g": 1.3, "carbs_g": 27, "fats_g": 0.4,
+            })
+        usage = SimpleNamespace(prompt_token_count=len(prompt) // 4, candidates_token_count=len(text) // 4)
+        return SimpleNamespace(text=text, usage_metadata=usage)
@@ -1,3 +1,823 @@
-from django.test import TestCase
+import gzip
+import io
+import json
+import logging
+import os
+from datetime import date, datetime, time, timedelta, timezone as dt_timezone
+from time import perf_counter
+from unittest import mock
 
-# Create your tests here.
+import numpy as np
+
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core import mail
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.authtoken.models import Token
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from . import snapshots
+from .archive import archive_before, archive_cutoff, reaches_archive
+from .authentication import CachedTokenAuthentication, token_cache
+from .cache import cache_stats, reset_cache_stats
+from .hashers import HashingBusy, hashing_slot
+from .localtime import earliest_today
+from .mailqueue import mail_queue
+from .models import Profile, DailySummary, ExerciseLog, FoodLog, LoggingStreak, SleepLog, WaterLog, WeightLog
+from .reminders import ConsoleReminderBackend, LocmemReminderBackend, send_reminders
+from .renderers import FastJSONRenderer
+from .rows import log_rows
+from .serializers import ExerciseLogSerializer, FoodLogSerializer, SleepLogSerializer, WaterLogSerializer
+from .streaks import get_counters, rebuild_all, repair
+from .synthetic import generate
+from .testing import FakeGeminiModel
+
+PERF_LOGGER = logging.getLogger('api.performance')
+
+
+def setUpModule():
+    # Keep request timing lines (and slow-request warnings) out of the test output;
+    # assertLogs still captures them where a test checks the log
+    global _perf_level
+    _perf_level = PERF_LOGGER.level
+    PERF_LOGGER.setLevel(logging.CRITICAL)
+
+
+def tearDownModule():
+    PERF_LOGGER.setLevel(_perf_level)
+
+
+class WeightTrackerViewTests(TestCase):
+    def setUp(self):
+        user = User.objects.create_user(username='tester', password='pass12345')
+        # Loaded like CachedTokenAuthentication does, so local_today() needs no query
+        self.user = User.objects.select_related('profile').get(pk=user.pk)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def _seed(self, weights):
+        start = date.today() - timedelta(days=len(weights) - 1)
+        for i, weight in enumerate(weights):
+            log = WeightLog.objects.create(user=self.user, weight_kg=weight)
+            WeightLog.objects.filter(pk=log.pk).update(date=start + timedelta(days=i))
+
+    def test_query_count_constant_regardless_of_history(self):
+        for size in (5, 200):
+            WeightLog.objects.all().delete()
+            self._seed([80 - i * 0.05 for i in range(size)])
+            # ETag data version + the single series fetch
+            with self.assertNumQueries(2):
+                response = self.client.get(reverse('weight-tracker'))
+            self.assertEqual(len(response.data['logs']), size)
+
+    def test_query_count_constant_when_downsampled(self):
+        self._seed([80 - i * 0.05 for i in range(100)])
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse('weight-tracker'), {'resolution': 'weekly'})
+        self.assertNotIn('logs', response.data)
+        self.assertEqual(sum(row['count'] for row in response.data['series']), 100)
+
+    def test_summary_and_plateau(self):
+        self._seed([82.0, 81.0, 80.0, 80.1, 80.0, 80.1, 80.0])
+        data = self.client.get(reverse('weight-tracker')).data
+        self.assertEqual(data['start_weight'], 82.0)
+        self.assertEqual(data['current_weight'], 80.0)
+        self.assertEqual(data['change'], -2.0)
+        self.assertTrue(data['plateau'])
+        self.assertIn('trend', data['logs'][0])
+        self.assertLess(data['trend_weight'], 82.0)
+
+    def test_empty_history(self):
+        data = self.client.get(reverse('weight-tracker')).data
+        self.assertEqual(data['logs'], [])
+        self.assertFalse(data['plateau'])
+        data = self.client.get(reverse('weight-tracker'), {'max_points': 10}).data
+        self.assertEqual(data['series'], [])
+        self.assertNotIn('logs', data)
+
+    def test_invalid_resolution(self):
+        response = self.client.get(reverse('weight-tracker'), {'resolution': 'hourly'})
+        self.assertEqual(response.status_code, 400)
+
+    def test_sleep_days_out_of_range(self):
+        for days in ('0', '-5', '100000000', 'ten'):
+            response = self.client.get(reverse('sleep-tracker'), {'days': days})
+            self.assertEqual(response.status_code, 400)
+
+
+class ProfileMetricsTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user, gender='Male', age=30, height_cm=180,
+            weight_kg=80, activity_level='1.2', goal='Lose',
+        )
+
+    def test_metrics_computed_on_create(self):
+        # BMR = 800 + 1125 - 150 + 5 = 1780
+        self.assertEqual(self.profile.tdee, 2136.0)
+        self.assertEqual(self.profile.daily_calorie_target, 1636.0)
+        self.assertEqual(self.profile.bmi, 24.7)
+
+    def test_weight_log_refreshes_metrics_in_one_write(self):
+        profile = Profile.objects.get(pk=self.profile.pk)
+        profile.weight_kg = 90
+        with CaptureQueriesContext(connection) as queries:
+            profile.save(update_fields=['weight_kg'])
+        profile_writes = [q for q in queries if q['sql'].startswith('UPDATE "api_profile"')]
+        self.assertEqual(len(profile_writes), 1)
+        profile.refresh_from_db()
+        self.assertEqual(profile.tdee, 2256.0)
+        self.assertEqual(profile.bmi, 27.8)
+
+    def test_deferred_load_recomputes_on_save(self):
+        # Stale derived values; a deferred load has no input snapshot to compare against
+        Profile.objects.filter(pk=self.profile.pk).update(height_cm=170)
+        profile = Profile.objects.only('timezone').get(user=self.user)
+        profile.save()
+        profile.refresh_from_db()
+        self.assertEqual(profile.tdee, 2061.0)
+
+    def test_weight_endpoint_updates_target(self):
+        self.client.post(reverse('weight-tracker'), {'weight_kg': 70})
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.weight_kg, 70)
+        self.assertEqual(self.profile.daily_calorie_target, 1516.0)
+
+    def test_weight_endpoint_ignores_stale_cached_profile(self):
+        token_cache.clear()
+        client = APIClient()
+        client.credentials(HTTP_AUTHORIZATION=f'Token {Token.objects.create(user=self.user).key}')
+        client.get(reverse('update-profile'))
+        # Changed elsewhere (no signal, so the cached profile keeps height 180)
+        Profile.objects.filter(pk=self.profile.pk).update(height_cm=170)
+        client.post(reverse('weight-tracker'), {'weight_kg': 70})
+        self.profile.refresh_from_db()
+        self.assertEqual(self.profile.height_cm, 170)
+        # BMR = 700 + 1062.5 - 150 + 5 = 1617.5
+        self.assertEqual(self.profile.tdee, 1941.0)
+
+
+class ResponseCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        reset_cache_stats()
+        self.user = User.objects.create_user(username='tester', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        Profile.objects.create(
+            user=self.user, gender='Female', age=28, height_cm=165,
+            weight_kg=60, activity_level='1.55', goal='Maintain',
+        )
+
+    def test_repeat_reads_hit_cache(self):
+        self.client.get(reverse('dashboard-summary'))
+        # Only the ETag food/exercise-log versions (one query) hit the DB; the
+        # profile is already loaded on the force-authenticated user
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('dashboard-summary'))
+        self.assertEqual(response.data['consumed_calories'], 0)
+        self.assertEqual(cache_stats()['endpoints']['dashboard-summary']['hits'], 1)
+
+    def test_log_create_and_delete_invalidate(self):
+        self.client.get(reverse('dashboard-summary'))
+        log = FoodLog.objects.create(
+            user=self.user, food_name='Oats', calories=300,
+            protein=10, carbs=50, fats=5, meal_type='Breakfast',
+        )
+        self.assertEqual(self.client.get(reverse('dashboard-summary')).data['consumed_calories'], 300)
+        log.delete()
+        self.assertEqual(self.client.get(reverse('dashboard-summary')).data['consumed_calories'], 0)
+
+
+class ConditionalRequestTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_matching_etag_returns_304(self):
+        etag = self.client.get(reverse('weight-tracker'))['ETag']
+        response = self.client.get(reverse('weight-tracker'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_new_log_changes_etag(self):
+        etag = self.client.get(reverse('weight-tracker'))['ETag']
+        WeightLog.objects.create(user=self.user, weight_kg=75)
+        response = self.client.get(reverse('weight-tracker'), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+
+class DashboardTests(TestCase):
+    SECTION_ENDPOINTS = {
+        'summary': 'dashboard-summary', 'weekly': 'stats-weekly', 'water': 'water-intake',
+        'weight': 'weight-tracker', 'activity': 'activity-tracker', 'sleep': 'sleep-tracker',
+    }
+
+    def setUp(self):
+        [username] = generate(users=1, days=30, seed=5, prefix='dashboard-user-')['users']
+        self.user = User.objects.select_related('profile').get(username=username)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_sections_match_their_endpoints(self):
+        data = self.client.get(reverse('dashboard')).data
+        self.assertEqual(list(data), list(self.SECTION_ENDPOINTS))
+        for section, name in self.SECTION_ENDPOINTS.items():
+            self.assertEqual(data[section], self.client.get(reverse(name)).data, section)
+
+    def test_fields_selects_sections(self):
+        data = self.client.get(reverse('dashboard'), {'fields': 'water,summary'}).data
+        self.assertEqual(list(data), ['summary', 'water'])
+        response = self.client.get(reverse('dashboard'), {'fields': 'water,steps'})
+        self.assertEqual(response.status_code, 400)
+
+
+class LogRowsTests(TestCase):
+    def setUp(self):
+        [username] = generate(users=1, days=14, seed=9, prefix='rows-user-')['users']
+        self.user = User.objects.get(username=username)
+
+    def test_rows_match_model_serializers_without_user(self):
+        for model, serializer in ((FoodLog, FoodLogSerializer), (WaterLog, WaterLogSerializer),
+                                  (ExerciseLog, ExerciseLogSerializer), (SleepLog, SleepLogSerializer)):
+            queryset = model.objects.filter(user=self.user).order_by('id')
+            expected = [
+                {name: value for name, value in row.items() if name != 'user'}
+                for row in serializer(queryset, many=True).data
+            ]
+            self.assertEqual(log_rows(queryset), expected, model.__name__)
+
+    def test_field_selection(self):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        rows = client.get(reverse('sleep-tracker'), {'fields': 'date,duration_minutes'}).data
+        self.assertEqual(set(rows[0]), {'date', 'duration_minutes'})
+        self.assertEqual(client.get(reverse('log-food'), {'fields': 'user'}).status_code, 400)
+
+
+class SyntheticDataTests(TestCase):
+    def test_short_prefix_and_existing_users_are_refused(self):
+        User.objects.create(username='synthetic-user-0')
+        User.objects.create(username='someone')
+        with self.assertRaises(ValueError):
+            generate(users=1, days=3, prefix='s')
+        with self.assertRaises(ValueError):
+            generate(users=1, days=3)
+        generate(users=2, days=3, replace=True)
+        self.assertEqual(User.objects.filter(username__startswith='synthetic-user-').count(), 2)
+        self.assertTrue(User.objects.filter(username='someone').exists())
+
+
+class CachedTokenAuthenticationTests(TestCase):
+    def setUp(self):
+        token_cache.clear()
+        self.user = User.objects.create_user(username='tester', password='pass12345')
+        self.token = Token.objects.create(user=self.user)
+        self.client = APIClient()
+        self.client.credentials(HTTP_AUTHORIZATION=f'Token {self.token.key}')
+
+    def test_repeat_requests_skip_token_lookup(self):
+        self.client.get(reverse('weight-tracker'))
+        # ETag data version + series fetch only
+        with self.assertNumQueries(2):
+            self.client.get(reverse('weight-tracker'))
+
+    def test_logout_revokes_cached_token(self):
+        self.client.get(reverse('weight-tracker'))
+        self.client.post(reverse('logout'))
+        self.assertEqual(self.client.get(reverse('weight-tracker')).status_code, 401)
+
+    def test_requests_get_their_own_user_and_profile(self):
+        Profile.objects.create(
+            user=self.user, gender='Male', age=30, height_cm=180, weight_kg=80,
+            activity_level='1.2', goal='Maintain',
+        )
+        auth = CachedTokenAuthentication()
+        first, _ = auth.authenticate_credentials(self.token.key)
+        first.profile.weight_kg = 1
+        second, _ = auth.authenticate_credentials(self.token.key)
+        self.assertEqual(second.profile.weight_kg, 80)
+        self.assertIsNot(second.profile, first.profile)
+        self.assertIs(second.profile.user, second)
+        token_cache.invalidate_user(self.user.pk)
+        self.assertIsNone(token_cache.get(self.token.key))
+
+
+class PasswordHashingTests(TestCase):
+    @override_settings(PASSWORD_HASHERS=[
+        'api.hashers.TunedScryptPasswordHasher', 'api.hashers.TunedPBKDF2PasswordHasher',
+    ])
+    def test_login_upgrades_legacy_hash(self):
+        user = User.objects.create(
+            username='legacy', password=make_password('pass12345', hasher='pbkdf2_sha256')
+        )
+        response = APIClient().post(reverse('login'), {'username': 'legacy', 'password': 'pass12345'})
+        self.assertEqual(response.status_code, 200)
+        user.refresh_from_db()
+        self.assertTrue(user.password.startswith('scrypt$'))
+
+    @override_settings(PASSWORD_HASH_CONCURRENCY=1, PASSWORD_HASH_WAIT_TIMEOUT=0.05)
+    def test_hashing_slots_are_shared(self):
+        with hashing_slot():
+            with self.assertRaises(HashingBusy):
+                with hashing_slot():
+                    pass
+        with hashing_slot():
+            pass
+
+
+class PasswordResetEmailTests(TestCase):
+    def test_reset_email_is_queued_and_delivered(self):
+        User.objects.create_user(username='tester', email='t@example.com', password='pass12345')
+        response = APIClient().post(reverse('password-reset'), {'email': 't@example.com'})
+        self.assertEqual(response.status_code, 200)
+        mail_queue.flush()
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['t@example.com'])
+
+    @override_settings(EMAIL_BACKEND='django.core.mail.backends.locmem.EmailBackend')
+    def test_retry_resends_only_unsent_messages(self):
+        from django.core.mail.backends.locmem import EmailBackend
+        real_send = EmailBackend.send_messages
+        calls = []
+
+        def flaky_send(backend, messages):
+            calls.append(messages[0].subject)
+            if len(calls) == 2:
+                raise OSError("connection reset")
+            return real_send(backend, messages)
+
+        with mock.patch.object(EmailBackend, 'send_messages', flaky_send), \
+                mock.patch.object(mail_queue, 'retry_delay', 0):
+            for i in range(3):
+                mail_queue.enqueue(f'm{i}', 'body', 'from@example.com', ['to@example.com'])
+            mail_queue.flush()
+        self.assertEqual([m.subject for m in mail.outbox], ['m0', 'm1', 'm2'])
+        self.assertEqual(calls, ['m0', 'm1', 'm1', 'm2'])
+
+
+class ReminderSchedulerTests(TestCase):
+    def setUp(self):
+        LocmemReminderBackend.outbox = []
+        for i, enabled in enumerate([True, True, True, False]):
+            user = User.objects.create(username=f'user{i}', email=f'user{i}@example.com')
+            Profile.objects.create(
+                user=user, gender='Male', age=30, height_cm=180, weight_kg=80,
+                activity_level='1.2', goal='Maintain', reminders_enabled=enabled,
+            )
+        done = User.objects.get(username='user0')
+        FoodLog.objects.create(user=done, food_name='Oats', calories=300, protein=10, carbs=50, fats=5, meal_type='Breakfast')
+        WaterLog.objects.create(user=done, amount_ml=250)
+
+    def test_reminds_each_due_user_once_per_day(self):
+        sent = send_reminders(date.today(), backend=LocmemReminderBackend(), batch_size=1)
+        self.assertEqual(sent, 2)
+        self.assertEqual(sorted(r['username'] for r in LocmemReminderBackend.outbox), ['user1', 'user2'])
+        self.assertEqual(LocmemReminderBackend.outbox[0]['missing'], ['food', 'water'])
+        self.assertEqual(send_reminders(date.today(), backend=LocmemReminderBackend()), 0)
+
+    @override_settings(REMINDER_LOCAL_HOUR=20)
+    def test_timezones_are_reminded_after_the_local_hour(self):
+        for name in ('Pacific/Kiritimati', 'Pacific/Pago_Pago'):
+            user = User.objects.create(username=name)
+            Profile.objects.create(
+                user=user, gender='Male', age=30, height_cm=180, weight_kg=80,
+                activity_level='1.2', goal='Maintain', reminders_enabled=True, timezone=name,
+            )
+        # 06:00 UTC: 20:00 on 03-01 in Kiritimati, 19:00 on 02-29 in Pago Pago, too early in UTC
+        now = datetime(2024, 3, 1, 6, 0, tzinfo=dt_timezone.utc)
+        with mock.patch('api.localtime.timezone.now', return_value=now):
+            self.assertEqual(send_reminders(backend=LocmemReminderBackend()), 1)
+        self.assertEqual([r['username'] for r in LocmemReminderBackend.outbox], ['Pacific/Kiritimati'])
+        self.assertEqual(Profile.objects.get(user__username='Pacific/Kiritimati').last_reminder_date, date(2024, 3, 1))
+
+    def test_console_backend_writes_to_stream(self):
+        stream = io.StringIO()
+        ConsoleReminderBackend(stream).send_batch([{'username': 'user0', 'missing': ['food', 'water']}])
+        self.assertEqual(stream.getvalue(), "Reminder for user0: log your food and water today\n")
+
+
+class LocalDateTests(TestCase):
+    def test_logs_are_dated_in_the_users_timezone(self):
+        # 2024-03-01 11:30 UTC is already 03-02 in Kiritimati (UTC+14), still 03-01 in Pago Pago (UTC-11)
+        now = datetime(2024, 3, 1, 11, 30, tzinfo=dt_timezone.utc)
+        expected = {'Pacific/Kiritimati': date(2024, 3, 2), 'Pacific/Pago_Pago': date(2024, 3, 1)}
+        for name, day in expected.items():
+            user = User.objects.create(username=name)
+            Profile.objects.create(
+                user=user, gender='Female', age=30, height_cm=165, weight_kg=60,
+                activity_level='1.2', goal='Maintain', timezone=name,
+            )
+            client = APIClient()
+            client.force_authenticate(User.objects.select_related('profile').get(pk=user.pk))
+            with mock.patch('api.localtime.timezone.now', return_value=now):
+                client.post(reverse('water-intake'), {'amount_ml': 250}, format='json')
+                WeightLog.objects.create(user=user, weight_kg=60)
+                summary = client.get(reverse('water-intake')).data
+            self.assertEqual(WaterLog.objects.get(user=user).date_eaten, day)
+            self.assertEqual(WeightLog.objects.get(user=user).date, day)
+            self.assertEqual(summary['consumed_ml'], 250)
+
+
+class StreakCounterTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass12345')
+        Profile.objects.create(
+            user=self.user, gender='Male', age=30, height_cm=180, weight_kg=80,
+            activity_level='1.2', goal='Maintain',
+        )
+        self.today = date.today()
+
+    def _log(self, calories, day=None):
+        log = FoodLog.objects.create(
+            user=self.user, food_name='Meal', calories=calories,
+            protein=10, carbs=10, fats=10, meal_type='Lunch',
+        )
+        if day:
+            FoodLog.objects.filter(pk=log.pk).update(date_eaten=day)
+        return log
+
+    def test_create_and_delete_update_counters(self):
+        log = self._log(2136)
+        counters = get_counters(User.objects.get(pk=self.user.pk), self.today)
+        self.assertEqual(counters['streak'], 1)
+        self.assertEqual(counters['month_met_target_days'], 1)
+
+        log.delete()
+        counters = get_counters(User.objects.get(pk=self.user.pk), self.today)
+        self.assertEqual(counters['streak'], 0)
+        self.assertEqual(counters['month_logged_days'], 0)
+
+    def test_nightly_rebuild_counts_consecutive_days(self):
+        for offset in (5, 2, 1):
+            self._log(500, self.today - timedelta(days=offset))
+        self._log(500)
+        rebuild_all(self.today)
+        counters = get_counters(User.objects.get(pk=self.user.pk), self.today)
+        self.assertEqual(counters['streak'], 3)
+        self.assertEqual(counters['longest_streak'], 3)
+
+    def test_reads_never_write_and_repair_fixes_flagged_rows(self):
+        self._log(500, self.today - timedelta(days=1))
+        LoggingStreak.objects.all().delete()
+        user = User.objects.get(pk=self.user.pk)
+        # Streak row, logged days, calorie target: no writes
+        with self.assertNumQueries(3):
+            counters = get_counters(user, self.today)
+        self.assertEqual(counters['streak'], 1)
+        self.assertFalse(LoggingStreak.objects.exists())
+
+        self.assertEqual(repair(self.today), 1)
+        self._log(500, self.today - timedelta(days=3))
+        # Back-dated day bridging two runs
+        FoodLog.objects.create(
+            user=self.user, food_name='Meal', calories=500, protein=10, carbs=10, fats=10,
+            meal_type='Lunch', date_eaten=self.today - timedelta(days=2),
+        )
+        self.assertTrue(LoggingStreak.objects.get(user=self.user).needs_repair)
+        self.assertEqual(repair(self.today), 1)
+        self.assertEqual(repair(self.today), 0)
+        streak = LoggingStreak.objects.get(user=self.user)
+        self.assertFalse(streak.needs_repair)
+        self.assertEqual(streak.longest_streak, 3)
+
+    def test_delete_then_backfill_is_repaired(self):
+        for offset in (3, 2):
+            self._log(500, self.today - timedelta(days=offset))
+        rebuild_all(self.today)
+        latest = FoodLog.objects.create(
+            user=self.user, food_name='Meal', calories=500, protein=10, carbs=10, fats=10,
+            meal_type='Lunch', date_eaten=self.today,
+        )
+        latest.delete()
+        FoodLog.objects.create(
+            user=self.user, food_name='Meal', calories=500, protein=10, carbs=10, fats=10,
+            meal_type='Lunch', date_eaten=self.today - timedelta(days=1),
+        )
+        self.assertTrue(LoggingStreak.objects.get(user=self.user).needs_repair)
+        repair(self.today)
+        streak = LoggingStreak.objects.get(user=self.user)
+        self.assertEqual((streak.current_streak, streak.longest_streak), (3, 3))
+
+
+class SleepAnalyticsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tester', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_bedtime_mean_wraps_midnight(self):
+        for bedtime, duration in ((time(23, 30), 420), (time(0, 30), 480)):
+            SleepLog.objects.create(
+                user=self.user, bedtime=bedtime, wake_time=time(7, 30), duration_minutes=duration,
+                deep_sleep_minutes=90, light_sleep_minutes=240, rem_sleep_minutes=90, awake_minutes=30,
+            )
+        data = self.client.get(reverse('sleep-analytics')).data
+        self.assertEqual(data['nights'], 2)
+        self.assertEqual(data['bedtime']['mean'], '00:00')
+        self.assertEqual(data['avg_duration_minutes'], 450)
+        self.assertEqual(data['sleep_debt']['total_minutes'], 60)
+        self.assertEqual(data['stage_percentages']['light'], 53.3)
+
+    def test_range_is_limited(self):
+        for params in ({'start': '2000-01-01', 'end': '2020-01-01'}, {'start': '2020-01-02', 'end': '2020-01-01'},
+                       {'end': '0001-01-01'}):
+            self.assertEqual(self.client.get(reverse('sleep-analytics'), params).status_code, 400)
+
+
+class EnergyLedgerTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(username='tester', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        self.profile = Profile.objects.create(
+            user=self.user, gender='Male', age=30, height_cm=180,
+            weight_kg=80, activity_level='1.2', goal='Maintain',
+        )
+
+    def test_dashboard_includes_exercise_and_projection(self):
+        FoodLog.objects.create(
+            user=self.user, food_name='Rice', calories=1500,
+            protein=30, carbs=300, fats=10, meal_type='Lunch',
+        )
+        ExerciseLog.objects.create(user=self.user, exercise_type='Cardio', duration_minutes=30, calories_burned=400)
+        data = self.client.get(reverse('dashboard-summary'), {'projection': '1'}).data
+
+        self.assertEqual(data['consumed_calories'], 1500)
+        self.assertEqual(data['burned_calories'], 400)
+        self.assertEqual(data['remaining_calories'], round(self.profile.daily_calorie_target - 1500 + 400))
+        expected_net = round(1500 - 400 - self.profile.tdee, 1)
+        self.assertEqual(data['net_calories'], expected_net)
+        self.assertEqual(data['projection']['7d']['logged_days'], 1)
+        self.assertEqual(data['projection']['7d']['net_calories'], expected_net)
+
+
+@override_settings(LOG_RETENTION_DAYS=62)
+class LogArchiveTests(TestCase):
+    def setUp(self):
+        [username] = generate(users=1, days=200, seed=7, prefix='archive-user-')['users']
+        self.user = User.objects.get(username=username)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+        rebuild_all(date.today())
+
+    def snapshot(self):
+        start = (date.today() - timedelta(days=199)).isoformat()
+        weight = self.client.get(reverse('weight-tracker')).data
+        return {
+            "export": self.client.get(reverse('export-daily'), {'start': start}).data["days"],
+            "weight": {key: weight[key] for key in ('current_weight', 'start_weight', 'change')},
+            "weights": [(item['date'], item['weight_kg']) for item in weight['logs']],
+            "correlations": self.client.get(reverse('stats-correlations'), {'days': '200'}).data["rolling"],
+            "sleep": self.client.get(reverse('sleep-analytics'), {'start': start}).data,
+            "streak": get_counters(self.user, date.today()),
+        }
+
+    def test_archived_history_stays_reachable(self):
+        before = self.snapshot()
+        cutoff = archive_cutoff(date.today())
+        result = archive_before(cutoff)
+
+        self.assertGreater(result["rows"], 0)
+        self.assertFalse(FoodLog.objects.filter(user=self.user, date_eaten__lt=cutoff).exists())
+        self.assertFalse(SleepLog.objects.filter(user=self.user, date__lt=cutoff).exists())
+        self.assertEqual(DailySummary.objects.filter(user=self.user).count(), result["days"])
+        rebuild_all(date.today())
+
+        after = self.snapshot()
+        self.assertEqual([day.pop("archived") for day in after["export"]],
+                         [day.pop("archived") or day["date"] < cutoff for day in before["export"]])
+        for key in before:
+            with self.subTest(key):
+                self.assertEqual(after[key], before[key])
+
+    def test_back_dated_logs_are_merged_into_summary(self):
+        cutoff = archive_cutoff(date.today())
+        archive_before(cutoff)
+        day = cutoff - timedelta(days=3)
+        before = DailySummary.objects.get(user=self.user, date=day).water_ml or 0
+        log = WaterLog.objects.create(user=self.user, amount_ml=500)
+        WaterLog.objects.filter(pk=log.pk).update(date_eaten=day)
+
+        archive_before(cutoff)
+        self.assertEqual(DailySummary.objects.get(user=self.user, date=day).water_ml, before + 500)
+        self.assertFalse(WaterLog.objects.filter(user=self.user, date_eaten__lt=cutoff).exists())
+
+
+class ArchiveCutoffTests(TestCase):
+    @override_settings(LOG_RETENTION_DAYS=62)
+    def test_cutoff_follows_the_users_local_date(self):
+        # 2024-03-01 11:30 UTC is 03-02 in Kiritimati; the archive job cuts from 02-29 (UTC-12)
+        now = datetime(2024, 3, 1, 11, 30, tzinfo=dt_timezone.utc)
+        user = User.objects.create(username='kiritimati')
+        Profile.objects.create(
+            user=user, gender='Female', age=30, height_cm=165, weight_kg=60,
+            activity_level='1.2', goal='Maintain', timezone='Pacific/Kiritimati',
+        )
+        with mock.patch('api.localtime.timezone.now', return_value=now):
+            user_cutoff = archive_cutoff(date(2024, 3, 2))
+            self.assertTrue(reaches_archive(user, user_cutoff - timedelta(days=1)))
+            self.assertFalse(reaches_archive(user, user_cutoff))
+            self.assertLess(archive_cutoff(earliest_today()), user_cutoff)
+
+
+class HistorySnapshotTests(TestCase):
+    def setUp(self):
+        [username] = generate(users=1, days=90, seed=3, prefix='snapshot-user-')['users']
+        self.user = User.objects.get(username=username)
+
+    def test_writes_are_folded_in_on_next_read(self):
+        snapshots.load(self.user)
+        FoodLog.objects.create(user=self.user, food_name='Apple', calories=95, protein=0.5, carbs=25, fats=0.3, meal_type='Snack')
+        WeightLog.objects.create(user=self.user, weight_kg=80.5)
+        ExerciseLog.objects.filter(user=self.user).last().delete()
+
+        refreshed = snapshots.load(self.user).matrix
+        with self.assertNumQueries(1):
+            stored = snapshots.load(self.user).matrix
+        self.assertFalse(stored.flags.writeable)  # view of the stored bytes
+        np.testing.assert_array_equal(stored, refreshed)
+        np.testing.assert_array_equal(stored, snapshots.rebuild(self.user).matrix)
+        self.assertEqual(stored[-1, snapshots.COLUMN['weight_kg']], 80.5)
+
+    def test_monthly_weights_are_per_day(self):
+        user = User.objects.create(username='weigher')
+        Profile.objects.create(
+            user=user, gender='Male', age=30, height_cm=180, weight_kg=80,
+            activity_level='1.2', goal='Lose', timezone='UTC',
+        )
+        for day, weight in ((date(2024, 3, 1), 80.0), (date(2024, 3, 1), 79.0), (date(2024, 3, 10), 78.0)):
+            log = WeightLog.objects.create(user=user, weight_kg=weight)
+            WeightLog.objects.filter(pk=log.pk).update(date=day)
+        client = APIClient()
+        client.force_authenticate(User.objects.select_related('profile').get(pk=user.pk))
+        with mock.patch('api.localtime.timezone.now', return_value=datetime(2024, 3, 15, 12, tzinfo=dt_timezone.utc)):
+            data = client.get(reverse('stats-monthly')).data
+        # The first day's last weigh-in is the start weight, like the daily values
+        self.assertEqual(data['user_profile']['start_weight'], 79.0)
+        self.assertEqual(data['user_profile']['end_weight'], 78.0)
+        self.assertEqual(data['weight_change'], -1.0)
+        self.assertEqual(data['daily_stats'][0]['weight'], 79.0)
+
+
+class ResponseEncodingTests(TestCase):
+    def setUp(self):
+        [username] = generate(users=1, days=60, seed=11, prefix='encoding-user-')['users']
+        self.user = User.objects.select_related('profile').get(username=username)
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    def test_fast_renderer_matches_drf(self):
+        data = self.client.get(reverse('dashboard')).data
+        data['numpy'] = {1: np.float64(1.5), 'values': np.arange(3)}
+        self.assertEqual(
+            json.loads(FastJSONRenderer().render(data)),
+            json.loads(JSONRenderer().render(data)),
+        )
+
+    def test_large_json_is_gzipped_and_etag_still_matches(self):
+        response = self.client.get(reverse('weight-tracker'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response['Vary'])
+        self.assertEqual(json.loads(gzip.decompress(response.content)), json.loads(json.dumps(response.data)))
+
+        cached = self.client.get(
+            reverse('weight-tracker'), HTTP_ACCEPT_ENCODING='gzip', HTTP_IF_NONE_MATCH=response['ETag'],
+        )
+        self.assertEqual(cached.status_code, 304)
+
+    def test_small_or_unaccepted_responses_are_not_compressed(self):
+        response = self.client.get(reverse('activity-tracker'), HTTP_ACCEPT_ENCODING='gzip')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        response = self.client.get(reverse('weight-tracker'), HTTP_ACCEPT_ENCODING='gzip;q=0, identity')
+        self.assertFalse(response.has_header('Content-Encoding'))
+
+
+@override_settings(PERF_SAMPLE_RATE=1.0)
+class RequestTimingTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(username='tester', password='pass12345')
+        self.client = APIClient()
+        self.client.force_authenticate(self.user)
+
+    @override_settings(PERF_SERVER_TIMING=True)
+    def test_server_timing_and_structured_log(self):
+        with self.assertLogs('api.performance', level='INFO') as logs:
+            response = self.client.get(reverse('weight-tracker'))
+        self.assertFalse(response.has_header('Server-Timing'))
+        self.user.is_staff = True
+        self.user.save()
+        with self.assertLogs('api.performance', level='INFO'):
+            response = self.client.get(reverse('weight-tracker'))
+        self.assertIn('db;dur=', response['Server-Timing'])
+
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'weight-tracker')
+        self.assertEqual(record['status'], 200)
+        self.assertGreaterEqual(record['db_queries'], 2)
+
+    def test_filtered_log_line_is_not_serialized(self):
+        with mock.patch('api.instrumentation.json.dumps') as dumps:
+            self.client.get(reverse('weight-tracker'))
+        dumps.assert_not_called()
+
+    def test_metrics_endpoint(self):
+        self.client.get(reverse('weight-tracker'))
+        with self.settings(METRICS_TOKEN='secret'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        body = response.content.decode()
+        self.assertIn('fitguide_http_requests_total{view="weight-tracker",method="GET",status="200"}', body)
+        self.assertIn('fitguide_db_queries_per_request_count{view="weight-tracker"}', body)
+
+
+# Query and latency budgets per endpoint: (method, url name, params, max queries, max median ms).
+# Each endpoint runs against seeded histories of every size in BUDGET_FIXTURE_DAYS; its query
+# count must stay within budget and must not grow with the amount of data (N+1 queries).
+# Latency budgets are generous ceilings for the largest fixture, only checked with
+# LATENCY_BUDGETS=True (timings are noisy on shared CI machines); scale them with
+# LATENCY_BUDGET_FACTOR on slow machines. Query budgets are always checked.
+CHECK_LATENCY_BUDGETS = os.getenv('LATENCY_BUDGETS', 'False') == 'True'
+BUDGET_FIXTURE_DAYS = (7, 60, 400)
+ENDPOINT_BUDGETS = [
+    ('get', 'update-profile', {}, 1, 100),
+    ('get', 'dashboard', {}, 8, 400),
+    ('get', 'dashboard', {'fields': 'summary,weekly'}, 3, 150),
+    ('get', 'dashboard-summary', {'projection': '1'}, 3, 150),
+    ('get', 'stats-weekly', {'projection': '1'}, 3, 150),
+    ('get', 'stats-monthly', {}, 2, 200),
+    ('get', 'stats-correlations', {'days': '365'}, 2, 300),
+    ('get', 'water-intake', {}, 2, 100),
+    ('get', 'weight-tracker', {}, 2, 300),
+    ('get', 'weight-tracker', {'resolution': 'weekly'}, 2, 300),
+    ('get', 'activity-tracker', {}, 1, 100),
+    ('get', 'sleep-tracker', {}, 2, 150),
+    ('get', 'sleep-analytics', {}, 2, 150),
+    ('get', 'log-food', {}, 1, 100),
+    ('get', 'diet-suggestions', {}, 1, 100),
+    ('get', 'monthly-report-pdf', {}, 1, 3000),
+    ('get', 'export-daily', {}, 7, 300),
+    ('post', 'log-food', {'food_name': 'Apple', 'calories': 95, 'protein': 0.5,
+                          'carbs': 25, 'fats': 0.3, 'meal_type': 'Snack'}, 8, 150),
+    ('post', 'water-intake', {'amount_ml': 250}, 2, 100),
+]
+
+
+class EndpointBudgetTests(TestCase):
+    def measure(self, user, method, name, params):
+        client = APIClient()
+        client.force_authenticate(user)
+        cache.clear()
+        request = getattr(client, method)
+        with CaptureQueriesContext(connection) as queries:
+            response = request(reverse(name), params, format='json') if method == 'post' else request(reverse(name), params)
+        self.assertLess(response.status_code, 300, f"{method.upper()} {name}: {response.status_code}")
+        count = len(queries)
+        if not CHECK_LATENCY_BUDGETS:
+            return count, None
+
+        timings = []
+        for _ in range(3):
+            cache.clear()
+            start = perf_counter()
+            request(reverse(name), params, format='json') if method == 'post' else request(reverse(name), params)
+            timings.append((perf_counter() - start) * 1000)
+        return count, sorted(timings)[1]
+
+    def test_query_and_latency_budgets(self):
+        factor = float(os.getenv('LATENCY_BUDGET_FACTOR', '1'))
+        counts = {}
+        latencies = {}
+        with mock.patch('api.views.genai.GenerativeModel', FakeGeminiModel):
+            for days in BUDGET_FIXTURE_DAYS:
+                [username] = generate(users=1, days=days, seed=days, prefix='budget-user-', replace=True)['users']
+                rebuild_all(date.today())
+                user = User.objects.get(username=username)
+                snapshots.rebuild(user)
+                for method, name, params, _, _ in ENDPOINT_BUDGETS:
+                    key = (method, name, tuple(params.items()))
+                    count, latency = self.measure(user, method, name, params)
+                    counts.setdefault(key, []).append(count)
+                    latencies[key] = latency
+
+        for method, name, params, max_queries, max_ms in ENDPOINT_BUDGETS:
+            key = (method, name, tuple(params.items()))
+            with self.subTest(endpoint=f"{method.upper()} {name} {params or ''}"):
+                self.assertEqual(
+                    len(set(counts[key])), 1,
+                    f"query count grows with data size {dict(zip(BUDGET_FIXTURE_DAYS, counts[key]))}",
+                )
+                self.assertLessEqual(counts[key][0], max_queries)
+                if CHECK_LATENCY_BUDGETS:
+                    self.assertLessEqual(latencies[key], max_ms * factor)
@@ -0,0 +1,128 @@
+import numpy as np
+
+RESOLUTIONS = ('daily', 'weekly', 'monthly')
+
+
+def parse_downsample_params(query_params):
+    """
+    Read the optional `resolution` / `max_points` query parameters.
+    Returns (resolution, max_points), either of which may be None.
+    Raises ValueError with a user-facing message on bad input.
+    """
+    resolution = query_params.get('resolution')
+    max_points = query_params.get('max_points')
+
+    if resolution and max_points:
+        raise ValueError("Use either 'resolution' or 'max_points', not both")
+
+    if resolution and resolution not in RESOLUTIONS:
+        raise ValueError(f"'resolution' must be one of: {', '.join(RESOLUTIONS)}")
+
+    if max_points is not None:
+        try:
+            max_points = int(max_points)
+        except ValueError:
+            raise ValueError("'max_points' must be an integer")
+        if max_points < 3:
+            raise ValueError("'max_points' must be at least 3")
+
+    return resolution or None, max_points
+
+
+def _to_days(dates):
+    return np.array(dates, dtype='datetime64[D]')
+
+
+def _bucket_starts(days, resolution):
+    if resolution == 'daily':
+        return days
+    if resolution == 'weekly':
+        # 1970-01-01 was a Thursday, so shift by 3 to make Monday day 0
+        weekday = (days.astype(np.int64) + 3) % 7
+        return days - weekday.astype('timedelta64[D]')
+    return days.astype('datetime64[M]').astype('datetime64[D]')
+
+
+def _bands(values, starts):
+    """Min/max/mean/count for contiguous buckets beginning at index `starts`."""
+    counts = np.diff(np.append(starts, len(values)))
+    return (
+        np.minimum.reduceat(values, starts),
+        np.maximum.reduceat(values, starts),
+        np.add.reduceat(values, starts) / counts,
+        counts,
+    )
+
+
+def _rows(bucket_days, mins, maxs, means, counts, points=None):
+    rows = []
+    for i in range(len(bucket_days)):
+        row = {
+            "date": str(bucket_days[i]),
+            "min": round(float(mins[i]), 2),
+            "max": round(float(maxs[i]), 2),
+            "mean": round(float(means[i]), 2),
+            "count": int(counts[i]),
+        }
+        if points is not None:
+            row["value"] = round(float(points[i]), 2)
+        rows.append(row)
+    return rows
+
+
+def bucket_series(dates, values, resolution):
+    """Aggregate a date-sorted series into calendar buckets with min/max/mean bands."""
+    if not len(dates):
+        return []
+    days = _to_days(dates)
+    values = np.asarray(values, dtype=np.float64)
+
+    keys = _bucket_starts(days, resolution)
+    bucket_days, starts = np.unique(keys, return_index=True)
+    return _rows(bucket_days, *_bands(values, starts))
+
+
+def lttb_series(dates, values, max_points):
+    """
+    Largest-Triangle-Three-Buckets downsampling to at most `max_points` buckets.
+    Each bucket reports the LTTB-selected point (`date`/`value`) plus the
+    min/max/mean band of all raw points it covers.
+    """
+    n = len(dates)
+    if not n:
+        return []
+    days = _to_days(dates)
+    values = np.asarray(values, dtype=np.float64)
+
+    if n <= max_points:
+        return _rows(days, values, values, values, np.ones(n, dtype=np.int64), values)
+
+    x = days.astype(np.int64).astype(np.float64)
+
+    # First and last points get their own buckets, the rest is split evenly
+    inner = np.linspace(1, n - 1, max_points - 1).astype(np.int64)
+    starts = np.concatenate(([0], inner[:-1], [n - 1]))
+
+    selected = np.empty(max_points, dtype=np.int64)
+    selected[0] = 0
+    selected[-1] = n - 1
+    for b in range(1, max_points - 1):
+        lo, hi = starts[b], starts[b + 1]
+        # Average of the next bucket is the third triangle vertex
+        nlo, nhi = starts[b + 1], (starts[b + 2] if b + 2 < max_points else n)
+        avg_x = x[nlo:nhi].mean()
+        avg_y = values[nlo:nhi].mean()
+
+        ax, ay = x[selected[b - 1]], values[selected[b - 1]]
+        area = np.abs(
+            (ax - avg_x) * (values[lo:hi] - ay) - (ax - x[lo:hi]) * (avg_y - ay)
+        )
+        selected[b] = lo + int(area.argmax())
+
+    return _rows(days[selected], *_bands(values, starts), values[selected])
+
+
+def downsample(dates, values, resolution=None, max_points=None):
+    if max_points:
+        return lttb_series(dates, values, max_points)
+    return bucket_series(dates, values, resolution)
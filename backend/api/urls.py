@@ -1,5 +1,5 @@
 from django.urls import path
-from .views import UpdateProfileView, SearchFoodView, LogFoodView, DashboardSummaryView, WeeklyStatsView, WaterIntakeView, WeightTrackerView, ExerciseLogView, DietSuggestionView, MonthlyStatsView, SleepLogView, GenerateMonthlyReportView, DeleteFoodLogView, DeleteWaterLogView, DeleteWeightLogView, DeleteExerciseLogView, DeleteSleepLogView
+from .views import UpdateProfileView, SearchFoodView, LogFoodView, DashboardView, DashboardSummaryView, WeeklyStatsView, WaterIntakeView, WeightTrackerView, ExerciseLogView, DietSuggestionView, MonthlyStatsView, CacheStatsView, CorrelationStatsView, SleepLogView, SleepAnalyticsView, GenerateMonthlyReportView, DailyHistoryExportView, DeleteFoodLogView, DeleteWaterLogView, DeleteWeightLogView, DeleteExerciseLogView, DeleteSleepLogView
 from .views_auth import RegisterView, CustomLoginView, LogoutView, PasswordResetRequestView, PasswordResetConfirmView
 
 urlpatterns = [
@@ -9,15 +9,20 @@ urlpatterns = [
     path('update-profile/', UpdateProfileView.as_view(), name='update-profile'),
     path('search-food/', SearchFoodView.as_view(), name='search-food'),
     path('log-food/', LogFoodView.as_view(), name='log-food'),
+    path('dashboard/', DashboardView.as_view(), name='dashboard'),
     path('dashboard-summary/', DashboardSummaryView.as_view(), name='dashboard-summary'),
     path('stats/weekly/', WeeklyStatsView.as_view(), name='stats-weekly'),
     path('stats/monthly/', MonthlyStatsView.as_view(), name='stats-monthly'),
+    path('stats/cache/', CacheStatsView.as_view(), name='stats-cache'),
+    path('stats/correlations/', CorrelationStatsView.as_view(), name='stats-correlations'),
     path('water/', WaterIntakeView.as_view(), name='water-intake'),
     path('weight/', WeightTrackerView.as_view(), name='weight-tracker'),
     path('activity/', ExerciseLogView.as_view(), name='activity-tracker'),
     path('diet-suggestions/', DietSuggestionView.as_view(), name='diet-suggestions'),
     path('sleep/', SleepLogView.as_view(), name='sleep-tracker'),
+    path('sleep/analytics/', SleepAnalyticsView.as_view(), name='sleep-analytics'),
     path('monthly-report-pdf/', GenerateMonthlyReportView.as_view(), name='monthly-report-pdf'),
+    path('export/daily/', DailyHistoryExportView.as_view(), name='export-daily'),
     path('log-food/<int:pk>/', DeleteFoodLogView.as_view(), name='delete-food-log'),
     path('water/<int:pk>/', DeleteWaterLogView.as_view(), name='delete-water-log'),
     path('weight/<int:pk>/', DeleteWeightLogView.as_view(), name='delete-weight-log'),
@@ -1,5 +1,6 @@
 import json
 import os
+import time
 import math
 from rest_framework.views import APIView
 from rest_framework.response import Response
@@ -7,7 +8,27 @@ from rest_framework import status, generics
 from django.shortcuts import get_object_or_404
 from .models import Profile, FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog
 from .serializers import ProfileSerializer, FoodLogSerializer, WaterLogSerializer, WeightLogSerializer, ExerciseLogSerializer, SleepLogSerializer
+from .rows import log_rows, select_fields
+from .timeseries import parse_downsample_params, downsample
+from .profile_metrics import bmi_category
+from .cache import cached_response, cache_stats
+from .conditional import conditional_on
+from .streaks import get_counters
+from .sleep_analytics import SLEEP_COLUMNS, DEFAULT_TARGET_MINUTES, analyze_sleep
+from .correlations import correlation_report
+from .dashboard import (
+    PROFILE_SECTIONS, activity_section, build_dashboard, ledger_for, parse_days, parse_fields,
+    section_models, sleep_logs, summary_section, water_section, weekly_section, weight_section,
+)
+from .energy import PROJECTION_WINDOWS, daily_ledger, history_ledger, projection
+from . import snapshots
+from .archive import ARCHIVED_SLEEP_COLUMNS, archived_rows, daily_history, reaches_archive
+from .instrumentation import timed
+from .localtime import local_today
+from .metrics import PDF_RENDER_DURATION, observe_gemini, registry
+from django.http import Http404, HttpResponse
 from django.conf import settings
+from django.db import transaction
 from django.db.models import Sum, StdDev
 from datetime import date, timedelta
 import google.generativeai as genai
@@ -17,6 +38,19 @@ from rest_framework import permissions
 # Configure Gemini
 genai.configure(api_key=settings.GEMINI_API_KEY)
 
+def generate_content(caller, prompt):
+    """Gemini call, recorded in the request timing and per-caller metrics."""
+    model = genai.GenerativeModel('gemini-2.5-flash')
+    start = time.perf_counter()
+    try:
+        with timed('gemini'):
+            response = model.generate_content(prompt)
+    except Exception:
+        observe_gemini(caller, time.perf_counter() - start, error=True)
+        raise
+    observe_gemini(caller, time.perf_counter() - start, response)
+    return response
+
 class UpdateProfileView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
@@ -40,36 +74,9 @@ class UpdateProfileView(APIView):
             serializer = ProfileSerializer(data=data)
 
         if serializer.is_valid():
-            # Save logic
+            # Profile.save() refreshes BMR/TDEE/target/BMI in the same write
             instance = serializer.save(user=user)
             
-            # Calculate BMR & TDEE
-            # Mifflin-St Jeor Equation
-            weight = instance.weight_kg
-            height = instance.height_cm
-            age = instance.age
-            gender = instance.gender
-            activity_multiplier = float(instance.activity_level)
-            
-            if gender == 'Male':
-                bmr = (10 * weight) + (6.25 * height) - (5 * age) + 5
-            else:
-                bmr = (10 * weight) + (6.25 * height) - (5 * age) - 161
-                
-            tdee = bmr * activity_multiplier
-            
-            # Adjust for goal
-            if instance.goal == 'Lose':
-                target = tdee - 500
-            elif instance.goal == 'Gain':
-                target = tdee + 500
-            else:
-                target = tdee
-                
-            instance.tdee = round(tdee, 2)
-            instance.daily_calorie_target = round(target, 2)
-            instance.save()
-            
             return Response(ProfileSerializer(instance).data)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -81,7 +88,6 @@ class SearchFoodView(APIView):
         if not query:
             return Response({"error": "Query parameter is required"}, status=status.HTTP_400_BAD_REQUEST)
             
-        model = genai.GenerativeModel('gemini-2.5-flash')
         prompt = f"""
         Identify the food '{query}' and return a JSON object with keys: 
         food_name, estimated_calories (integer), protein_g (float), carbs_g (float), fats_g (float). 
@@ -89,7 +95,7 @@ class SearchFoodView(APIView):
         """
         
         try:
-            response = model.generate_content(prompt)
+            response = generate_content(type(self).__name__, prompt)
             # Clean response if it contains markdown code blocks
             text = response.text.replace('```json', '').replace('```', '').strip()
             data = json.loads(text)
@@ -103,201 +109,130 @@ class LogFoodView(generics.ListCreateAPIView):
     
     def get_queryset(self):
         user = self.request.user
-        return FoodLog.objects.filter(user=user, date_eaten=date.today()).order_by('-id')
+        return FoodLog.objects.filter(user=user, date_eaten=local_today(user)).order_by('-id')
+
+    def list(self, request, *args, **kwargs):
+        try:
+            fields = select_fields(FoodLog, request.query_params.get('fields'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        return Response(log_rows(self.get_queryset(), fields))
         
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user=self.request.user, date_eaten=local_today(self.request.user))
 
 class DashboardSummaryView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on(FoodLog, ExerciseLog, profile=True)
+    @cached_response('dashboard-summary')
     def get(self, request):
         user = request.user
+        today = local_today(request.user)
         try:
             profile = user.profile
         except Profile.DoesNotExist:
             return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
-            
-        logs = FoodLog.objects.filter(user=user, date_eaten=date.today())
-        
-        total_calories = logs.aggregate(Sum('calories'))['calories__sum'] or 0
-        total_protein = logs.aggregate(Sum('protein'))['protein__sum'] or 0
-        total_carbs = logs.aggregate(Sum('carbs'))['carbs__sum'] or 0
-        total_fats = logs.aggregate(Sum('fats'))['fats__sum'] or 0
-        
-        return Response({
-            "target_calories": profile.daily_calorie_target,
-            "consumed_calories": total_calories,
-            "macros": {
-                "protein": total_protein,
-                "carbs": total_carbs,
-                "fats": total_fats
-            },
-            "remaining_calories": profile.daily_calorie_target - total_calories,
-            "recent_logs": FoodLogSerializer(logs, many=True).data
-        })
+
+        # Today's intake + exercise burn (and optionally the trailing month for projections)
+        with_projection = request.query_params.get('projection') in ('1', 'true')
+        ledger = ledger_for(user, profile, today, max(PROJECTION_WINDOWS) if with_projection else 1)
+        return Response(summary_section(user, profile, today, ledger, with_projection))
+
+def _dashboard_models(request):
+    try:
+        return section_models(parse_fields(request.query_params.get('fields')))
+    except ValueError:
+        return ()
+
+class DashboardView(APIView):
+    """Every dashboard widget in one response; ?fields=summary,weekly,... picks the sections."""
+    permission_classes = [permissions.IsAuthenticated]
+
+    @conditional_on(profile=True, models_for=_dashboard_models)
+    @cached_response('dashboard')
+    def get(self, request):
+        user = request.user
+        today = local_today(request.user)
+        try:
+            fields = parse_fields(request.query_params.get('fields'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        try:
+            profile = user.profile
+        except Profile.DoesNotExist:
+            if any(name in PROFILE_SECTIONS for name in fields):
+                return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
+            profile = None
+
+        with_projection = request.query_params.get('projection') in ('1', 'true')
+        return Response(build_dashboard(user, profile, today, fields, with_projection))
 
 class WeeklyStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on(FoodLog, ExerciseLog, profile=True)
+    @cached_response('stats-weekly')
     def get(self, request):
         user = request.user
-        today = date.today()
-        
-        # 1. Calculate Stats for Last 7 Days
-        stats = []
-        for i in range(6, -1, -1):
-            day = today - timedelta(days=i)
-            day_logs = FoodLog.objects.filter(user=user, date_eaten=day)
-            
-            total_calories = day_logs.aggregate(Sum('calories'))['calories__sum'] or 0
-            
-            stats.append({
-                "date": day.strftime("%Y-%m-%d"),
-                "day_name": day.strftime("%a"),
-                "calories": total_calories
-            })
-            
-        # 2. Calculate Streak
-        # Definition: Consecutive days ending yesterday (or today) where calories > 0
-        # For simplicity, let's just count consecutive days with logged food going back from today.
-        
-        streak = 0
-        check_date = today
-        
-        # Check today first? If they haven't logged today yet, streak shouldn't reset necessarily if they had a streak until yesterday.
-        # Common logic: Streak is active if logged yesterday OR today.
-        # Let's count backwards from today.
-        
-        # Optimization: Get all unique dates with logs for this user, ordered desc
-        logged_dates = FoodLog.objects.filter(user=user).dates('date_eaten', 'day', order='DESC')
-        
-        # Convert to list of dates for easier handling
-        logged_dates_list = list(logged_dates)
-        
-        if not logged_dates_list:
-            streak = 0
-        else:
-            # Check if today or yesterday is the latest log
-            latest_log = logged_dates_list[0]
-            if latest_log < today - timedelta(days=1):
-                streak = 0
-            else:
-                # Iterate and count consecutive
-                current_check = latest_log
-                streak = 1
-                for i in range(1, len(logged_dates_list)):
-                    prev_date = logged_dates_list[i]
-                    if prev_date == current_check - timedelta(days=1):
-                        streak += 1
-                        current_check = prev_date
-                    else:
-                        break
-        
-        return Response({
-            "daily_stats": stats,
-            "streak": streak
-        })
+        today = local_today(request.user)
+        tdee = Profile.objects.filter(user=user).values_list('tdee', flat=True).first()
+
+        # Last 7 days in one ledger query; streaks are stored counters, updated on every food log create/delete
+        ledger = daily_ledger(user, today - timedelta(days=6), today, tdee)
+        with_projection = request.query_params.get('projection') in ('1', 'true')
+        return Response(weekly_section(user, today, ledger, with_projection))
 
 class WaterIntakeView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on(WaterLog, profile=True)
+    @cached_response('water-intake')
     def get(self, request):
         user = request.user
-        today = date.today()
+        today = local_today(request.user)
         
         try:
-            profile = user.profile
+            user.profile
         except Profile.DoesNotExist:
              return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
 
-        # Fixed recommendation: 7 glasses * 250ml = 1750ml
-        water_goal = 1750 
-        
-        logs = WaterLog.objects.filter(user=user, date_eaten=today).order_by('-id')
-        total_consumed = logs.aggregate(Sum('amount_ml'))['amount_ml__sum'] or 0
-        
-        # Weekly Chart Data
-        weekly_chart_data = []
-        for i in range(6, -1, -1):
-            day = today - timedelta(days=i)
-            day_total = WaterLog.objects.filter(user=user, date_eaten=day).aggregate(Sum('amount_ml'))['amount_ml__sum'] or 0
-            weekly_chart_data.append({
-                "day_name": day.strftime("%a"),
-                "date": day.strftime("%Y-%m-%d"),
-                "amount_ml": day_total
-            })
-
-        return Response({
-            "goal_ml": water_goal,
-            "consumed_ml": total_consumed,
-            "remaining_ml": max(0, water_goal - total_consumed),
-            "logs": WaterLogSerializer(logs, many=True).data,
-            "weekly_chart_data": weekly_chart_data
-        })
+        return Response(water_section(user, today))
 
     def post(self, request):
         serializer = WaterLogSerializer(data=request.data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            serializer.save(user=request.user, date_eaten=local_today(request.user))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
 class WeightTrackerView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on(WeightLog)
     def get(self, request):
         user = request.user
-        logs = WeightLog.objects.filter(user=user).order_by('date')
-        
-        if not logs.exists():
-             return Response({
-                "logs": [],
-                "current_weight": 0,
-                "start_weight": 0,
-                "change": 0,
-                "plateau": False
-            })
-
-        current_weight = logs.last().weight_kg
-        start_weight = logs.first().weight_kg
-        change = round(current_weight - start_weight, 1)
-        
-        # Plateau Detection
-        # Logic: If standard deviation of last 5 logs (if available) is very low (< 0.2kg)
-        plateau = False
-        recent_logs = logs.order_by('-date')[:5]
-        if len(recent_logs) >= 3:
-            weights = [log.weight_kg for log in recent_logs]
-            # Calculate Standard Deviation
-            mean = sum(weights) / len(weights)
-            variance = sum([((x - mean) ** 2) for x in weights]) / len(weights)
-            std_dev = variance ** 0.5
-            
-            if std_dev < 0.2:
-                plateau = True
+        try:
+            resolution, max_points = parse_downsample_params(request.query_params)
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
-        return Response({
-            "logs": WeightLogSerializer(logs, many=True).data,
-            "current_weight": current_weight,
-            "start_weight": start_weight,
-            "change": change,
-            "plateau": plateau
-        })
+        return Response(weight_section(user, resolution, max_points))
 
     def post(self, request):
         serializer = WeightLogSerializer(data=request.data)
         if serializer.is_valid():
-            instance = serializer.save(user=request.user)
-            
-            # Sync with Profile
-            try:
-                profile = request.user.profile
-                profile.weight_kg = instance.weight_kg
-                # Maybe recalculate TDEE here? For now, let's just save.
-                profile.save()
-            except Profile.DoesNotExist:
-                pass
+            with transaction.atomic():
+                instance = serializer.save(user=request.user, date=local_today(request.user))
+
+                # Sync with Profile, reloaded: request.user.profile may be the
+                # authentication cache's copy, and save() recomputes TDEE,
+                # calorie target and BMI from every field in the same UPDATE
+                profile = Profile.objects.select_for_update().filter(user=request.user).first()
+                if profile:
+                    profile.weight_kg = instance.weight_kg
+                    profile.save(update_fields=['weight_kg'])
 
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
@@ -308,14 +243,8 @@ class ExerciseLogView(generics.ListCreateAPIView):
 
     def get(self, request):
         user = request.user
-        today = date.today()
-        logs = ExerciseLog.objects.filter(user=user, date=today).order_by('-id')
-        total_calories = logs.aggregate(Sum('calories_burned'))['calories_burned__sum'] or 0
-        
-        return Response({
-            "logs": ExerciseLogSerializer(logs, many=True).data,
-            "total_calories": total_calories
-        })
+        today = local_today(request.user)
+        return Response(activity_section(user, today))
 
     def post(self, request):
         data = request.data.copy()
@@ -329,13 +258,12 @@ class ExerciseLogView(generics.ListCreateAPIView):
                 ex_type = data.get('exercise_type')
                 desc = data.get('description', '')
                 
-                model = genai.GenerativeModel('gemini-2.5-flash')
                 prompt = f"""
                 Estimate calories burned for a {weight}kg person doing {duration} min of {ex_type} ({desc}).
                 Return ONLY an integer representing the estimated calories.
                 """
                 
-                response = model.generate_content(prompt)
+                response = generate_content(type(self).__name__, prompt)
                 estimated_calories = int(''.join(filter(str.isdigit, response.text)))
                 data['calories_burned'] = estimated_calories
             except Exception as e:
@@ -345,7 +273,7 @@ class ExerciseLogView(generics.ListCreateAPIView):
         
         serializer = ExerciseLogSerializer(data=data)
         if serializer.is_valid():
-            serializer.save(user=request.user)
+            serializer.save(user=request.user, date=local_today(request.user))
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
@@ -354,7 +282,7 @@ class DietSuggestionView(APIView):
 
     def get(self, request):
         user = request.user
-        today = date.today()
+        today = local_today(request.user)
         
         try:
             profile = user.profile
@@ -362,16 +290,17 @@ class DietSuggestionView(APIView):
             return Response({"error": "Profile not found"}, status=status.HTTP_404_NOT_FOUND)
             
         # Calculate remaining calories/macros
-        logs = FoodLog.objects.filter(user=user, date_eaten=today)
-        total_calories = logs.aggregate(Sum('calories'))['calories__sum'] or 0
-        total_protein = logs.aggregate(Sum('protein'))['protein__sum'] or 0
-        total_carbs = logs.aggregate(Sum('carbs'))['carbs__sum'] or 0
-        total_fats = logs.aggregate(Sum('fats'))['fats__sum'] or 0
+        totals = FoodLog.objects.filter(user=user, date_eaten=today).aggregate(
+            calories=Sum('calories'), protein=Sum('protein'), carbs=Sum('carbs'), fats=Sum('fats')
+        )
+        total_calories = totals['calories'] or 0
+        total_protein = totals['protein'] or 0
+        total_carbs = totals['carbs'] or 0
+        total_fats = totals['fats'] or 0
         
         remaining_calories = max(0, profile.daily_calorie_target - total_calories)
         
         # Construct Prompt
-        model = genai.GenerativeModel('gemini-2.5-flash')
         prompt = f"""
         The user has remaining calories: {remaining_calories} kcal for today.
         Current intake: {total_calories} kcal (Protein: {total_protein}g, Carbs: {total_carbs}g, Fats: {total_fats}g).
@@ -396,7 +325,7 @@ class DietSuggestionView(APIView):
         """
         
         try:
-            response = model.generate_content(prompt)
+            response = generate_content(type(self).__name__, prompt)
             # Clean response if it contains markdown code blocks
             text = response.text.replace('```json', '').replace('```', '').strip()
             suggestions = json.loads(text)
@@ -409,9 +338,11 @@ class DietSuggestionView(APIView):
 class MonthlyStatsView(APIView):
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on(FoodLog, ExerciseLog, WeightLog, profile=True)
+    @cached_response('stats-monthly')
     def get(self, request):
         user = request.user
-        today = date.today()
+        today = local_today(request.user)
         
         try:
             profile = user.profile
@@ -424,72 +355,48 @@ class MonthlyStatsView(APIView):
         start_date = today.replace(day=1)
         end_date = today
         
-        # 1. Fetch Daily Logs (Calories & Macros)
-        # We need a continuous list of days from start to end
+        # 1. Daily energy ledger (calories, macros, exercise burn) and weights,
+        # both read from the history snapshot; a continuous list of days from start to end
         daily_stats = []
         
         total_days = (end_date - start_date).days + 1
-        days_met_target = 0
-        total_calories_logged_days = 0
-        
-        # Fetch all logs for the month in one query for efficiency
-        food_logs = FoodLog.objects.filter(user=user, date_eaten__gte=start_date, date_eaten__lte=end_date)
-        weight_logs = WeightLog.objects.filter(user=user, date__gte=start_date, date__lte=end_date)
         
-        # Helper to filter logs in memory
-        def get_day_food_logs(d):
-            return [l for l in food_logs if l.date_eaten == d]
-            
-        def get_day_weight(d):
-            # Find last weight log on or before this day? 
-            # Or just weight log ON this day. Let's do ON this day for trend.
-            # If no weight logged today, maybe carry over previous?
-            # For charts, it's often better to have nulls or real data.
-            # Let's find exact match first.
-            matches = [l.weight_kg for l in weight_logs if l.date == d]
-            return matches[-1] if matches else None
-
-        current = start_date
-        while current <= end_date:
-            day_logs = get_day_food_logs(current)
-            
-            cals = sum(l.calories for l in day_logs)
-            prot = sum(l.protein for l in day_logs)
-            carbs = sum(l.carbs for l in day_logs)
-            fats = sum(l.fats for l in day_logs)
-            weight = get_day_weight(current)
-            
-            stat = {
+        history = snapshots.load(user, today)
+        ledger = history_ledger(history, start_date, end_date, profile.tdee)
+        _, month = history.window(start_date, end_date)
+        # Last weigh-in of each day; days without a log stay null
+        weight_by_day = {
+            start_date + timedelta(days=i): float(weight)
+            for i, weight in enumerate(month[:, snapshots.COLUMN['weight_kg']]) if not math.isnan(weight)
+        }
+
+        for entry in ledger:
+            current = entry["date"]
+            daily_stats.append({
                 "date": current.strftime("%Y-%m-%d"),
                 "day": current.day,
-                "calories": cals,
-                "protein": prot,
-                "carbs": carbs,
-                "fats": fats,
-                "weight": weight,
+                "calories": entry["intake"],
+                "protein": entry["protein"],
+                "carbs": entry["carbs"],
+                "fats": entry["fats"],
+                "burned": entry["burned"],
+                "net": entry["net"],
+                "weight": weight_by_day.get(current),
                 "target": profile.daily_calorie_target
-            }
-            daily_stats.append(stat)
-            
-            # Adherence Check
-            # Assume target met if within +/- 10% range
-            if cals > 0:
-                lower = profile.daily_calorie_target * 0.9
-                upper = profile.daily_calorie_target * 1.1
-                if lower <= cals <= upper:
-                    days_met_target += 1
-                total_calories_logged_days += 1
-            
-            current += timedelta(days=1)
+            })
 
-        # 2. Adherence Stats
+        # 2. Adherence Stats (stored counters; target met = within +/- 10%)
+        counters = get_counters(user, today)
+        days_met_target = counters["month_met_target_days"]
+        total_calories_logged_days = counters["month_logged_days"]
         adherence_percentage = 0
         if total_calories_logged_days > 0:
             adherence_percentage = round((days_met_target / total_calories_logged_days) * 100, 1)
 
         # 3. Weight Change and Insights
-        # Find first and last recorded weight in this month
-        month_weights = [l.weight_kg for l in weight_logs]
+        # First and last weighed day of the month, one value (the last
+        # weigh-in) per day as in daily_stats
+        month_weights = list(weight_by_day.values())
         weight_change = 0
         start_weight = profile.weight_kg # Fallback
         end_weight = profile.weight_kg   # Fallback
@@ -500,14 +407,8 @@ class MonthlyStatsView(APIView):
             if len(month_weights) >= 2:
                 weight_change = round(end_weight - start_weight, 1)
 
-        # Calculate BMI
-        height_m = profile.height_cm / 100
-        bmi = round(profile.weight_kg / (height_m * height_m), 1)
-        
-        bmi_category = "Normal"
-        if bmi < 18.5: bmi_category = "Underweight"
-        elif bmi >= 25 and bmi < 30: bmi_category = "Overweight"
-        elif bmi >= 30: bmi_category = "Obese"
+        # BMI is precomputed on the profile whenever weight/height change
+        bmi = profile.bmi
         
         # Insights Generation
         insights = []
@@ -529,9 +430,11 @@ class MonthlyStatsView(APIView):
                 "met_target_days": days_met_target,
                 "logged_days": total_calories_logged_days,
                 "percentage": adherence_percentage,
-                "streak": 0 # TODO: Calculate actual monthly streak if needed
+                "streak": counters["streak"],
+                "longest_streak": counters["longest_streak"]
             },
             "weight_change": weight_change,
+            "projection": projection(ledger),
             "month_name": today.strftime("%B"),
             "today_date": today.strftime("%Y-%m-%d"),
             "user_profile": {
@@ -544,26 +447,146 @@ class MonthlyStatsView(APIView):
                 "end_weight": end_weight,
                 "goal": profile.goal,
                 "bmi": bmi,
-                "bmi_category": bmi_category
+                "bmi_category": bmi_category(bmi)
             },
             "insights": insights
         })
 
+class CacheStatsView(APIView):
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
+
+def metrics_view(request):
+    """Prometheus scrape endpoint. Requires `Authorization: Bearer <METRICS_TOKEN>` when a token is set."""
+    token = settings.METRICS_TOKEN
+    if token:
+        if request.headers.get('Authorization') != f'Bearer {token}':
+            return HttpResponse(status=401)
+    elif not settings.DEBUG:
+        raise Http404
+    return HttpResponse(registry.render(), content_type='text/plain; version=0.0.4; charset=utf-8')
+
 class SleepLogView(generics.ListCreateAPIView):
     serializer_class = SleepLogSerializer
     permission_classes = [permissions.IsAuthenticated]
 
+    @conditional_on(SleepLog)
     def get(self, request):
         user = request.user
-        # Fetch last 30 days for history chart
-        end_date = date.today()
-        start_date = end_date - timedelta(days=30)
-        logs = SleepLog.objects.filter(user=user, date__range=[start_date, end_date]).order_by('-date')
+        try:
+            resolution, max_points = parse_downsample_params(request.query_params)
+            days = parse_days(request.query_params.get('days'))
+            fields = select_fields(SleepLog, request.query_params.get('fields'))
+        except ValueError as e:
+            return Response({"error": str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+        # Last 30 days by default for the history chart
+        logs = sleep_logs(user, local_today(user), days)
+
+        if resolution or max_points:
+            rows = list(logs.order_by('date').values_list('date', 'duration_minutes', 'quality_score'))
+            dates = [r[0] for r in rows]
+            return Response({
+                "duration_minutes": downsample(dates, [r[1] for r in rows], resolution, max_points),
+                "quality_score": downsample(dates, [r[2] for r in rows], resolution, max_points),
+            })
         
-        return Response(SleepLogSerializer(logs, many=True).data)
+        return Response(log_rows(logs, fields))
 
     def perform_create(self, serializer):
-        serializer.save(user=self.request.user)
+        serializer.save(user=self.request.user, date=local_today(self.request.user))
+
+class CorrelationStatsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @conditional_on(FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog)
+    @cached_response('stats-correlations')
+    def get(self, request):
+        today = local_today(request.user)
+        try:
+            days = int(request.query_params.get('days', 90))
+            max_lag = int(request.query_params.get('max_lag', 1))
+            window = int(request.query_params.get('window', 7))
+        except ValueError:
+            return Response({"error": "'days', 'max_lag' and 'window' must be integers"}, status=status.HTTP_400_BAD_REQUEST)
+        if not (1 <= days <= 3660 and 0 <= max_lag <= 14 and 1 <= window <= days):
+            return Response(
+                {"error": "Expected 1 <= days <= 3660, 0 <= max_lag <= 14 and 1 <= window <= days"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        start_date = today - timedelta(days=days - 1)
+        return Response({
+            "start": start_date.isoformat(),
+            "end": today.isoformat(),
+            **correlation_report(request.user, start_date, today, max_lag=max_lag, window=window),
+        })
+
+class SleepAnalyticsView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @conditional_on(SleepLog)
+    @cached_response('sleep-analytics')
+    def get(self, request):
+        user = request.user
+        today = local_today(request.user)
+        try:
+            end_date = date.fromisoformat(request.query_params.get('end', today.isoformat()))
+            start_date = date.fromisoformat(
+                request.query_params.get('start', (end_date - timedelta(days=30)).isoformat())
+            )
+            target = int(request.query_params.get('target_minutes', DEFAULT_TARGET_MINUTES))
+        except (ValueError, OverflowError):
+            return Response(
+                {"error": "'start'/'end' must be YYYY-MM-DD and 'target_minutes' an integer"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        if not 0 <= (end_date - start_date).days < 3660:
+            return Response(
+                {"error": "'start' must be on or before 'end' and at most 3660 days earlier"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        rows = list(
+            SleepLog.objects.filter(user=user, date__range=[start_date, end_date])
+            .order_by('date').values_list(*SLEEP_COLUMNS)
+        )
+        if reaches_archive(user, start_date):
+            # Archived days hold one combined night each
+            rows = list(archived_rows(user, start_date, end_date, 'sleep_minutes', ARCHIVED_SLEEP_COLUMNS)) + rows
+        return Response({
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            **analyze_sleep(rows, target),
+        })
+
+class DailyHistoryExportView(APIView):
+    permission_classes = [permissions.IsAuthenticated]
+
+    @conditional_on(FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog)
+    def get(self, request):
+        today = local_today(request.user)
+        try:
+            end_date = date.fromisoformat(request.query_params.get('end', today.isoformat()))
+            start_date = date.fromisoformat(
+                request.query_params.get('start', (end_date - timedelta(days=364)).isoformat())
+            )
+        except ValueError:
+            return Response({"error": "'start' and 'end' must be YYYY-MM-DD"}, status=status.HTTP_400_BAD_REQUEST)
+        if not 0 <= (end_date - start_date).days < 3660:
+            return Response(
+                {"error": "'start' must be on or before 'end' and at most 3660 days earlier"},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        # Per-day totals from the archive and the hot logs alike
+        return Response({
+            "start": start_date.isoformat(),
+            "end": end_date.isoformat(),
+            "days": daily_history(request.user, start_date, end_date),
+        })
 
 import matplotlib
 matplotlib.use('Agg')
@@ -579,7 +602,7 @@ class GenerateMonthlyReportView(APIView):
 
     def get(self, request):
         user = request.user
-        today = date.today()
+        today = local_today(request.user)
         
         try:
             profile = user.profile
@@ -589,9 +612,10 @@ class GenerateMonthlyReportView(APIView):
         start_date = today.replace(day=1)
         end_date = today
         
-        # 1. Fetch Data
-        logs = FoodLog.objects.filter(user=user, date_eaten__gte=start_date, date_eaten__lte=end_date).order_by('date_eaten')
-        weight_logs = WeightLog.objects.filter(user=user, date__gte=start_date, date__lte=end_date).order_by('date')
+        # 1. Fetch Data (per-day calories and weights from the history snapshot)
+        _, month = snapshots.load(user, today).window(start_date, end_date)
+        month_calories = month[:, snapshots.COLUMN['calories']].tolist()
+        month_weights = month[:, snapshots.COLUMN['weight_kg']].tolist()
         
         days_in_month = (end_date - start_date).days + 1
         dates = [start_date + timedelta(days=x) for x in range(days_in_month)]
@@ -599,70 +623,65 @@ class GenerateMonthlyReportView(APIView):
         daily_cals = []
         daily_weight = []
         logged_days_count = 0
-        met_target_count = 0
         total_cals_all_days = 0
         
         current_weight = profile.weight_kg
         start_weight_val = profile.weight_kg
         end_weight_val = profile.weight_kg
         
-        if weight_logs.exists():
-            start_weight_val = weight_logs.first().weight_kg
-            end_weight_val = weight_logs.last().weight_kg
+        weighed = [w for w in month_weights if not math.isnan(w)]
+        if weighed:
+            start_weight_val = weighed[0]
+            end_weight_val = weighed[-1]
             
-        weight_map = {log.date: log.weight_kg for log in weight_logs}
         last_known_weight = start_weight_val
         
-        for d in dates:
-            day_logs = [l for l in logs if l.date_eaten == d]
-            cals = sum(l.calories for l in day_logs)
+        for i, d in enumerate(dates):
+            cals = 0 if math.isnan(month_calories[i]) else int(month_calories[i])
             daily_cals.append(cals)
             
             if cals > 0:
                 logged_days_count += 1
                 total_cals_all_days += cals
-                if 0.9 * profile.daily_calorie_target <= cals <= 1.1 * profile.daily_calorie_target:
-                   met_target_count += 1
             
-            if d in weight_map:
-                last_known_weight = weight_map[d]
+            if not math.isnan(month_weights[i]):
+                last_known_weight = month_weights[i]
             daily_weight.append(last_known_weight)
 
         # 2. Charts
-        plt.figure(figsize=(10, 4))
-        plt.plot([d.day for d in dates], daily_weight, marker='o', linestyle='-', color='#0d9488', linewidth=2, markersize=4)
-        plt.title('Weight Progress')
-        plt.grid(True, linestyle='--', alpha=0.5)
-        plt.tight_layout()
-        
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', transparent=True)
-        buffer.seek(0)
-        weight_chart_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        plt.close()
-        
-        plt.figure(figsize=(10, 4))
-        plt.bar([d.day for d in dates], daily_cals, color='#2dd4bf', alpha=0.7)
-        plt.axhline(y=profile.daily_calorie_target, color='#ef4444', linestyle='--', linewidth=2)
-        plt.title('Daily Calories vs Target')
-        plt.tight_layout()
-        
-        buffer = BytesIO()
-        plt.savefig(buffer, format='png', transparent=True)
-        buffer.seek(0)
-        calorie_chart_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
-        plt.close()
+        with timed('charts'):
+            plt.figure(figsize=(10, 4))
+            plt.plot([d.day for d in dates], daily_weight, marker='o', linestyle='-', color='#0d9488', linewidth=2, markersize=4)
+            plt.title('Weight Progress')
+            plt.grid(True, linestyle='--', alpha=0.5)
+            plt.tight_layout()
+        
+            buffer = BytesIO()
+            plt.savefig(buffer, format='png', transparent=True)
+            buffer.seek(0)
+            weight_chart_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            plt.close()
+        
+            plt.figure(figsize=(10, 4))
+            plt.bar([d.day for d in dates], daily_cals, color='#2dd4bf', alpha=0.7)
+            plt.axhline(y=profile.daily_calorie_target, color='#ef4444', linestyle='--', linewidth=2)
+            plt.title('Daily Calories vs Target')
+            plt.tight_layout()
+        
+            buffer = BytesIO()
+            plt.savefig(buffer, format='png', transparent=True)
+            buffer.seek(0)
+            calorie_chart_b64 = base64.b64encode(buffer.getvalue()).decode('utf-8')
+            plt.close()
         
         # 3. Stats
+        counters = get_counters(user, today)
+        met_target_count = counters["month_met_target_days"]
         avg_calories = round(total_cals_all_days / logged_days_count) if logged_days_count > 0 else 0
         weight_change = round(end_weight_val - start_weight_val, 1)
         
-        height_m = profile.height_cm / 100
-        bmi = round(end_weight_val / (height_m * height_m), 1)
-        bmi_cat = "Normal"
-        if bmi < 18.5: bmi_cat = "Underweight"
-        elif 25 <= bmi < 30: bmi_cat = "Overweight"
-        elif bmi >= 30: bmi_cat = "Obese"
+        bmi = profile.bmi
+        bmi_cat = bmi_category(bmi)
         
         insights = []
         if met_target_count / days_in_month > 0.5:
@@ -695,20 +714,21 @@ class GenerateMonthlyReportView(APIView):
             'weight_chart': weight_chart_b64,
             'calorie_chart': calorie_chart_b64,
             'adherence': {
-                'logged_days': logged_days_count,
+                'logged_days': counters["month_logged_days"],
                 'met_target_days': met_target_count,
-                'streak': 0 
+                'streak': counters["streak"],
+                'longest_streak': counters["longest_streak"]
             },
             'total_days_in_month': days_in_month,
             'insights': insights
         }
         
-        html_string = render_to_string('pdf/monthly_report.html', context)
-        
         response = HttpResponse(content_type='application/pdf')
         response['Content-Disposition'] = f'attachment; filename="Monthly_Report_{today.strftime("%B")}.pdf"'
         
-        pisa_status = pisa.CreatePDF(html_string, dest=response)
+        with timed('pdf'), PDF_RENDER_DURATION.time():
+            html_string = render_to_string('pdf/monthly_report.html', context)
+            pisa_status = pisa.CreatePDF(html_string, dest=response)
         
         if pisa_status.err:
             return HttpResponse('We had some errors <pre>' + html_string + '</pre>')
@@ -8,8 +8,19 @@ from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth.tokens import default_token_generator
 from django.utils.http import urlsafe_base64_encode, urlsafe_base64_decode
 from django.utils.encoding import force_bytes, force_str
-from django.core.mail import send_mail
 from django.conf import settings
+from .authentication import token_cache
+from .hashers import HashingBusy, hashing_slot
+from .mailqueue import mail_queue
+
+
+def hashing_busy_response():
+    response = Response(
+        {'error': 'Server is busy, please try again shortly'},
+        status=status.HTTP_503_SERVICE_UNAVAILABLE
+    )
+    response['Retry-After'] = '1'
+    return response
 
 class RegisterView(APIView):
     permission_classes = [AllowAny]
@@ -31,11 +42,15 @@ class RegisterView(APIView):
                 status=status.HTTP_400_BAD_REQUEST
             )
 
-        user = User.objects.create_user(
-            username=username,
-            email=email,
-            password=password
-        )
+        try:
+            with hashing_slot():
+                user = User.objects.create_user(
+                    username=username,
+                    email=email,
+                    password=password
+                )
+        except HashingBusy:
+            return hashing_busy_response()
 
         token, _ = Token.objects.get_or_create(user=user)
 
@@ -53,7 +68,12 @@ class CustomLoginView(ObtainAuthToken):
 
     def post(self, request, *args, **kwargs):
         serializer = self.serializer_class(data=request.data, context={'request': request})
-        serializer.is_valid(raise_exception=True)
+        try:
+            # Password check (and any rehash-on-login upgrade) runs in a bounded slot
+            with hashing_slot():
+                serializer.is_valid(raise_exception=True)
+        except HashingBusy:
+            return hashing_busy_response()
         user = serializer.validated_data['user']
         token, created = Token.objects.get_or_create(user=user)
         return Response({
@@ -67,6 +87,7 @@ class LogoutView(APIView):
 
     def post(self, request):
         # Simply delete the token to force login again
+        token_cache.invalidate_user(request.user.pk)
         request.user.auth_token.delete()
         return Response(status=status.HTTP_200_OK)
 
@@ -101,7 +122,8 @@ class PasswordResetRequestView(APIView):
         If you didn't request this, please ignore this email.
         """
         
-        send_mail(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
+        # Queued: the background sender delivers it, so the request never waits on SMTP
+        mail_queue.enqueue(subject, message, settings.DEFAULT_FROM_EMAIL, [email])
         
         return Response({'message': 'If an account exists with this email, a reset link has been sent.'})
 
@@ -129,7 +151,12 @@ class PasswordResetConfirmView(APIView):
         if not default_token_generator.check_token(user, token):
             return Response({'error': 'Invalid or expired token'}, status=status.HTTP_400_BAD_REQUEST)
 
-        user.set_password(new_password)
+        try:
+            with hashing_slot():
+                user.set_password(new_password)
+        except HashingBusy:
+            return hashing_busy_response()
         user.save()
+        token_cache.invalidate_user(user.pk)
         
         return Response({'message': 'Password has been reset successfully.'})
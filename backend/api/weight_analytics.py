@@ -0,0 +1,72 @@
+import numpy as np
+
+PLATEAU_WINDOW = 5
+PLATEAU_MIN_LOGS = 3
+PLATEAU_STD_KG = 0.2
+MOVING_AVERAGE_DAYS = 7
+TREND_ALPHA = 0.1
+
+
+def rolling_std(values, window=PLATEAU_WINDOW):
+    """Population std-dev of each trailing window (shorter at the start of the series)."""
+    n = len(values)
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    csq = np.concatenate(([0.0], np.cumsum(values * values)))
+    hi = np.arange(1, n + 1)
+    lo = np.maximum(hi - window, 0)
+    count = hi - lo
+    mean = (csum[hi] - csum[lo]) / count
+    variance = (csq[hi] - csq[lo]) / count - mean * mean
+    return np.sqrt(np.clip(variance, 0, None))
+
+
+def moving_average(days, values, span=MOVING_AVERAGE_DAYS):
+    """Mean of all logs within the trailing `span` calendar days of each log."""
+    csum = np.concatenate(([0.0], np.cumsum(values)))
+    hi = np.arange(1, len(values) + 1)
+    lo = np.searchsorted(days, days - (span - 1), side='left')
+    return (csum[hi] - csum[lo]) / (hi - lo)
+
+
+def exponential_trend(values, alpha=TREND_ALPHA, block=256):
+    """
+    Exponentially smoothed trend weight (t = t_prev + alpha * (x - t_prev)).
+    Solved in closed form per block so the decay factors never underflow.
+    """
+    out = np.empty_like(values)
+    keep = 1.0 - alpha
+    prev = values[0]
+    for start in range(0, len(values), block):
+        chunk = values[start:start + block]
+        k = np.arange(len(chunk))
+        decay = keep ** k
+        out[start:start + block] = keep * decay * prev + decay * np.cumsum(alpha * chunk / decay)
+        prev = out[start + len(chunk) - 1]
+    return out
+
+
+def analyze_weight(dates, weights):
+    """
+    All weight statistics for a date-ordered series in one vectorized pass.
+    Returns summary values plus per-log `moving_average` / `trend` arrays.
+    """
+    values = np.asarray(weights, dtype=np.float64)
+    days = np.array(dates, dtype='datetime64[D]').astype(np.int64)
+
+    stds = rolling_std(values)
+    recent = min(len(values), PLATEAU_WINDOW)
+    plateau_std = float(stds[-1])
+    ma = moving_average(days, values)
+    trend = exponential_trend(values)
+
+    return {
+        "current_weight": float(values[-1]),
+        "start_weight": float(values[0]),
+        "change": round(float(values[-1] - values[0]), 1),
+        "plateau": bool(recent >= PLATEAU_MIN_LOGS and plateau_std < PLATEAU_STD_KG),
+        "plateau_std": round(plateau_std, 3),
+        "moving_average_7d": round(float(ma[-1]), 2),
+        "trend_weight": round(float(trend[-1]), 2),
+        "moving_average": ma,
+        "trend": trend,
+    }
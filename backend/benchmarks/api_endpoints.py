@@ -0,0 +1,383 @@
+"""
+Latency, queries per request and throughput for every endpoint in api/urls.py.
+
+Seeds a local benchmark database with synthetic users and multi-year log
+histories (the generate_data command), then drives each endpoint through
+Django's test client with Gemini stubbed out. Results are written as
+JSON so runs from different commits can be compared.
+
+Usage (from the backend directory):
+    python -m benchmarks.api_endpoints                       # sqlite file, 20 users x 2 years
+    python -m benchmarks.api_endpoints --users 50 --years 3 --reseed
+    python -m benchmarks.api_endpoints --cold                # clear the response cache per request
+    python -m benchmarks.api_endpoints --compare benchmarks/results/<old>.json
+
+    # Concurrent HTTP driver against a running server on the same database
+    python -m benchmarks.api_endpoints --http http://localhost:8000 --concurrency 8
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time as clock, timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest import mock
+
+from api.testing import FakeGeminiModel
+
+BENCH_DIR = Path(__file__).resolve().parent
+DEFAULT_DATABASE_URL = f"sqlite:///{BENCH_DIR / 'bench.sqlite3'}"
+ADMIN_USERNAME = "bench-admin"
+USERNAME_PREFIX = "bench-user-"
+PASSWORD = "bench-password-123"
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(timings, queries, elapsed):
+    result = {
+        "requests": len(timings),
+        "mean_ms": round(statistics.mean(timings), 3),
+        "p50_ms": round(percentile(timings, 50), 3),
+        "p95_ms": round(percentile(timings, 95), 3),
+        "p99_ms": round(percentile(timings, 99), 3),
+        "throughput_rps": round(len(timings) / elapsed, 1) if elapsed else None,
+    }
+    if queries is not None:
+        result["queries_mean"] = round(statistics.mean(queries), 2)
+        result["queries_max"] = max(queries)
+    return result
+
+
+# --------------------------------------------------
+# Endpoint plans: url name -> (method, build(ctx) -> request dict)
+# --------------------------------------------------
+def _reverse(name, **kwargs):
+    from django.urls import reverse
+    return reverse(name, kwargs=kwargs or None)
+
+
+def _new_log(model, ctx, **fields):
+    return model.objects.create(user=ctx.user, **fields)
+
+
+def _reset_confirm(ctx):
+    from django.contrib.auth.tokens import default_token_generator
+    from django.utils.encoding import force_bytes
+    from django.utils.http import urlsafe_base64_encode
+    # The reset token is tied to the current password hash, which every reset changes
+    ctx.reset_user.refresh_from_db()
+    return {"data": {
+        "uid": urlsafe_base64_encode(force_bytes(ctx.reset_user.pk)),
+        "token": default_token_generator.make_token(ctx.reset_user),
+        "new_password": PASSWORD, "confirm_password": PASSWORD,
+    }}
+
+
+def _logout(ctx):
+    from rest_framework.authtoken.models import Token
+    token, _ = Token.objects.get_or_create(user=ctx.logout_user)
+    return {"token": token.key}
+
+
+def _register(ctx):
+    ctx.registered += 1
+    return {"data": {"username": f"bench-register-{os.getpid()}-{ctx.registered}", "password": "bench-password-123"}}
+
+
+def build_plans():
+    from api.models import FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog
+
+    food = {"food_name": "Banana", "calories": 105, "protein": 1.3, "carbs": 27, "fats": 0.4, "meal_type": "Snack"}
+    sleep = {
+        "bedtime": "23:00", "wake_time": "07:00", "duration_minutes": 480, "quality_score": 80,
+        "deep_sleep_minutes": 90, "light_sleep_minutes": 250, "rem_sleep_minutes": 110, "awake_minutes": 30,
+    }
+    sleep_row = {**sleep, "bedtime": clock(23), "wake_time": clock(7)}
+
+    # Reads first, then writes, so write phases don't invalidate the read caches mid-run
+    return {
+        "update-profile": ("get", lambda ctx: {}),
+        "dashboard": ("get", lambda ctx: {}),
+        "dashboard-summary": ("get", lambda ctx: {"query": {"projection": "1"}}),
+        "stats-weekly": ("get", lambda ctx: {}),
+        "stats-monthly": ("get", lambda ctx: {}),
+        "stats-correlations": ("get", lambda ctx: {"query": {"days": "365"}}),
+        "stats-cache": ("get", lambda ctx: {"token": ctx.admin_token}),
+        "water-intake": ("get", lambda ctx: {}),
+        "weight-tracker": ("get", lambda ctx: {}),
+        "activity-tracker": ("get", lambda ctx: {}),
+        "sleep-tracker": ("get", lambda ctx: {}),
+        "sleep-analytics": ("get", lambda ctx: {}),
+        "log-food": ("get", lambda ctx: {}),
+        "diet-suggestions": ("get", lambda ctx: {}),
+        "monthly-report-pdf": ("get", lambda ctx: {}),
+        "export-daily": ("get", lambda ctx: {}),
+        "search-food": ("post", lambda ctx: {"data": {"query": "banana"}}),
+        "login": ("post", lambda ctx: {"data": {"username": ctx.user.username, "password": PASSWORD}, "token": None}),
+        "register": ("post", _register),
+        "password-reset": ("post", lambda ctx: {"data": {"email": ctx.user.email}, "token": None}),
+        "password-reset-confirm": ("post", _reset_confirm),
+        "logout": ("post", _logout),
+        "log-food#create": ("post", lambda ctx: {"data": food}),
+        "water-intake#create": ("post", lambda ctx: {"data": {"amount_ml": 250}}),
+        "weight-tracker#create": ("post", lambda ctx: {"data": {"weight_kg": ctx.profile.weight_kg}}),
+        "activity-tracker#create": ("post", lambda ctx: {"data": {"exercise_type": "Cardio", "duration_minutes": 30}}),
+        "sleep-tracker#create": ("post", lambda ctx: {"data": sleep}),
+        "update-profile#update": ("post", lambda ctx: {"data": {"weight_kg": ctx.profile.weight_kg}}),
+        "delete-food-log": ("delete", lambda ctx: {"kwargs": {"pk": _new_log(FoodLog, ctx, **food).pk}}),
+        "delete-water-log": ("delete", lambda ctx: {"kwargs": {"pk": _new_log(WaterLog, ctx, amount_ml=250).pk}}),
+        "delete-weight-log": ("delete", lambda ctx: {"kwargs": {"pk": _new_log(WeightLog, ctx, weight_kg=70).pk}}),
+        "delete-activity-log": ("delete", lambda ctx: {"kwargs": {"pk": _new_log(
+            ExerciseLog, ctx, exercise_type="Cardio", duration_minutes=30, calories_burned=300).pk}}),
+        "delete-sleep-log": ("delete", lambda ctx: {"kwargs": {"pk": _new_log(SleepLog, ctx, **sleep_row).pk}}),
+    }
+
+
+def url_names():
+    from api import urls
+    return {pattern.name for pattern in urls.urlpatterns}
+
+
+# --------------------------------------------------
+# Setup
+# --------------------------------------------------
+def setup_django(database_url):
+    os.environ["DATABASE_URL"] = database_url
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    os.environ.setdefault("DEBUG", "False")
+    os.environ.setdefault("ALLOWED_HOSTS", "testserver,localhost,127.0.0.1")
+    # Keep per-request JSON logs off the benchmark output
+    os.environ.setdefault("PERF_LOG_LEVEL", "ERROR")
+    import django
+    django.setup()
+
+    from django.conf import settings
+    from django.core.management import call_command
+    # Reset mails are queued to memory instead of printed
+    settings.EMAIL_BACKEND = "django.core.mail.backends.locmem.EmailBackend"
+    call_command("migrate", verbosity=0)
+
+
+def bench_context(args):
+    from django.contrib.auth.models import User
+    from rest_framework.authtoken.models import Token
+    from django.core.management import call_command
+
+    if args.reseed or not User.objects.filter(username__startswith=USERNAME_PREFIX).exists():
+        call_command(
+            "generate_data", users=args.users, years=args.years, seed=args.seed,
+            prefix=USERNAME_PREFIX, password=PASSWORD, replace=True,
+        )
+
+    users = list(User.objects.filter(username__startswith=USERNAME_PREFIX).select_related('profile').order_by('id')[:3])
+    if len(users) < 3:
+        raise SystemExit("Need at least 3 benchmark users (--users 3 --reseed)")
+    admin, _ = User.objects.update_or_create(username=ADMIN_USERNAME, defaults={"is_staff": True})
+    return SimpleNamespace(
+        user=users[0], profile=users[0].profile, reset_user=users[1], logout_user=users[2],
+        token=Token.objects.get_or_create(user=users[0])[0].key,
+        admin_token=Token.objects.get_or_create(user=admin)[0].key,
+        registered=0,
+    )
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+# --------------------------------------------------
+# In-process driver (Django test client)
+# --------------------------------------------------
+def run_endpoint(client, ctx, method, build, iterations, warmup, cold):
+    from django.core.cache import cache
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings, queries = [], []
+    statuses = set()
+    elapsed = 0.0
+    for i in range(warmup + iterations):
+        spec = build(ctx)
+        token = spec.get("token", ctx.token)
+        headers = {"HTTP_AUTHORIZATION": f"Token {token}"} if token else {}
+        name = spec.get("name")
+        path = spec["path"] if "path" in spec else _reverse(name, **spec.get("kwargs", {}))
+        if cold:
+            cache.clear()
+
+        with CaptureQueriesContext(connection) as captured:
+            start = time.perf_counter()
+            if method == "get":
+                response = client.get(path, spec.get("query"), **headers)
+            else:
+                response = getattr(client, method)(path, spec.get("data"), format="json", **headers)
+            took = time.perf_counter() - start
+        statuses.add(response.status_code)
+        if i >= warmup:
+            timings.append(took * 1000)
+            queries.append(len(captured))
+            elapsed += took
+    return {**summarize(timings, queries, elapsed), "status": sorted(statuses)}
+
+
+def run_in_process(args, ctx):
+    from rest_framework.test import APIClient
+    from api.mailqueue import mail_queue
+
+    plans = build_plans()
+    missing = url_names() - {key.split("#")[0] for key in plans}
+    if missing:
+        print(f"Warning: no benchmark plan for {sorted(missing)}")
+
+    FakeGeminiModel.latency = args.gemini_latency / 1000
+    client = APIClient()
+    results = {}
+    with mock.patch("api.views.genai.GenerativeModel", FakeGeminiModel):
+        for key, (method, build) in plans.items():
+            if args.only and key.split("#")[0] not in args.only:
+                continue
+            name = key.split("#")[0]
+
+            def plan(ctx, build=build, name=name):
+                return {"name": name, **build(ctx)}
+
+            results[key] = run_endpoint(client, ctx, method, plan, args.iterations, args.warmup, args.cold)
+            ctx.profile.refresh_from_db()
+            row = results[key]
+            print(f"{key:<26}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+                  f"{row['queries_mean']:>9.1f}{row['throughput_rps']:>9.1f}  {row['status']}")
+    mail_queue.flush()
+    return results
+
+
+# --------------------------------------------------
+# Concurrent HTTP driver (GET endpoints against a running server)
+# --------------------------------------------------
+def run_http(args, ctx):
+    plans = {key: plan for key, plan in build_plans().items() if plan[0] == "get"}
+    results = {}
+    for key, (_, build) in plans.items():
+        if args.only and key not in args.only:
+            continue
+        spec = build(ctx)
+        query = "&".join(f"{k}={v}" for k, v in spec.get("query", {}).items())
+        url = args.http.rstrip("/") + _reverse(key) + (f"?{query}" if query else "")
+        token = spec.get("token", ctx.token)
+
+        timings = []
+        errors = 0
+        lock = threading.Lock()
+
+        def hit(_):
+            nonlocal errors
+            request = urllib.request.Request(url, headers={"Authorization": f"Token {token}"})
+            start = time.perf_counter()
+            try:
+                with urllib.request.urlopen(request, timeout=60) as response:
+                    response.read()
+            except (urllib.error.URLError, OSError):
+                with lock:
+                    errors += 1
+                return
+            with lock:
+                timings.append((time.perf_counter() - start) * 1000)
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+            list(pool.map(hit, range(args.iterations * args.concurrency)))
+        elapsed = time.perf_counter() - start
+
+        if not timings:
+            results[key] = {"errors": errors}
+            print(f"{key:<26}  all {errors} requests failed")
+            continue
+        results[key] = {**summarize(timings, None, elapsed), "errors": errors}
+        row = results[key]
+        print(f"{key:<26}{row['p50_ms']:>9.1f}{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}"
+              f"{'-':>9}{row['throughput_rps']:>9.1f}  errors={errors}")
+    return results
+
+
+# --------------------------------------------------
+# Comparison
+# --------------------------------------------------
+def compare(old_path, new):
+    old = json.loads(Path(old_path).read_text())["endpoints"]
+    print(f"\nvs {old_path}")
+    print(f"{'endpoint':<26}{'p50 Δ%':>9}{'p95 Δ%':>9}{'queries Δ':>11}")
+    for key, row in new.items():
+        before = old.get(key)
+        if not before or "p50_ms" not in before or "p50_ms" not in row:
+            continue
+        p50 = (row["p50_ms"] - before["p50_ms"]) / before["p50_ms"] * 100 if before["p50_ms"] else 0
+        p95 = (row["p95_ms"] - before["p95_ms"]) / before["p95_ms"] * 100 if before["p95_ms"] else 0
+        queries = row.get("queries_mean", 0) - before.get("queries_mean", 0)
+        print(f"{key:<26}{p50:>+9.1f}{p95:>+9.1f}{queries:>+11.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reseed", action="store_true", help="drop and recreate the benchmark users")
+    parser.add_argument("--iterations", type=int, default=30, help="timed requests per endpoint (per thread with --http)")
+    parser.add_argument("--warmup", type=int, default=2)
+    parser.add_argument("--cold", action="store_true", help="clear the response cache before every request")
+    parser.add_argument("--gemini-latency", type=float, default=0, help="simulated Gemini latency in ms")
+    parser.add_argument("--only", nargs="+", help="url names to run")
+    parser.add_argument("--http", help="base URL of a running server; benchmark GET endpoints over HTTP")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--output", help="JSON results path (default benchmarks/results/<commit>.json)")
+    parser.add_argument("--compare", help="earlier results JSON to diff against")
+    args = parser.parse_args()
+
+    setup_django(args.database_url)
+    ctx = bench_context(args)
+
+    print(f"{'endpoint':<26}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'queries':>9}{'req/s':>9}")
+    endpoints = run_http(args, ctx) if args.http else run_in_process(args, ctx)
+
+    commit = git_commit()
+    report = {
+        "commit": commit,
+        "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": sys.version.split()[0],
+        "database": args.database_url.split(":", 1)[0],
+        "driver": f"http x{args.concurrency}" if args.http else "test-client",
+        "options": {
+            "users": args.users, "years": args.years, "seed": args.seed, "iterations": args.iterations,
+            "cold": args.cold, "gemini_latency_ms": args.gemini_latency,
+        },
+        "endpoints": endpoints,
+    }
+    output = Path(args.output) if args.output else BENCH_DIR / "results" / f"{commit or 'local'}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, indent=2))
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        compare(args.compare, endpoints)
+
+
+if __name__ == "__main__":
+    main()
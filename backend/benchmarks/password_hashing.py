@@ -0,0 +1,49 @@
+"""
+Logins per second per core for each configured password hasher.
+
+A login is dominated by one password verification, so this times
+check_password() on a single thread for every hasher in PASSWORD_HASHERS
+(cost parameters come from the same environment variables as settings).
+
+Usage:
+    python -m benchmarks.password_hashing --seconds 3
+    PASSWORD_SCRYPT_WORK_FACTOR=8192 python -m benchmarks.password_hashing
+"""
+import argparse
+import os
+import time
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--seconds", type=float, default=2.0, help="time budget per hasher")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    django.setup()
+
+    from django.contrib.auth.hashers import get_hashers
+
+    print(f"{'hasher':<30}{'ms/login':>10}{'logins/s/core':>16}")
+    for hasher in get_hashers():
+        name = type(hasher).__name__
+        try:
+            encoded = hasher.encode("correct horse battery staple", hasher.salt())
+        except ValueError as e:
+            # Library for this algorithm isn't installed (e.g. argon2-cffi)
+            print(f"{name:<30}  skipped: {e}")
+            continue
+
+        count = 0
+        start = time.perf_counter()
+        while time.perf_counter() - start < args.seconds:
+            hasher.verify("correct horse battery staple", encoded)
+            count += 1
+        elapsed = time.perf_counter() - start
+        print(f"{name:<30}{elapsed / count * 1000:>10.1f}{count / elapsed:>16.1f}")
+
+
+if __name__ == "__main__":
+    main()
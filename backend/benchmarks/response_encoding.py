@@ -0,0 +1,93 @@
+"""
+Rendering CPU and bytes on the wire per GET endpoint.
+
+Fetches every JSON GET endpoint once from the seeded benchmark database
+(same setup as benchmarks.api_endpoints), then times each encoding step
+on that response data: DRF's JSONRenderer vs FastJSONRenderer (orjson),
+and gzip / brotli compression of the rendered body (brotli only when the
+`brotli` package is installed). Times are the best of --repeat runs.
+
+Usage (from the backend directory):
+    python -m benchmarks.response_encoding
+    python -m benchmarks.response_encoding --users 5 --years 3 --reseed
+"""
+import argparse
+import os
+import time
+from unittest import mock
+
+from api.testing import FakeGeminiModel
+from benchmarks.api_endpoints import DEFAULT_DATABASE_URL, bench_context, build_plans, setup_django
+
+# Not JSON, or not an API read worth measuring
+SKIP = {"monthly-report-pdf", "stats-cache"}
+
+
+def best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings), result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--database-url", default=os.getenv("BENCH_DATABASE_URL", DEFAULT_DATABASE_URL))
+    parser.add_argument("--users", type=int, default=20)
+    parser.add_argument("--years", type=float, default=2)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--reseed", action="store_true", help="drop and recreate the benchmark users")
+    parser.add_argument("--repeat", type=int, default=20, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    setup_django(args.database_url)
+    ctx = bench_context(args)
+
+    from django.urls import reverse
+    from rest_framework.renderers import JSONRenderer
+    from rest_framework.test import APIClient
+
+    from api import compression, renderers
+
+    if renderers.orjson is None:
+        print("orjson is not installed: FastJSONRenderer falls back to JSONRenderer")
+    encodings = ["gzip"] + (["br"] if compression.brotli is not None else [])
+
+    client = APIClient()
+    client.credentials(HTTP_AUTHORIZATION=f"Token {ctx.token}")
+    header = f"{'endpoint':<22}{'bytes':>10}{'drf ms':>9}{'orjson ms':>11}"
+    for encoding in encodings:
+        header += f"{encoding + ' bytes':>12}{encoding + ' ms':>9}"
+    print(header)
+
+    totals = {"drf": 0.0, "fast": 0.0, "bytes": 0, **{encoding: 0 for encoding in encodings}}
+    with mock.patch("api.views.genai.GenerativeModel", FakeGeminiModel):
+        for name, (method, build) in build_plans().items():
+            if method != "get" or name in SKIP:
+                continue
+            spec = build(ctx)
+            response = client.get(reverse(name), spec.get("query"))
+            data = response.data
+
+            drf_ms, body = best_ms(lambda: JSONRenderer().render(data), args.repeat)
+            fast_ms, _ = best_ms(lambda: renderers.FastJSONRenderer().render(data), args.repeat)
+            row = f"{name:<22}{len(body):>10,}{drf_ms:>9.2f}{fast_ms:>11.2f}"
+            totals["drf"] += drf_ms
+            totals["fast"] += fast_ms
+            totals["bytes"] += len(body)
+            for encoding in encodings:
+                ms, compressed = best_ms(lambda: compression.compress(body, encoding), args.repeat)
+                row += f"{len(compressed):>12,}{ms:>9.2f}"
+                totals[encoding] += len(compressed)
+            print(row)
+
+    print(f"\nRendering: {totals['drf']:.1f} ms with JSONRenderer, {totals['fast']:.1f} ms with FastJSONRenderer")
+    for encoding in encodings:
+        saved = 1 - totals[encoding] / totals["bytes"] if totals["bytes"] else 0
+        print(f"{encoding}: {totals['bytes']:,} -> {totals[encoding]:,} bytes ({saved:.0%} saved)")
+
+
+if __name__ == "__main__":
+    main()
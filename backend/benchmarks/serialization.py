@@ -0,0 +1,80 @@
+"""
+Serialization cost of large list responses: ModelSerializer vs api.rows.
+
+Fills an in-memory database with --rows logs per table for one user, then
+times turning each table's queryset into response data both ways (query
+included, JSON rendering excluded), best of --repeat runs.
+
+Usage:
+    python -m benchmarks.serialization
+    python -m benchmarks.serialization --rows 50000 --repeat 5
+"""
+import argparse
+import os
+import time
+from datetime import date, time as clock, timedelta
+
+
+def best_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - start) * 1000)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=10_000, help="logs per table")
+    parser.add_argument("--repeat", type=int, default=3, help="runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    os.environ.setdefault("DATABASE_URL", "sqlite://:memory:")
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+    import django
+    django.setup()
+
+    from django.contrib.auth.models import User
+    from django.core.management import call_command
+
+    from api.models import FoodLog, WaterLog, WeightLog, ExerciseLog, SleepLog
+    from api.rows import log_rows
+    from api.serializers import (
+        FoodLogSerializer, WaterLogSerializer, WeightLogSerializer, ExerciseLogSerializer, SleepLogSerializer,
+    )
+
+    call_command("migrate", verbosity=0)
+    user = User.objects.create(username="bench-serialization")
+    start = date.today() - timedelta(days=args.rows)
+    days = [start + timedelta(days=i) for i in range(args.rows)]
+    tables = (
+        (FoodLog, FoodLogSerializer, lambda day: FoodLog(
+            user=user, food_name="Banana", calories=105, protein=1.3, carbs=27, fats=0.4,
+            meal_type="Snack", date_eaten=day,
+        )),
+        (WaterLog, WaterLogSerializer, lambda day: WaterLog(user=user, amount_ml=250, date_eaten=day)),
+        (WeightLog, WeightLogSerializer, lambda day: WeightLog(user=user, weight_kg=80.5, date=day)),
+        (ExerciseLog, ExerciseLogSerializer, lambda day: ExerciseLog(
+            user=user, exercise_type="Cardio", description="Run", duration_minutes=30,
+            calories_burned=300, date=day,
+        )),
+        (SleepLog, SleepLogSerializer, lambda day: SleepLog(
+            user=user, date=day, bedtime=clock(23), wake_time=clock(7), duration_minutes=480,
+            quality_score=80, deep_sleep_minutes=90, light_sleep_minutes=250, rem_sleep_minutes=110,
+            awake_minutes=30,
+        )),
+    )
+
+    print(f"{args.rows:,} rows per table")
+    print(f"{'table':<14}{'serializer ms':>15}{'rows ms':>10}{'speedup':>10}")
+    for model, serializer, build in tables:
+        model.objects.bulk_create([build(day) for day in days], batch_size=1000)
+        queryset = model.objects.filter(user=user).order_by("date_eaten" if model in (FoodLog, WaterLog) else "date")
+        slow = best_ms(lambda: serializer(queryset.all(), many=True).data, args.repeat)
+        fast = best_ms(lambda: log_rows(queryset.all()), args.repeat)
+        print(f"{model.__name__:<14}{slow:>15.1f}{fast:>10.1f}{slow / fast:>9.1f}x")
+
+
+if __name__ == "__main__":
+    main()
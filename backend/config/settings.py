@@ -3,6 +3,7 @@ Django settings for config project.
 """
 
 import os
+import tempfile
 from pathlib import Path
 import dj_database_url
 from dotenv import load_dotenv
@@ -54,18 +55,37 @@ INSTALLED_APPS = [
 # --------------------------------------------------
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": [
-        "rest_framework.authentication.TokenAuthentication",
+        "api.authentication.CachedTokenAuthentication",
         "rest_framework.authentication.SessionAuthentication",
     ],
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
     ],
+    # orjson-backed when orjson is installed, DRF's JSONRenderer otherwise
+    "DEFAULT_RENDERER_CLASSES": [
+        "api.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
 
+# JSON responses of at least RESPONSE_COMPRESSION_MIN_BYTES are compressed
+# with brotli (needs the `brotli` package) or gzip, per Accept-Encoding.
+RESPONSE_COMPRESSION = os.getenv("RESPONSE_COMPRESSION", "True") == "True"
+RESPONSE_COMPRESSION_MIN_BYTES = int(os.getenv("RESPONSE_COMPRESSION_MIN_BYTES", "1024"))
+RESPONSE_BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "4"))  # 0-11
+
+# Token -> user/profile lookups are cached per process. Logout and password
+# reset clear the local entry; other workers drop theirs after the TTL.
+AUTH_TOKEN_CACHE_SIZE = int(os.getenv("AUTH_TOKEN_CACHE_SIZE", "10000"))
+AUTH_TOKEN_CACHE_TTL = float(os.getenv("AUTH_TOKEN_CACHE_TTL", "30"))
+
 # --------------------------------------------------
 # Middleware
 # --------------------------------------------------
 MIDDLEWARE = [
+    "api.instrumentation.RequestTimingMiddleware",
+    # Inside the timing middleware so compression counts towards request time
+    "api.compression.CompressionMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -110,9 +130,98 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set")
 
+# Persistent connections: reuse a worker's connection for DB_CONN_MAX_AGE
+# seconds instead of opening a fresh TLS connection per request.
+DB_CONN_MAX_AGE = int(os.getenv("DB_CONN_MAX_AGE", "60"))
+
 DATABASES = {
-    "default": dj_database_url.parse(DATABASE_URL)
+    "default": dj_database_url.parse(
+        DATABASE_URL,
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=os.getenv("DB_CONN_HEALTH_CHECKS", "True") == "True",
+    )
+}
+
+# Optional psycopg 3 connection pool (Django 5.1+, needs `psycopg[pool]`).
+# Each gunicorn worker owns its own pool, so keep
+# workers * DB_POOL_MAX_SIZE below the database's connection limit.
+DB_POOL = os.getenv("DB_POOL", "False") == "True"
+
+if DB_POOL and DATABASES["default"]["ENGINE"] == "django.db.backends.postgresql":
+    # The pool manages reuse itself; Django rejects it combined with CONN_MAX_AGE
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"].setdefault("OPTIONS", {})["pool"] = {
+        "min_size": int(os.getenv("DB_POOL_MIN_SIZE", "1")),
+        "max_size": int(os.getenv("DB_POOL_MAX_SIZE", "4")),
+        "timeout": float(os.getenv("DB_POOL_TIMEOUT", "10")),
+    }
+
+# --------------------------------------------------
+# Cache
+# --------------------------------------------------
+# Local memory is per process: with several gunicorn workers (WEB_CONCURRENCY)
+# a write would only invalidate one worker's copy, so point CACHE_BACKEND at
+# the file-based (or a shared) backend there.
+CACHES = {
+    "default": {
+        "BACKEND": os.getenv("CACHE_BACKEND", "django.core.cache.backends.locmem.LocMemCache"),
+        "LOCATION": os.getenv("CACHE_LOCATION", "fitguide"),
+    }
+}
+WEB_CONCURRENCY = int(os.getenv("WEB_CONCURRENCY", "1"))
+if WEB_CONCURRENCY > 1 and CACHES["default"]["BACKEND"].endswith(".LocMemCache"):
+    raise RuntimeError(
+        "CACHE_BACKEND is LocMemCache but WEB_CONCURRENCY > 1; use a shared cache "
+        "(e.g. django.core.cache.backends.filebased.FileBasedCache with CACHE_LOCATION=/var/tmp/fitguide)"
+    )
+
+# Seconds a per-user API response stays cached (writes invalidate it earlier)
+RESPONSE_CACHE_TIMEOUT = int(os.getenv("RESPONSE_CACHE_TIMEOUT", "300"))
+
+# --------------------------------------------------
+# Log archival (python manage.py archive_logs)
+# --------------------------------------------------
+# Logs older than this many days are rolled into per-day DailySummary rows
+# (minimum 62). Only lower it: reads starting after the cutoff skip the
+# archive, so raising it would hide days archived under the old value.
+LOG_RETENTION_DAYS = int(os.getenv("LOG_RETENTION_DAYS", "365"))
+
+# --------------------------------------------------
+# Password hashing
+# --------------------------------------------------
+# PASSWORD_HASHER picks the hasher for new/upgraded hashes (pbkdf2, scrypt
+# or argon2). The others stay listed so existing hashes keep verifying and
+# get upgraded on the next login. argon2 needs `argon2-cffi` installed.
+#
+# The defaults are Django's own: PBKDF2 with 1,000,000 iterations and, when
+# chosen, scrypt with n=2**14. That is the verification cost (roughly 0.2-0.3 s
+# of one core per login, see benchmarks/password_hashing.py) that keeps stolen
+# hashes expensive to crack; lower it only with that trade-off in mind.
+# Switching to scrypt/argon2 is opt-in because every existing user then
+# pays one PBKDF2 check plus the new hash on their next login.
+_PASSWORD_HASHERS = {
+    "pbkdf2": "api.hashers.TunedPBKDF2PasswordHasher",
+    "scrypt": "api.hashers.TunedScryptPasswordHasher",
+    "argon2": "api.hashers.TunedArgon2PasswordHasher",
 }
+PASSWORD_HASHER = os.getenv("PASSWORD_HASHER", "pbkdf2")
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+]
+
+PASSWORD_PBKDF2_ITERATIONS = int(os.getenv("PASSWORD_PBKDF2_ITERATIONS", "1000000"))
+PASSWORD_SCRYPT_WORK_FACTOR = int(os.getenv("PASSWORD_SCRYPT_WORK_FACTOR", str(2 ** 14)))
+PASSWORD_ARGON2_TIME_COST = int(os.getenv("PASSWORD_ARGON2_TIME_COST", "2"))
+PASSWORD_ARGON2_MEMORY_COST = int(os.getenv("PASSWORD_ARGON2_MEMORY_COST", "19456"))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.getenv("PASSWORD_ARGON2_PARALLELISM", "1"))
+
+# Max password hashes running at once on this machine, across all worker
+# processes (file locks in PASSWORD_HASH_LOCK_DIR), and how long a
+# login/register waits for a slot before answering 503. The default leaves
+# half the CPUs to the other endpoints during a login burst.
+PASSWORD_HASH_CONCURRENCY = int(os.getenv("PASSWORD_HASH_CONCURRENCY", str(max(1, (os.cpu_count() or 2) // 2))))
+PASSWORD_HASH_WAIT_TIMEOUT = float(os.getenv("PASSWORD_HASH_WAIT_TIMEOUT", "5"))
+PASSWORD_HASH_LOCK_DIR = os.getenv("PASSWORD_HASH_LOCK_DIR", os.path.join(tempfile.gettempdir(), "fitguide-password-hash"))
 
 # --------------------------------------------------
 # Password validation
@@ -171,6 +280,34 @@ CORS_ALLOW_ALL_ORIGINS = False # Safer for production
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "noreply@dietplanner.com"
 
+# Outbound mail is queued and sent by a background thread in batches
+EMAIL_QUEUE_BATCH_SIZE = int(os.getenv("EMAIL_QUEUE_BATCH_SIZE", "50"))
+EMAIL_QUEUE_MAX_SIZE = int(os.getenv("EMAIL_QUEUE_MAX_SIZE", "10000"))
+EMAIL_QUEUE_MAX_RETRIES = int(os.getenv("EMAIL_QUEUE_MAX_RETRIES", "3"))
+EMAIL_QUEUE_RETRY_DELAY = float(os.getenv("EMAIL_QUEUE_RETRY_DELAY", "2"))  # seconds, doubles per retry
+EMAIL_QUEUE_RATE_LIMIT = float(os.getenv("EMAIL_QUEUE_RATE_LIMIT", "10"))  # messages/second, 0 = unlimited
+
+# --------------------------------------------------
+# Reminders (python manage.py send_reminders [--loop])
+# --------------------------------------------------
+REMINDER_BACKEND = os.getenv("REMINDER_BACKEND", "api.reminders.ConsoleReminderBackend")
+REMINDER_BATCH_SIZE = int(os.getenv("REMINDER_BATCH_SIZE", "1000"))
+# Users are only reminded once it is at least this hour (0-23) in their timezone
+REMINDER_LOCAL_HOUR = int(os.getenv("REMINDER_LOCAL_HOUR", "19"))
+
+# --------------------------------------------------
+# Request instrumentation (api.instrumentation)
+# --------------------------------------------------
+PERF_INSTRUMENTATION = os.getenv("PERF_INSTRUMENTATION", "True") == "True"
+PERF_SAMPLE_RATE = float(os.getenv("PERF_SAMPLE_RATE", "0.1"))  # fraction of requests measured
+# Server-Timing exposes internal timings: only sent to staff users, or to anyone with DEBUG on
+PERF_SERVER_TIMING = os.getenv("PERF_SERVER_TIMING", "False") == "True"
+PERF_SLOW_REQUEST_MS = float(os.getenv("PERF_SLOW_REQUEST_MS", "1000"))  # logged at WARNING, 0 = off
+
+# /metrics (Prometheus text format): bearer token required when set;
+# without a token the endpoint is only served with DEBUG on
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+
 # --------------------------------------------------
 # Logging (shows errors on Render)
 # --------------------------------------------------
@@ -184,6 +321,14 @@ LOGGING = {
         "handlers": ["console"],
         "level": "ERROR",
     },
+    "loggers": {
+        # One JSON line per sampled request at INFO, slow requests at WARNING
+        "api.performance": {
+            "handlers": ["console"],
+            "level": os.getenv("PERF_LOG_LEVEL", "WARNING"),
+            "propagate": False,
+        },
+    },
 }
 
 # --------------------------------------------------
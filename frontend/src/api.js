@@ -26,9 +26,15 @@ export const register = (data) => api.post('register/', data);
 export const logout = () => api.post('logout/');
 
 export const getProfile = () => api.get('update-profile/');
-export const updateProfile = (data) => api.post('update-profile/', data);
+// The browser's timezone rides along so "today" follows the user's calendar
+export const updateProfile = (data) => api.post('update-profile/', {
+    timezone: Intl.DateTimeFormat().resolvedOptions().timeZone,
+    ...data,
+});
 export const searchFood = (query) => api.post('search-food/', { query });
 export const logFood = (foodData) => api.post('log-food/', foodData);
+// Composite dashboard; `fields` picks sections (summary, weekly, water, weight, activity, sleep)
+export const getDashboard = (fields) => api.get('dashboard/', { params: fields ? { fields: fields.join(',') } : {} });
 export const getDashboardSummary = () => api.get('dashboard-summary/');
 export const getWeeklyStats = () => api.get('stats/weekly/');
 export const getWaterIntake = () => api.get('water/');
@@ -1,5 +1,5 @@
 import React, { useEffect, useState } from 'react';
-import { getDashboardSummary, deleteFoodLog } from '../api';
+import { getDashboard, deleteFoodLog } from '../api';
 import { Plus, Trash2, Home, UtensilsCrossed, Sparkles } from 'lucide-react';
 import FoodSearchModal from './FoodSearchModal';
 import WeeklyProgress from './WeeklyProgress';
@@ -7,14 +7,17 @@ import DietSuggestionsModal from './DietSuggestionsModal';
 
 const Dashboard = () => {
     const [data, setData] = useState(null);
+    const [weekly, setWeekly] = useState(null);
     const [loading, setLoading] = useState(true);
     const [isModalOpen, setIsModalOpen] = useState(false);
     const [isDietModalOpen, setIsDietModalOpen] = useState(false);
 
     const fetchData = async () => {
         try {
-            const res = await getDashboardSummary();
-            setData(res.data);
+            // Summary card and weekly chart in one request
+            const res = await getDashboard(['summary', 'weekly']);
+            setData(res.data.summary);
+            setWeekly(res.data.weekly);
         } catch (error) {
             console.error("Failed to load dashboard", error);
         } finally {
@@ -119,7 +122,7 @@ const Dashboard = () => {
 
             {/* Weekly Progress */}
             <div className="mb-8">
-                <WeeklyProgress targetCalories={data.target_calories} />
+                <WeeklyProgress targetCalories={data.target_calories} weekly={weekly} />
             </div>
 
             {/* Food Log */}
@@ -1,38 +1,10 @@
-import React, { useEffect, useState } from 'react';
-import { getWeeklyStats } from '../api';
+import React from 'react';
 import { Flame } from 'lucide-react';
 
-const WeeklyProgress = ({ targetCalories = 2000 }) => {
-    const [stats, setStats] = useState([]);
-    const [streak, setStreak] = useState(0);
-    const [loading, setLoading] = useState(true);
-
-    useEffect(() => {
-        const fetchStats = async () => {
-            try {
-                const res = await getWeeklyStats();
-                setStats(res.data.daily_stats);
-                setStreak(res.data.streak);
-            } catch (error) {
-                console.error("Failed to load weekly stats", error);
-            } finally {
-                setLoading(false);
-            }
-        };
-
-        fetchStats();
-    }, []);
-
-    if (loading) return (
-        <div className="bg-white dark:bg-slate-800 p-6 rounded-2xl shadow-sm animate-pulse h-48 transition-colors duration-300">
-            <div className="h-4 bg-slate-200 dark:bg-slate-700 rounded w-1/3 mb-4"></div>
-            <div className="flex gap-2 items-end h-32">
-                {[...Array(7)].map((_, i) => (
-                    <div key={i} className="bg-slate-200 dark:bg-slate-700 flex-1 rounded-lg" style={{ height: `${Math.random() * 50 + 20}%` }}></div>
-                ))}
-            </div>
-        </div>
-    );
+// `weekly` is the dashboard's "weekly" section (same shape as stats/weekly/)
+const WeeklyProgress = ({ targetCalories = 2000, weekly }) => {
+    const stats = weekly.daily_stats;
+    const streak = weekly.streak;
 
     return (
         <div className="bg-white dark:bg-slate-800 p-6 rounded-2xl shadow-sm transition-colors duration-300">